@@ -6,15 +6,22 @@ Handles user authentication, token generation, and user management.
 
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi.responses import ORJSONResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.api.dependencies import request_now
+from app.core.database import get_read_db, get_session_factory
 from app.core.security import (
     verify_password,
     get_password_hash,
+    password_needs_rehash,
     create_access_token,
-    get_current_user
+    get_current_user,
+    revoke_token,
+    security
 )
 from app.models.user import User, UserCreate, UserRead, UserLogin, Token
 from app.core.logging import get_logger
@@ -27,39 +34,41 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
 async def register_user(
     user_data: UserCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Register a new operator account.
     
+    The conflict check and bcrypt hash run without the single writer
+    connection; a write session is only opened for the INSERT.
+    
     **Security Note:** In production, disable this endpoint or add admin-only access.
     """
-    # Check if username exists
+    # Check username and email uniqueness in a single round-trip
     result = await db.execute(
-        select(User).where(User.username == user_data.username)
+        select(User.username, User.email).where(
+            or_(
+                User.username == user_data.username,
+                User.email == user_data.email
+            )
+        )
     )
-    existing_user = result.scalar_one_or_none()
+    conflicts = result.all()
     
-    if existing_user:
+    if any(row.username == user_data.username for row in conflicts):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
     
-    # Check if email exists
-    result = await db.execute(
-        select(User).where(User.email == user_data.email)
-    )
-    existing_email = result.scalar_one_or_none()
-    
-    if existing_email:
+    if conflicts:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     
     new_user = User(
         username=user_data.username,
@@ -70,23 +79,42 @@ async def register_user(
         is_superuser=False
     )
     
-    db.add(new_user)
-    await db.commit()
-    await db.refresh(new_user)
+    async with get_session_factory()() as session:
+        session.add(new_user)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Lost a race against a concurrent registration for the same account
+            await session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username or email already registered"
+            )
+        await session.refresh(new_user)
     
     logger.info(f"New user registered: {user_data.username}")
     
-    return new_user
+    # The row was validated on the way in; serialize it directly rather
+    # than re-validating it against response_model
+    return ORJSONResponse(
+        UserRead.from_orm_trusted(new_user).model_dump(),
+        status_code=status.HTTP_201_CREATED,
+    )
 
 
 @router.post("/login", response_model=Token)
 async def login(
     credentials: UserLogin,
-    db: AsyncSession = Depends(get_db)
+    now: datetime = Depends(request_now),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Authenticate user and return JWT access token.
     
+    The user is loaded and verified on a read connection; bcrypt never
+    runs while the single writer connection is held, so logins can't
+    stall beacon storage.
+    
     Returns:
         JWT token valid for 7 days
     """
@@ -97,7 +125,7 @@ async def login(
     user = result.scalar_one_or_none()
     
     # Verify credentials
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not user or not await verify_password(credentials.password, user.hashed_password):
         logger.warning(f"Failed login attempt for username: {credentials.username}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -112,9 +140,15 @@ async def login(
             detail="Account is disabled"
         )
     
-    # Update last login timestamp
-    user.last_login = datetime.utcnow()
-    await db.commit()
+    # Update last login timestamp, upgrading hashes created with a lower
+    # bcrypt cost; the new hash is computed before the write session opens
+    values = {"last_login": now.replace(tzinfo=None)}
+    if password_needs_rehash(user.hashed_password):
+        values["hashed_password"] = await get_password_hash(credentials.password)
+    
+    async with get_session_factory()() as session:
+        await session.execute(update(User).where(User.id == user.id).values(**values))
+        await session.commit()
     
     # Create access token
     access_token = create_access_token(
@@ -129,7 +163,7 @@ async def login(
 @router.get("/me", response_model=UserRead)
 async def get_current_user_info(
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get information about the currently authenticated user.
@@ -149,17 +183,22 @@ async def get_current_user_info(
             detail="User not found"
         )
     
-    return user
+    return ORJSONResponse(UserRead.from_orm_trusted(user).model_dump())
 
 
 @router.post("/logout")
-async def logout(current_user: dict = Depends(get_current_user)):
+async def logout(
+    current_user: dict = Depends(get_current_user),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
     """
     Logout endpoint (client-side should discard token).
     
-    Note: JWT tokens are stateless and cannot be invalidated server-side
-    without a token blacklist. Client must discard the token.
+    Note: The token is revoked in this server process only. JWT tokens
+    are stateless, so other workers still accept it until it expires;
+    the client must discard the token.
     """
+    revoke_token(credentials.credentials)
     username = current_user.get("sub")
     logger.info(f"User logged out: {username}")
     
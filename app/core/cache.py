@@ -0,0 +1,84 @@
+"""
+In-process caching helpers.
+
+Provides time-bounded caches for values that are expensive to compute
+but may safely be stale for a while, such as dashboard aggregates and
+threat intelligence lookups.
+"""
+
+import functools
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional, Tuple
+
+
+def ttl_cache(
+    seconds: float,
+    maxsize: Optional[int] = None,
+    ignore: Iterable[str] = ("db", "now"),
+    cache_none: bool = True,
+) -> Callable:
+    """
+    Cache the result of an async function for a fixed time window.
+    
+    Results are keyed by the call arguments, skipping any keyword
+    arguments named in ``ignore`` (request-scoped values such as the
+    database session or the request timestamp). The wrapper keeps the
+    original signature so it can decorate FastAPI endpoints directly.
+    
+    Args:
+        seconds: How long a cached result stays valid
+        maxsize: Evict the least recently used entry beyond this many
+            (unbounded if None)
+        ignore: Keyword argument names excluded from the cache key
+        cache_none: Whether a None result is cached (disable when None
+            signals a transient failure worth retrying)
+        
+    Returns:
+        Decorator for async functions. The wrapper exposes cache_clear()
+        and cache_pop(*args, **kwargs) to drop one entry.
+        
+    Example:
+        @router.get("/stats/overview")
+        @ttl_cache(seconds=5)
+        async def get_overview(db: AsyncSession = Depends(get_read_db)):
+            ...
+    """
+    ignored = frozenset(ignore)
+    
+    def decorator(func: Callable) -> Callable:
+        entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        
+        def make_key(args: tuple, kwargs: dict) -> Hashable:
+            return (
+                args,
+                tuple(sorted(
+                    (name, value) for name, value in kwargs.items()
+                    if name not in ignored
+                )),
+            )
+        
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            now = time.monotonic()
+            
+            entry = entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    entries.move_to_end(key)
+                    return entry[1]
+                del entries[key]
+            
+            value = await func(*args, **kwargs)
+            if value is not None or cache_none:
+                entries[key] = (now + seconds, value)
+                if maxsize is not None and len(entries) > maxsize:
+                    entries.popitem(last=False)
+            return value
+        
+        wrapper.cache_clear = entries.clear
+        wrapper.cache_pop = lambda *args, **kwargs: entries.pop(make_key(args, kwargs), None)
+        return wrapper
+    
+    return decorator
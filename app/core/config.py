@@ -6,6 +6,8 @@ database paths, and logging settings. Environment variables are
 automatically loaded and validated.
 """
 
+import os
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import List
 
@@ -29,12 +31,45 @@ class Settings(BaseSettings):
     # Server Configuration
     host: str = Field(default="0.0.0.0", description="Host to bind API server")
     api_port: int = Field(default=8000, description="FastAPI dashboard port")
+    listeners_per_protocol: int = Field(
+        default=1,
+        ge=1,
+        description="SO_REUSEPORT listener sockets per protocol port (ignored on Windows)"
+    )
     
     # Database Configuration
     db_path: Path = Field(
         default=Path("data/keychaser.db"),
         description="SQLite database file path"
     )
+    db_pool_size: int = Field(
+        default_factory=lambda: os.cpu_count() or 4,
+        description="Persistent read-only connections kept in the database pool"
+    )
+    db_max_overflow: int = Field(
+        default=0,
+        description="Extra read connections allowed beyond db_pool_size under burst load"
+    )
+    db_pool_recycle: int = Field(
+        default=3600,
+        description="Seconds after which pooled connections are replaced"
+    )
+    db_pool_pre_ping: bool = Field(
+        default=False,
+        description="Test connections on checkout (enable for networked databases)"
+    )
+    db_statement_cache_size: int = Field(
+        default=512,
+        description="Prepared statements cached per database connection"
+    )
+    db_writers: int = Field(
+        default=1,
+        ge=1,
+        description=(
+            "Background tasks storing parsed payloads; each bot is always stored by the "
+            "same one. SQLite has a single writer connection, so more only helps a server database"
+        )
+    )
     
     # Logging Configuration
     log_path: Path = Field(
@@ -43,6 +78,11 @@ class Settings(BaseSettings):
     )
     log_level: str = Field(default="INFO", description="Logging level")
     log_to_file: bool = Field(default=True, description="Enable file logging")
+    traffic_hexdump_bytes: int = Field(
+        default=512,
+        ge=0,
+        description="Bytes of each payload hexdumped to the traffic log (0 for all)"
+    )
     
     # Protocol Handler Configuration
     protocols_dir: Path = Field(
@@ -59,6 +99,17 @@ class Settings(BaseSettings):
         default="CHANGE_ME_IN_PRODUCTION_USE_openssl_rand_hex_32",
         description="JWT secret key (32+ chars, use `openssl rand -hex 32`)"
     )
+    bcrypt_rounds: int = Field(
+        default=12,
+        ge=4,
+        le=31,
+        description="Minimum bcrypt cost factor for password hashes"
+    )
+    bcrypt_target_ms: int = Field(
+        default=250,
+        ge=0,
+        description="Raise bcrypt cost at startup while a hash stays under this many ms (0 disables)"
+    )
     
     # Security Settings
     max_packet_size: int = Field(
@@ -73,12 +124,58 @@ class Settings(BaseSettings):
         default=10,
         description="Maximum concurrent connections per IP address"
     )
+    max_concurrent_handlers: int = Field(
+        default=256,
+        ge=1,
+        description="Maximum payloads decrypted, parsed and stored at once across all protocols"
+    )
     
     # Dashboard Configuration
     dashboard_refresh_interval: int = Field(
         default=5,
         description="Dashboard auto-refresh interval in seconds"
     )
+    stats_cache_ttl: float = Field(
+        default=5.0,
+        description="Seconds that aggregated /stats responses are cached in-process"
+    )
+    
+    model_config = SettingsConfigDict(
+        env_prefix="KEYCHASER_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        # Integration keys in .env are read by IntegrationSettings
+        extra="ignore"
+    )
+    
+    @cached_property
+    def integrations(self) -> "IntegrationSettings":
+        """Optional third-party credentials, parsed on first access."""
+        return IntegrationSettings()
+    
+    def get_database_url(self) -> str:
+        """Generate SQLAlchemy database URL for async SQLite."""
+        return f"sqlite+aiosqlite:///{self.db_path}"
+    
+    def get_read_database_url(self) -> str:
+        """Generate SQLAlchemy database URL for read-only async SQLite."""
+        return f"sqlite+aiosqlite:///file:{self.db_path}?mode=ro&uri=true"
+    
+    def ensure_directories(self) -> None:
+        """Create necessary directories if they don't exist."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.log_path.mkdir(parents=True, exist_ok=True)
+
+
+class IntegrationSettings(BaseSettings):
+    """
+    Credentials for optional integrations (Telegram, threat intel APIs).
+    
+    Kept apart from Settings so deployments without these integrations
+    never parse them; they are loaded when first used via
+    ``settings.integrations``. Uses the same KEYCHASER_ variables.
+    """
     
     # Telegram Notifications
     telegram_bot_token: str = Field(
@@ -104,19 +201,23 @@ class Settings(BaseSettings):
         env_prefix="KEYCHASER_",
         env_file=".env",
         env_file_encoding="utf-8",
-        case_sensitive=False
+        case_sensitive=False,
+        extra="ignore"
     )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the process-wide settings, parsing the environment only once.
     
-    def get_database_url(self) -> str:
-        """Generate SQLAlchemy database URL for async SQLite."""
-        return f"sqlite+aiosqlite:///{self.db_path}"
-    
-    def ensure_directories(self) -> None:
-        """Create necessary directories if they don't exist."""
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self.log_path.mkdir(parents=True, exist_ok=True)
+    Returns:
+        Validated Settings instance with its directories created
+    """
+    instance = Settings()
+    instance.ensure_directories()
+    return instance
 
 
 # Global settings instance
-settings = Settings()
-settings.ensure_directories()
+settings = get_settings()
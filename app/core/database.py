@@ -1,12 +1,18 @@
 """
 Async SQLAlchemy database configuration and session management.
 
-This module sets up the async SQLite engine and provides dependency
-injection for database sessions in FastAPI endpoints.
+This module sets up the async SQLite engines and provides dependency
+injection for database sessions in FastAPI endpoints. SQLite allows a
+single writer, so writes go through a one-connection engine while reads
+use a separate pool of read-only connections that never wait on it.
 """
 
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict, List, Sequence
 
+import orjson
+from sqlalchemy import event, func, insert, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -23,14 +29,109 @@ logger = get_logger(__name__)
 # Declarative base for all models
 Base = declarative_base()
 
-# Global engine and session factory
+# Global engines and session factories
 engine: AsyncEngine | None = None
+read_engine: AsyncEngine | None = None
 async_session_factory: async_sessionmaker[AsyncSession] | None = None
+read_session_factory: async_sessionmaker[AsyncSession] | None = None
 
 
-def get_engine() -> AsyncEngine:
+def _set_sqlite_read_pragmas(dbapi_connection, connection_record) -> None:
     """
-    Get or create the async database engine.
+    Apply per-connection SQLite settings shared by readers and the writer.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-20000")  # ~20 MB page cache
+    cursor.close()
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Apply per-connection SQLite settings for the writer.
+    
+    WAL lets dashboard reads proceed while protocol listeners write, and
+    synchronous=NORMAL only fsyncs at checkpoints (safe under WAL).
+    Foreign keys are off by default in SQLite; they must be enabled on
+    every connection for ON DELETE CASCADE to take effect.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+    _set_sqlite_read_pragmas(dbapi_connection, connection_record)
+    
+    # Stop the driver from emitting its own deferred BEGIN; the writer's
+    # transactions are started by _begin_immediate instead
+    dbapi_connection.isolation_level = None
+
+
+def _begin_immediate(conn) -> None:
+    """
+    Start writer transactions with BEGIN IMMEDIATE.
+    
+    Taking the write lock up front means a transaction that reads before
+    it writes waits out the busy timeout instead of failing with SQLITE_BUSY
+    when it tries to upgrade its lock.
+    """
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _optimize_on_close(dbapi_connection, connection_record) -> None:
+    """
+    Refresh planner statistics before a writer connection closes.
+    
+    PRAGMA optimize only runs ANALYZE on tables whose statistics are
+    stale, so it is cheap when nothing has changed.
+    """
+    try:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA optimize")
+        cursor.close()
+    except Exception as e:
+        logger.debug(f"PRAGMA optimize failed: {e}")
+
+
+def _json_dumps(value: Any) -> str:
+    """Serialize a JSON column value to text."""
+    return orjson.dumps(value).decode("utf-8")
+
+
+def _create_engine(database_url: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+    """Create an async engine with the shared pool and cache settings."""
+    return create_async_engine(
+        database_url,
+        echo=settings.debug,
+        future=True,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        # Compiled SQL cache shared by all connections
+        query_cache_size=settings.db_statement_cache_size,
+        # JSON columns are (de)serialized with orjson
+        json_serializer=_json_dumps,
+        json_deserializer=orjson.loads,
+        # SQLite-specific optimizations; cached_statements is the
+        # per-connection prepared statement cache (default 128)
+        connect_args={
+            "check_same_thread": False,
+            "cached_statements": settings.db_statement_cache_size,
+            # Wait up to 5s on a locked database (sqlite3's busy timeout)
+            "timeout": 5.0,
+        }
+    )
+
+
+def get_write_engine() -> AsyncEngine:
+    """
+    Get or create the async engine used for writes.
+    
+    The pool holds a single connection so writers queue on checkout
+    instead of failing with SQLITE_BUSY, and every transaction begins
+    IMMEDIATE. Read-only connections keep deferred transactions.
     
     Returns:
         AsyncEngine instance configured for SQLite
@@ -38,37 +139,79 @@ def get_engine() -> AsyncEngine:
     global engine
     if engine is None:
         database_url = settings.get_database_url()
-        engine = create_async_engine(
-            database_url,
-            echo=settings.debug,
-            future=True,
-            # SQLite-specific optimizations
-            connect_args={"check_same_thread": False}
+        engine = _create_engine(database_url, pool_size=1, max_overflow=0)
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+        event.listen(engine.sync_engine, "begin", _begin_immediate)
+        event.listen(engine.sync_engine.pool, "close", _optimize_on_close)
+        logger.info(
+            f"Database engine created: {database_url} "
+            f"(statement cache: {settings.db_statement_cache_size})"
         )
-        logger.info(f"Database engine created: {database_url}")
     return engine
 
 
+def get_read_engine() -> AsyncEngine:
+    """
+    Get or create the async engine used for read-only queries.
+    
+    Returns:
+        AsyncEngine instance opening SQLite in read-only mode
+    """
+    global read_engine
+    if read_engine is None:
+        database_url = settings.get_read_database_url()
+        read_engine = _create_engine(
+            database_url,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+        )
+        event.listen(read_engine.sync_engine, "connect", _set_sqlite_read_pragmas)
+        logger.info(
+            f"Read-only database engine created: {database_url} "
+            f"(pool size: {settings.db_pool_size})"
+        )
+    return read_engine
+
+
+def _create_session_factory(bind: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """Create a session factory bound to the given engine."""
+    return async_sessionmaker(
+        bind=bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+        autocommit=False,
+    )
+
+
 def get_session_factory() -> async_sessionmaker[AsyncSession]:
     """
-    Get or create the async session factory.
+    Get or create the read/write session factory.
     
     Returns:
         Session factory for creating database sessions
     """
     global async_session_factory
     if async_session_factory is None:
-        async_session_factory = async_sessionmaker(
-            bind=get_engine(),
-            class_=AsyncSession,
-            expire_on_commit=False,
-            autoflush=False,
-            autocommit=False,
-        )
+        async_session_factory = _create_session_factory(get_write_engine())
         logger.info("Session factory created")
     return async_session_factory
 
 
+def get_read_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    Get or create the read-only session factory.
+    
+    Returns:
+        Session factory for creating read-only database sessions
+    """
+    global read_session_factory
+    if read_session_factory is None:
+        read_session_factory = _create_session_factory(get_read_engine())
+        logger.info("Read-only session factory created")
+    return read_session_factory
+
+
 async def init_db() -> None:
     """
     Initialize the database schema.
@@ -79,26 +222,26 @@ async def init_db() -> None:
     logger.info("Initializing database schema...")
     
     # Import all models to ensure they're registered
-    from app.models import bot, credential, log  # noqa: F401
+    from app.models import bot, credential, enrichment_cache, log  # noqa: F401
     
-    async with get_engine().begin() as conn:
+    async with get_write_engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.exec_driver_sql("PRAGMA optimize")
     
     logger.info("Database schema initialized successfully")
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_write_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependency for FastAPI endpoints to get database sessions.
+    Dependency for FastAPI endpoints that modify the database.
     
     Yields:
         AsyncSession that automatically commits or rolls back
         
     Example:
-        @app.get("/bots")
-        async def list_bots(db: AsyncSession = Depends(get_db)):
-            result = await db.execute(select(Bot))
-            return result.scalars().all()
+        @app.delete("/bots/{bot_id}")
+        async def delete_bot(bot_id: int, db: AsyncSession = Depends(get_write_db)):
+            await db.execute(delete(Bot).where(Bot.id == bot_id))
     """
     factory = get_session_factory()
     async with factory() as session:
@@ -112,13 +255,127 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for FastAPI endpoints that only read from the database.
+    
+    Yields:
+        AsyncSession on a read-only connection
+        
+    Example:
+        @app.get("/bots")
+        async def list_bots(db: AsyncSession = Depends(get_read_db)):
+            result = await db.execute(select(Bot))
+            return result.scalars().all()
+    """
+    factory = get_read_session_factory()
+    async with factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def approx_count(session: AsyncSession, model: Any, *criteria: Any) -> int:
+    """
+    Estimate the number of rows in a model's table without a full scan.
+    
+    PostgreSQL answers from planner statistics: pg_class.reltuples for
+    the whole table, or the EXPLAIN row estimate when filtered. SQLite
+    reads unfiltered counts from sqlite_stat1, which PRAGMA optimize
+    keeps current; filtered counts, and tables not yet analyzed, fall
+    back to an exact COUNT.
+    
+    Args:
+        session: Active database session
+        model: ORM model class whose table is counted
+        *criteria: Optional WHERE clauses
+        
+    Returns:
+        Estimated row count
+    """
+    table = model.__table__
+    dialect = session.get_bind().dialect
+    
+    if dialect.name == "postgresql":
+        if not criteria:
+            estimate = await session.scalar(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:name AS regclass)"),
+                {"name": table.name}
+            )
+            # reltuples is -1 until the table has been analyzed
+            if estimate is not None and estimate >= 0:
+                return estimate
+        else:
+            query = select(table.c.id).where(*criteria).compile(
+                dialect=dialect,
+                compile_kwargs={"literal_binds": True}
+            )
+            # Sent as-is: text() would read any ":" in the rendered
+            # literals as a bind parameter
+            connection = await session.connection()
+            result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {query}")
+            plan = result.scalar()
+            if isinstance(plan, (str, bytes)):
+                plan = orjson.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+    elif not criteria:
+        try:
+            # The first number of any index's stat is the table row count
+            stat = await session.scalar(
+                text("SELECT stat FROM sqlite_stat1 WHERE tbl = :name LIMIT 1"),
+                {"name": table.name}
+            )
+        except OperationalError:
+            # sqlite_stat1 doesn't exist until the first ANALYZE
+            stat = None
+        if stat:
+            return int(stat.split()[0])
+    
+    return await session.scalar(
+        select(func.count()).select_from(table).where(*criteria)
+    )
+
+
+async def bulk_insert(
+    session: AsyncSession,
+    model: Any,
+    rows: Sequence[Dict[str, Any]]
+) -> List[int]:
+    """
+    Insert many rows of one model in a single executemany.
+    
+    The rows are sent as batched multi-row INSERT ... RETURNING
+    statements instead of one INSERT per ORM object at flush time. The
+    objects are not added to the session.
+    
+    Args:
+        session: Active database session
+        model: ORM model class to insert into
+        rows: Column values for each row
+        
+    Returns:
+        Primary keys of the inserted rows, in the order given
+    """
+    if not rows:
+        return []
+    
+    result = await session.execute(
+        insert(model).returning(model.id, sort_by_parameter_order=True),
+        rows
+    )
+    return list(result.scalars())
+
+
 async def close_db() -> None:
     """
     Close database connections.
     
     Should be called on application shutdown.
     """
-    global engine
+    global engine, read_engine
+    if read_engine is not None:
+        await read_engine.dispose()
     if engine is not None:
         await engine.dispose()
         logger.info("Database connections closed")
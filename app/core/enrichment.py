@@ -7,16 +7,48 @@ analyze captured data and enrich bot/payload metadata.
 
 import asyncio
 import hashlib
-from typing import Dict, Optional
+import re
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import httpx
+import orjson
+from sqlalchemy import select
 
+from app.core import enrichment_cache
+from app.core.cache import ttl_cache
 from app.core.config import settings
+from app.core.database import get_session_factory
+from app.core.http import get_http_client
 from app.core.logging import get_logger
+from app.core.notifier import send_notification
 
 logger = get_logger(__name__)
 
+# Reputation lookups repeat for every infection from the same botnet;
+# file hashes are immutable, so their verdicts are kept longer
+IP_REPUTATION_TTL = 24 * 60 * 60
+FILE_HASH_TTL = 7 * 24 * 60 * 60
 
+# Cached in place of a result for hashes VirusTotal has never seen (404);
+# hashes are immutable, so that answer is kept as long as a verdict
+VT_NOT_FOUND: Dict[str, Any] = {"not_found": True}
+
+# Matches exactly 64 hex digits (a SHA256 hex digest)
+_is_sha256_hex = re.compile(r"[0-9a-fA-F]{64}").fullmatch
+
+# Characters of text payload encoded per hashing chunk
+HASH_CHUNK_SIZE = 64 * 1024
+
+# Seconds to collect concurrent VirusTotal lookups before sending them
+VT_BATCH_WINDOW = 0.05
+
+# In-flight VirusTotal lookups keyed by raw digest, shared by concurrent callers
+_vt_pending: Dict[bytes, asyncio.Future] = {}
+_vt_batch: List[bytes] = []
+_vt_flush_task: Optional[asyncio.Task] = None
+
+
+@ttl_cache(seconds=IP_REPUTATION_TTL, maxsize=4096, cache_none=False)
 async def check_ip_reputation(ip: str) -> Optional[Dict[str, any]]:
     """
     Check IP reputation using AbuseIPDB.
@@ -38,6 +70,9 @@ async def check_ip_reputation(ip: str) -> Optional[Dict[str, any]]:
             "isWhitelisted": false
         }
         Returns None if API is disabled or request fails.
+        Successful results are cached in memory and in the database for
+        IP_REPUTATION_TTL; stale database entries are returned while a
+        background refresh runs.
         
     Example:
         result = await check_ip_reputation("192.168.1.100")
@@ -45,15 +80,38 @@ async def check_ip_reputation(ip: str) -> Optional[Dict[str, any]]:
             logger.warning(f"High abuse confidence: {ip}")
     """
     # Check if API is configured
-    if not settings.abuseipdb_api_key:
+    if not settings.integrations.abuseipdb_api_key:
         logger.debug("AbuseIPDB API disabled (no key configured)")
         return None
     
+    # Serve persisted results, refreshing stale ones in the background
+    cached, stale = await enrichment_cache.get(f"ip:{ip}", IP_REPUTATION_TTL)
+    if cached is not None:
+        if stale:
+            asyncio.create_task(_refresh_ip_reputation(ip))
+        return cached
+    
+    result = await _fetch_ip_reputation(ip)
+    if result is not None:
+        await enrichment_cache.put(f"ip:{ip}", "ip", result)
+    return result
+
+
+async def _refresh_ip_reputation(ip: str) -> None:
+    """Re-fetch a stale IP reputation and replace the cached copies."""
+    result = await _fetch_ip_reputation(ip)
+    if result is not None:
+        await enrichment_cache.put(f"ip:{ip}", "ip", result)
+        check_ip_reputation.cache_pop(ip)
+
+
+async def _fetch_ip_reputation(ip: str) -> Optional[Dict[str, any]]:
+    """Query AbuseIPDB for a single IP."""
     try:
         url = "https://api.abuseipdb.com/api/v2/check"
         
         headers = {
-            "Key": settings.abuseipdb_api_key,
+            "Key": settings.integrations.abuseipdb_api_key,
             "Accept": "application/json"
         }
         
@@ -63,37 +121,34 @@ async def check_ip_reputation(ip: str) -> Optional[Dict[str, any]]:
             "verbose": ""  # Include detailed report info
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await asyncio.wait_for(
-                client.get(url, headers=headers, params=params),
-                timeout=10.0
-            )
+        client = get_http_client()
+        response = await client.get(url, headers=headers, params=params)
+        
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                if "data" in data:
-                    result = data["data"]
-                    logger.info(
-                        f"AbuseIPDB: {ip} - Confidence: {result.get('abuseConfidenceScore', 0)}%, "
-                        f"Reports: {result.get('totalReports', 0)}"
-                    )
-                    return result
-                else:
-                    logger.warning(f"AbuseIPDB: Unexpected response format for {ip}")
-                    return None
-                    
-            elif response.status_code == 429:
-                logger.warning("AbuseIPDB: Rate limit exceeded")
-                return None
-            elif response.status_code == 401:
-                logger.error("AbuseIPDB: Invalid API key")
-                return None
+            if "data" in data:
+                result = data["data"]
+                logger.info(
+                    f"AbuseIPDB: {ip} - Confidence: {result.get('abuseConfidenceScore', 0)}%, "
+                    f"Reports: {result.get('totalReports', 0)}"
+                )
+                return result
             else:
-                logger.warning(f"AbuseIPDB: API returned status {response.status_code}")
+                logger.warning(f"AbuseIPDB: Unexpected response format for {ip}")
                 return None
                 
-    except asyncio.TimeoutError:
+        elif response.status_code == 429:
+            logger.warning("AbuseIPDB: Rate limit exceeded")
+            return None
+        elif response.status_code == 401:
+            logger.error("AbuseIPDB: Invalid API key")
+            return None
+        else:
+            logger.warning(f"AbuseIPDB: API returned status {response.status_code}")
+            return None
+            
+    except httpx.TimeoutException:
         logger.warning(f"AbuseIPDB: Timeout checking {ip}")
         return None
     except httpx.HTTPError as e:
@@ -125,6 +180,9 @@ async def check_file_hash(sha256_hash: str) -> Optional[Dict[str, any]]:
             "names": ["Trojan.Generic", "Win32.Malware"]
         }
         Returns None if API is disabled or request fails.
+        Successful results are cached in memory and in the database for
+        FILE_HASH_TTL; stale database entries are returned while a
+        background refresh runs.
         
     Example:
         result = await check_file_hash("abc123...")
@@ -132,76 +190,183 @@ async def check_file_hash(sha256_hash: str) -> Optional[Dict[str, any]]:
             logger.critical(f"Known malware detected! Score: {result['malicious']}/60")
     """
     # Check if API is configured
-    if not settings.virustotal_api_key:
+    if not settings.integrations.virustotal_api_key:
         logger.debug("VirusTotal API disabled (no key configured)")
         return None
     
     # Validate hash format
-    if not sha256_hash or len(sha256_hash) != 64:
+    if not sha256_hash or not _is_sha256_hex(sha256_hash):
         logger.warning(f"Invalid SHA256 hash format: {sha256_hash}")
         return None
     
+    return await check_file_digest(bytes.fromhex(sha256_hash))
+
+
+async def check_file_digest(digest: bytes) -> Optional[Dict[str, any]]:
+    """
+    Check a raw 32-byte SHA256 digest using VirusTotal.
+    
+    Same as check_file_hash, for callers that already hold the digest.
+    The in-memory cache and in-flight lookups are keyed on the raw bytes;
+    hex encoding happens only for the API URL and the persistent cache.
+    
+    Args:
+        digest: SHA256 digest (32 bytes)
+        
+    Returns:
+        Analysis results as returned by check_file_hash, or None
+    """
+    result = await _lookup_file_digest(digest)
+    return None if result == VT_NOT_FOUND else result
+
+
+@ttl_cache(seconds=FILE_HASH_TTL, maxsize=16384, cache_none=False)
+async def _lookup_file_digest(digest: bytes) -> Optional[Dict[str, any]]:
+    """
+    Look up a digest through the in-memory and persistent caches.
+    
+    Returns:
+        Analysis results, VT_NOT_FOUND for an unknown hash, or None if
+        the lookup failed and should be retried
+    """
+    # Check if API is configured
+    if not settings.integrations.virustotal_api_key:
+        logger.debug("VirusTotal API disabled (no key configured)")
+        return None
+    
+    # Serve persisted results, refreshing stale ones in the background
+    cached, stale = await enrichment_cache.get(f"vt:{digest.hex()}", FILE_HASH_TTL)
+    if cached is not None:
+        if stale:
+            asyncio.create_task(_refresh_file_digest(digest))
+        return cached
+    
+    return await asyncio.shield(_queue_vt_lookup(digest))
+
+
+def _queue_vt_lookup(digest: bytes) -> asyncio.Future:
+    """
+    Queue a digest for the next VirusTotal batch.
+    
+    Returns:
+        Future resolved with the lookup result, shared with any
+        in-flight lookup for the same digest
+    """
+    global _vt_flush_task
+    
+    future = _vt_pending.get(digest)
+    if future is None:
+        future = asyncio.get_running_loop().create_future()
+        _vt_pending[digest] = future
+        _vt_batch.append(digest)
+        if _vt_flush_task is None:
+            _vt_flush_task = asyncio.create_task(_flush_vt_batch())
+    
+    return future
+
+
+async def _refresh_file_digest(digest: bytes) -> None:
+    """Re-fetch a stale VirusTotal verdict and replace the cached copies."""
+    result = await _queue_vt_lookup(digest)
+    if result is not None:
+        _lookup_file_digest.cache_pop(digest)
+
+
+async def _flush_vt_batch() -> None:
+    """
+    Resolve every hash queued during the batch window.
+    
+    Hashes submitted within VT_BATCH_WINDOW share one drain, and each
+    distinct hash is looked up once no matter how many callers await it.
+    """
+    global _vt_flush_task
+    
+    await asyncio.sleep(VT_BATCH_WINDOW)
+    
+    # Hashes queued from here on start the next batch
+    _vt_flush_task = None
+    batch = _vt_batch[:]
+    _vt_batch.clear()
+    
+    results = await asyncio.gather(*(_fetch_file_hash(digest.hex()) for digest in batch))
+    for digest, result in zip(batch, results):
+        future = _vt_pending.pop(digest)
+        if not future.done():
+            future.set_result(result)
+    
+    # Unknown hashes are persisted as VT_NOT_FOUND; None means a rate
+    # limit, auth failure or transport error, which is worth retrying
+    await asyncio.gather(*(
+        enrichment_cache.put(f"vt:{digest.hex()}", "vt", result)
+        for digest, result in zip(batch, results)
+        if result is not None
+    ))
+
+
+async def _fetch_file_hash(sha256_hash: str) -> Optional[Dict[str, any]]:
+    """Query VirusTotal for a single validated hash."""
     try:
         url = f"https://www.virustotal.com/api/v3/files/{sha256_hash}"
         
         headers = {
-            "x-apikey": settings.virustotal_api_key,
+            "x-apikey": settings.integrations.virustotal_api_key,
             "Accept": "application/json"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await asyncio.wait_for(
-                client.get(url, headers=headers),
-                timeout=10.0
-            )
+        client = get_http_client()
+        response = await client.get(url, headers=headers)
+        
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
             
-            if response.status_code == 200:
-                data = response.json()
+            if "data" in data and "attributes" in data["data"]:
+                attrs = data["data"]["attributes"]
+                stats = attrs.get("last_analysis_stats", {})
                 
-                if "data" in data and "attributes" in data["data"]:
-                    attrs = data["data"]["attributes"]
-                    stats = attrs.get("last_analysis_stats", {})
-                    
-                    # Extract detection names
-                    results = attrs.get("last_analysis_results", {})
-                    detection_names = list(set([
-                        r.get("result", "")
-                        for r in results.values()
-                        if r.get("category") == "malicious" and r.get("result")
-                    ]))[:10]  # Limit to 10 unique names
-                    
-                    result = {
-                        "malicious": stats.get("malicious", 0),
-                        "suspicious": stats.get("suspicious", 0),
-                        "undetected": stats.get("undetected", 0),
-                        "total_vendors": sum(stats.values()),
-                        "first_seen": attrs.get("first_submission_date"),
-                        "names": detection_names
-                    }
-                    
-                    logger.info(
-                        f"VirusTotal: {sha256_hash[:16]}... - "
-                        f"Malicious: {result['malicious']}/{result['total_vendors']}"
-                    )
-                    return result
-                else:
-                    logger.warning(f"VirusTotal: Unexpected response format")
-                    return None
-                    
-            elif response.status_code == 404:
-                logger.info(f"VirusTotal: Hash not found (unknown file)")
-                return None
-            elif response.status_code == 429:
-                logger.warning("VirusTotal: Rate limit exceeded")
-                return None
-            elif response.status_code == 401:
-                logger.error("VirusTotal: Invalid API key")
-                return None
+                # Extract up to 10 unique detection names, in vendor order
+                results = attrs.get("last_analysis_results", {})
+                seen = set()
+                detection_names = []
+                for r in results.values():
+                    name = r.get("result")
+                    if name and r.get("category") == "malicious" and name not in seen:
+                        seen.add(name)
+                        detection_names.append(name)
+                        if len(detection_names) == 10:
+                            break
+                
+                result = {
+                    "malicious": stats.get("malicious", 0),
+                    "suspicious": stats.get("suspicious", 0),
+                    "undetected": stats.get("undetected", 0),
+                    "total_vendors": sum(stats.values()),
+                    "first_seen": attrs.get("first_submission_date"),
+                    "names": detection_names
+                }
+                
+                logger.info(
+                    f"VirusTotal: {sha256_hash[:16]}... - "
+                    f"Malicious: {result['malicious']}/{result['total_vendors']}"
+                )
+                return result
             else:
-                logger.warning(f"VirusTotal: API returned status {response.status_code}")
+                logger.warning(f"VirusTotal: Unexpected response format")
                 return None
                 
-    except asyncio.TimeoutError:
+        elif response.status_code == 404:
+            logger.info(f"VirusTotal: Hash not found (unknown file)")
+            return VT_NOT_FOUND
+        elif response.status_code == 429:
+            logger.warning("VirusTotal: Rate limit exceeded")
+            return None
+        elif response.status_code == 401:
+            logger.error("VirusTotal: Invalid API key")
+            return None
+        else:
+            logger.warning(f"VirusTotal: API returned status {response.status_code}")
+            return None
+            
+    except httpx.TimeoutException:
         logger.warning(f"VirusTotal: Timeout checking hash")
         return None
     except httpx.HTTPError as e:
@@ -212,12 +377,59 @@ async def check_file_hash(sha256_hash: str) -> Optional[Dict[str, any]]:
         return None
 
 
-def calculate_sha256(data: bytes) -> str:
+def iter_utf8_chunks(text: str, chunk_size: int = HASH_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Encode text to UTF-8 piece by piece.
+    
+    UTF-8 encodes each code point independently, so the concatenated
+    chunks equal text.encode("utf-8") without building that copy.
+    
+    Args:
+        text: Text to encode
+        chunk_size: Characters encoded per chunk
+        
+    Yields:
+        UTF-8 encoded chunks
+    """
+    for start in range(0, len(text), chunk_size):
+        yield text[start:start + chunk_size].encode("utf-8")
+
+
+def calculate_sha256_digest(data: Union[bytes, Iterable[bytes], BinaryIO]) -> bytes:
+    """
+    Calculate the raw SHA256 digest of binary data.
+    
+    Large payloads can be hashed incrementally from a chunk iterator or
+    a binary file object, so they never need to be held in one buffer.
+    
+    Args:
+        data: Bytes, an iterable of byte chunks, or a binary file object
+        
+    Returns:
+        32-byte SHA256 digest
+        
+    Example:
+        digest = calculate_sha256_digest(payload_bytes)
+        vt_result = await check_file_digest(digest)
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(data).digest()
+    
+    if hasattr(data, "read"):
+        return hashlib.file_digest(data, "sha256").digest()
+    
+    digest = hashlib.sha256()
+    for chunk in data:
+        digest.update(chunk)
+    return digest.digest()
+
+
+def calculate_sha256(data: Union[bytes, Iterable[bytes], BinaryIO]) -> str:
     """
     Calculate SHA256 hash of binary data.
     
     Args:
-        data: Binary data to hash
+        data: Bytes, an iterable of byte chunks, or a binary file object
         
     Returns:
         64-character hexadecimal SHA256 hash
@@ -226,27 +438,196 @@ def calculate_sha256(data: bytes) -> str:
         hash_value = calculate_sha256(payload_bytes)
         vt_result = await check_file_hash(hash_value)
     """
-    return hashlib.sha256(data).hexdigest()
+    return calculate_sha256_digest(data).hex()
+
+
+# Queued by EnrichmentWriter.stop() to end its task after a final flush
+_STOP = object()
+
+
+class EnrichmentWriter:
+    """
+    Applies enrichment results to bots in batched transactions.
+    
+    Enrichment runs as fire-and-forget tasks that outlive the session of
+    the request that spawned them, so results are queued here and
+    written by one background task: updates arriving within
+    ``interval`` seconds (up to ``max_batch``) share a single commit.
+    """
+    
+    def __init__(self, max_batch: int = 100, interval: float = 0.1, maxsize: int = 10_000):
+        self.max_batch = max_batch
+        self.interval = interval
+        self._queue: asyncio.Queue | None = None
+        self._maxsize = maxsize
+        self._task: asyncio.Task | None = None
+    
+    def submit(
+        self,
+        bot_id: int,
+        extra_data: Dict[str, Any],
+        campaign_tag: Optional[str] = None
+    ) -> None:
+        """
+        Queue an update for a bot.
+        
+        Args:
+            bot_id: Database ID of the bot
+            extra_data: Keys merged into the bot's extra_data JSON
+                (nested dicts are merged one level deep)
+            campaign_tag: Tag appended to campaign_id, if not present
+        """
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue(maxsize=self._maxsize)
+            self._task = asyncio.create_task(self._run())
+        
+        try:
+            self._queue.put_nowait((bot_id, extra_data, campaign_tag))
+        except asyncio.QueueFull:
+            logger.warning(f"Enrichment queue full, dropping update for bot {bot_id}")
+    
+    async def _run(self) -> None:
+        """Drain the queue in batches until stop() queues _STOP."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.interval
+            
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            await self._flush(batch)
+        
+        # Updates submitted after stop() queued the sentinel
+        await self._flush(self._drain())
+    
+    def _drain(self) -> List[Tuple[int, Dict[str, Any], Optional[str]]]:
+        """Take every update still in the queue, skipping stop sentinels."""
+        pending = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                pending.append(item)
+        return pending
+    
+    async def _flush(self, batch: List[Tuple[int, Dict[str, Any], Optional[str]]]) -> None:
+        """Apply a batch, logging rather than raising on failure."""
+        if not batch:
+            return
+        try:
+            await self._apply(batch)
+        except Exception as e:
+            logger.error(f"Failed to store {len(batch)} enrichment update(s): {e}")
+    
+    async def _apply(self, batch: List[Tuple[int, Dict[str, Any], Optional[str]]]) -> None:
+        """Write a batch of updates in one transaction."""
+        from app.models.bot import Bot
+        
+        updates: Dict[int, Tuple[Dict[str, Any], List[str]]] = {}
+        for bot_id, extra_data, campaign_tag in batch:
+            patch, tags = updates.setdefault(bot_id, ({}, []))
+            _merge_extra_data(patch, extra_data)
+            if campaign_tag and campaign_tag not in tags:
+                tags.append(campaign_tag)
+        
+        async with get_session_factory()() as session:
+            result = await session.execute(select(Bot).where(Bot.id.in_(updates)))
+            for bot in result.scalars():
+                patch, tags = updates[bot.id]
+                
+                current = _load_extra_data(bot.extra_data)
+                _merge_extra_data(current, patch)
+                bot.extra_data = current
+                
+                existing_tags = bot.campaign_id.split("|") if bot.campaign_id else []
+                for tag in tags:
+                    if tag not in existing_tags:
+                        existing_tags.append(tag)
+                bot.campaign_id = "|".join(existing_tags) or None
+            
+            await session.commit()
+        
+        logger.debug(f"Stored {len(batch)} enrichment update(s) for {len(updates)} bot(s)")
+    
+    async def stop(self) -> None:
+        """Write any queued updates and stop the background task."""
+        if self._task is None:
+            return
+        
+        # The task flushes the batch it is collecting and everything still
+        # queued before returning; cancelling it would drop that batch
+        if not self._task.done():
+            await self._queue.put(_STOP)
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        
+        # Left behind only if the task had died
+        await self._flush(self._drain())
+
+
+def _load_extra_data(data: Any) -> Dict[str, Any]:
+    """Copy a bot's extra_data for merging, wrapping non-object values."""
+    if not data:
+        return {}
+    if not isinstance(data, dict):
+        return {"raw": data}
+    # Nested dicts are merged in place, so copy them too
+    return {key: dict(value) if isinstance(value, dict) else value for key, value in data.items()}
+
+
+def _merge_extra_data(target: Dict[str, Any], patch: Dict[str, Any]) -> None:
+    """Merge patch into target, combining nested dicts one level deep."""
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            target[key].update(value)
+        else:
+            target[key] = value
+
+
+# Global enrichment writer instance
+enrichment_writer = EnrichmentWriter()
+
+
+def get_enrichment_writer() -> EnrichmentWriter:
+    """
+    Get the global enrichment writer.
+    
+    Returns:
+        EnrichmentWriter instance
+    """
+    return enrichment_writer
 
 
 async def enrich_bot_with_ip_reputation(
     ip: str,
-    bot_obj: any,
-    session: any
+    bot_id: int
 ) -> None:
     """
-    Enrich bot object with IP reputation data.
+    Enrich bot with IP reputation data.
     
     Checks AbuseIPDB and updates bot metadata if high abuse score detected.
     This is a fire-and-forget operation that doesn't block main processing.
     
     Args:
         ip: IP address to check
-        bot_obj: Bot SQLAlchemy object to update
-        session: Active database session
+        bot_id: Database ID of the bot to update
         
     Side Effects:
-        Updates bot.extra_data with reputation info
+        Queues bot.extra_data reputation info on the enrichment writer
         Tags bot as "Scanner/Malicious Actor" if abuse score > 80
     """
     try:
@@ -254,12 +635,9 @@ async def enrich_bot_with_ip_reputation(
         
         if reputation:
             abuse_score = reputation.get("abuseConfidenceScore", 0)
+            campaign_tag = None
             
-            # Update bot extra_data with reputation info
-            if not bot_obj.extra_data:
-                bot_obj.extra_data = {}
-            
-            bot_obj.extra_data["ip_reputation"] = {
+            ip_reputation = {
                 "abuse_score": abuse_score,
                 "isp": reputation.get("isp"),
                 "country": reputation.get("countryCode"),
@@ -276,14 +654,10 @@ async def enrich_bot_with_ip_reputation(
                 )
                 
                 # Add tag to campaign_id field (can be used for filtering)
-                if bot_obj.campaign_id:
-                    bot_obj.campaign_id = f"{bot_obj.campaign_id}|SCANNER"
-                else:
-                    bot_obj.campaign_id = "SCANNER"
+                campaign_tag = "SCANNER"
                 
                 # Send Telegram alert if configured
                 try:
-                    from app.core.notifier import send_notification
                     await send_notification(
                         title="🚨 Malicious IP Detected",
                         message=(
@@ -298,7 +672,11 @@ async def enrich_bot_with_ip_reputation(
                 except Exception as e:
                     logger.debug(f"Telegram alert failed: {e}")
             
-            await session.commit()
+            enrichment_writer.submit(
+                bot_id,
+                {"ip_reputation": ip_reputation},
+                campaign_tag=campaign_tag
+            )
             logger.info(f"IP reputation enrichment completed for {ip}")
             
     except Exception as e:
@@ -306,48 +684,44 @@ async def enrich_bot_with_ip_reputation(
 
 
 async def enrich_payload_with_hash_check(
-    payload_data: bytes,
-    log_obj: any,
-    session: any
+    payload_data: Union[bytes, Iterable[bytes], BinaryIO],
+    bot_id: int
 ) -> None:
     """
-    Enrich log/payload with VirusTotal hash analysis.
+    Enrich a captured payload with VirusTotal hash analysis.
     
     Calculates SHA256 of payload and checks VirusTotal for known malware.
     Sends alert if malicious detection count is high.
     
     Args:
-        payload_data: Binary payload data
-        log_obj: Log SQLAlchemy object to update
-        session: Active database session
+        payload_data: Binary payload data or chunks (see calculate_sha256)
+        bot_id: Database ID of the bot that sent the payload
         
     Side Effects:
-        Updates log.extra_data with VT analysis
+        Queues the VT analysis under the bot's extra_data["virustotal"],
+        keyed by SHA256 (logs have no extra_data column)
         Sends Telegram alert if malware detected
     """
     try:
         # Calculate hash
-        sha256 = calculate_sha256(payload_data)
+        digest = calculate_sha256_digest(payload_data)
+        del payload_data  # Don't hold the payload while awaiting VirusTotal
+        sha256 = digest.hex()  # For alerts and stored results
         logger.debug(f"Calculated SHA256: {sha256[:16]}...")
         
         # Check VirusTotal
-        vt_result = await check_file_hash(sha256)
+        vt_result = await check_file_digest(digest)
         
         if vt_result:
             malicious_count = vt_result.get("malicious", 0)
             total_vendors = vt_result.get("total_vendors", 0)
             
-            # Update log extra_data
-            if not log_obj.extra_data:
-                log_obj.extra_data = {}
-            
-            log_obj.extra_data["virustotal"] = {
-                "sha256": sha256,
+            enrichment_writer.submit(bot_id, {"virustotal": {sha256: {
                 "malicious": malicious_count,
                 "suspicious": vt_result.get("suspicious", 0),
                 "total_vendors": total_vendors,
                 "detection_names": vt_result.get("names", [])
-            }
+            }}})
             
             # Alert if known malware
             if malicious_count > 0:
@@ -358,7 +732,6 @@ async def enrich_payload_with_hash_check(
                 
                 # Send Telegram alert
                 try:
-                    from app.core.notifier import send_notification
                     detections = ", ".join(vt_result.get("names", [])[:3])
                     await send_notification(
                         title=f"🚨 Known Malware Detected (VT Score: {malicious_count}/{total_vendors})",
@@ -373,8 +746,30 @@ async def enrich_payload_with_hash_check(
                 except Exception as e:
                     logger.debug(f"Telegram alert failed: {e}")
             
-            await session.commit()
             logger.info(f"VirusTotal enrichment completed: {malicious_count}/{total_vendors}")
             
     except Exception as e:
         logger.error(f"Payload enrichment failed: {e}")
+
+
+async def enrich_bot_and_payloads(
+    bot_id: int,
+    ip: Optional[str] = None,
+    payloads: Iterable[Union[bytes, Iterable[bytes], BinaryIO]] = ()
+) -> None:
+    """
+    Run IP reputation and payload hash enrichment for a bot concurrently.
+    
+    Each lookup is network-bound and independent, so they overlap under
+    gather() and their results reach the enrichment writer together.
+    
+    Args:
+        bot_id: Database ID of the bot
+        ip: IP address to check, or None to skip the reputation lookup
+        payloads: Payloads to hash and check (see calculate_sha256)
+    """
+    lookups = [enrich_payload_with_hash_check(payload, bot_id) for payload in payloads]
+    if ip:
+        lookups.append(enrich_bot_with_ip_reputation(ip, bot_id))
+    
+    await asyncio.gather(*lookups)
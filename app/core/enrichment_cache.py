@@ -0,0 +1,82 @@
+"""
+Persistent cache for threat intelligence lookups.
+
+Backs the in-memory enrichment caches with the enrichment_cache table
+so results survive restarts. Callers serve stale entries immediately
+and refresh them in the background (stale-while-revalidate).
+"""
+
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from app.core.database import get_read_session_factory, get_session_factory
+from app.core.logging import get_logger
+from app.models.enrichment_cache import EnrichmentCacheEntry
+
+logger = get_logger(__name__)
+
+
+async def get(key: str, ttl: float) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Look up a cached enrichment result.
+    
+    Args:
+        key: Cache key (e.g. "ip:1.2.3.4")
+        ttl: Seconds after fetching that an entry counts as fresh
+    
+    Returns:
+        Tuple of (payload, is_stale). Payload is None on a miss or if
+        the cache cannot be read.
+    """
+    try:
+        async with get_read_session_factory()() as session:
+            result = await session.execute(
+                select(EnrichmentCacheEntry.payload, EnrichmentCacheEntry.fetched_at)
+                .where(EnrichmentCacheEntry.key == key)
+            )
+            row = result.first()
+    except Exception as e:
+        logger.debug(f"Enrichment cache read failed for {key}: {e}")
+        return None, False
+    
+    if row is None:
+        return None, False
+    
+    return orjson.loads(row.payload), row.fetched_at + ttl <= time.time()
+
+
+async def put(key: str, kind: str, payload: Dict[str, Any]) -> None:
+    """
+    Store or replace a cached enrichment result.
+    
+    Args:
+        key: Cache key (e.g. "ip:1.2.3.4")
+        kind: Lookup type ("ip" or "vt")
+        payload: JSON-serializable result
+    """
+    values = {
+        "key": key,
+        "kind": kind,
+        "payload": orjson.dumps(payload),
+        "fetched_at": int(time.time()),
+    }
+    statement = insert(EnrichmentCacheEntry).values(**values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[EnrichmentCacheEntry.key],
+        set_={
+            "kind": statement.excluded.kind,
+            "payload": statement.excluded.payload,
+            "fetched_at": statement.excluded.fetched_at,
+        },
+    )
+    
+    try:
+        async with get_session_factory()() as session:
+            await session.execute(statement)
+            await session.commit()
+    except Exception as e:
+        logger.debug(f"Enrichment cache write failed for {key}: {e}")
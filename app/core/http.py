@@ -0,0 +1,50 @@
+"""
+Shared HTTP client for outbound API calls.
+
+Threat intelligence lookups and Telegram notifications reuse one pooled
+client, so repeated calls to the same host skip DNS, TCP and TLS setup.
+"""
+
+import httpx
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Per-phase limits; a timed-out request still returns its connection to
+# the pool instead of being cancelled mid-read
+DEFAULT_TIMEOUT = httpx.Timeout(connect=3.0, read=10.0, write=3.0, pool=1.0)
+
+# Global client, created on first use inside the running event loop
+http_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get or create the shared async HTTP client.
+    
+    Returns:
+        AsyncClient with keep-alive pooling and HTTP/2 enabled
+    """
+    global http_client
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=DEFAULT_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=128),
+        )
+        logger.info("HTTP client created")
+    return http_client
+
+
+async def close_http_client() -> None:
+    """
+    Close pooled HTTP connections.
+    
+    Should be called on application shutdown.
+    """
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+        logger.info("HTTP client closed")
@@ -3,16 +3,63 @@ Structured logging configuration for KeyChaser.
 
 Provides dual output (console + file) with color-coded console logs
 and detailed file logs including malware traffic analysis metadata.
+Console and file output happen on background listener threads, and
+records are formatted there too, so logging from the event loop never
+blocks on I/O or on formatting a traceback.
 """
 
+import atexit
+import copy
 import logging
+import queue
 import sys
-from datetime import datetime
+from datetime import date
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 from app.core.config import settings
 
+# Rotate log files at 50 MB, keeping five old copies
+LOG_FILE_MAX_BYTES = 50_000_000
+LOG_FILE_BACKUP_COUNT = 5
+
+# One queue-backed handler (and listener thread) per log file
+_file_queue_handlers: Dict[str, QueueHandler] = {}
+_file_listeners: Dict[str, QueueListener] = {}
+
+# Shared queue-backed console handler, created on first use
+_console_queue_handler: Optional[QueueHandler] = None
+_console_listener: Optional[QueueListener] = None
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves most formatting to the listener thread.
+    
+    The stock QueueHandler fully formats each record in the logging
+    thread so it can be pickled. These queues never leave the process,
+    so only the message and any traceback are resolved here, while the
+    %-args still hold their call-time values; timestamps, layout and
+    colors are applied by the listener. Each handler queues its own
+    copy, so listeners never share a record.
+    """
+    
+    # Only used for formatException(), which keeps no state
+    _exception_formatter = logging.Formatter()
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            # The rendered text is enough; don't keep frames alive in the queue
+            record.exc_info = None
+        return record
+
 
 class ColoredFormatter(logging.Formatter):
     """
@@ -32,13 +79,48 @@ class ColoredFormatter(logging.Formatter):
         'RESET': '\033[0m'
     }
     
+    def __init__(self, *args, use_color: Optional[bool] = None, **kwargs):
+        """
+        Args:
+            use_color: Emit ANSI codes (defaults to whether stdout is a TTY)
+        """
+        super().__init__(*args, **kwargs)
+        self.use_color = sys.stdout.isatty() if use_color is None else use_color
+    
     def format(self, record: logging.LogRecord) -> str:
         """Apply color formatting to log level."""
-        color = self.COLORS.get(record.levelname, self.COLORS['RESET'])
-        record.levelname = f"{color}{record.levelname}{self.COLORS['RESET']}"
+        if not self.use_color:
+            return super().format(record)
+        
+        # The record is shared with the file listener thread, so color a copy
+        levelname = record.levelname
+        color = self.COLORS.get(levelname, self.COLORS['RESET'])
+        record = logging.makeLogRecord(record.__dict__)
+        record.levelname = f"{color}{levelname}{self.COLORS['RESET']}"
         return super().format(record)
 
 
+# Resolved once; settings don't change after import
+_LOG_LEVEL = getattr(logging, settings.log_level.upper())
+_CONSOLE_LEVEL = logging.DEBUG if settings.debug else logging.INFO
+
+# Formatters are stateless, so every handler shares these instances
+_CONSOLE_FORMATTER = ColoredFormatter(
+    fmt='%(asctime)s | %(levelname)s | %(name)s | %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+_FILE_FORMATTER = logging.Formatter(
+    fmt='%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+
+@lru_cache(maxsize=1)
+def _daily_log_filename(day: int) -> str:
+    """Default log file name for a date, given as a proleptic ordinal."""
+    return f"keychaser_{date.fromordinal(day):%Y%m%d}.log"
+
+
 def setup_logger(name: str, log_file: Optional[str] = None) -> logging.Logger:
     """
     Configure a logger with console and optional file handlers.
@@ -51,40 +133,111 @@ def setup_logger(name: str, log_file: Optional[str] = None) -> logging.Logger:
         Configured logger instance
     """
     logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, settings.log_level.upper()))
+    logger.setLevel(_LOG_LEVEL)
     
     # Prevent duplicate handlers
     if logger.handlers:
         return logger
     
     # Console handler with colors
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.DEBUG if settings.debug else logging.INFO)
-    console_formatter = ColoredFormatter(
-        fmt='%(asctime)s | %(levelname)s | %(name)s | %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+    logger.addHandler(_get_console_queue_handler())
     
     # File handler (if enabled)
     if settings.log_to_file:
         if log_file is None:
-            log_file = f"keychaser_{datetime.now().strftime('%Y%m%d')}.log"
+            log_file = _daily_log_filename(date.today().toordinal())
         
-        file_path = settings.log_path / log_file
-        file_handler = logging.FileHandler(file_path, encoding='utf-8')
-        file_handler.setLevel(logging.DEBUG)
-        file_formatter = logging.Formatter(
-            fmt='%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        logger.addHandler(_get_file_queue_handler(log_file))
     
     return logger
 
 
+def _get_console_queue_handler() -> QueueHandler:
+    """
+    Get the queue handler feeding the console, starting its listener.
+    
+    Returns:
+        QueueHandler to attach to loggers
+    """
+    global _console_queue_handler, _console_listener
+    if _console_queue_handler is not None:
+        return _console_queue_handler
+    
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(_CONSOLE_LEVEL)
+    console_handler.setFormatter(_CONSOLE_FORMATTER)
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _console_listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+    _console_listener.start()
+    
+    # Drop records the console would ignore before they are queued
+    _console_queue_handler = DeferredQueueHandler(log_queue)
+    _console_queue_handler.setLevel(_CONSOLE_LEVEL)
+    return _console_queue_handler
+
+
+def _get_file_queue_handler(log_file: str) -> QueueHandler:
+    """
+    Get the queue handler feeding a log file, starting its listener.
+    
+    Loggers sharing a log file share one rotating file handler, which
+    is driven from the listener thread.
+    
+    Args:
+        log_file: Log file name inside settings.log_path
+        
+    Returns:
+        QueueHandler to attach to loggers
+    """
+    handler = _file_queue_handlers.get(log_file)
+    if handler is not None:
+        return handler
+    
+    file_path = settings.log_path / log_file
+    file_handler = RotatingFileHandler(
+        file_path,
+        maxBytes=LOG_FILE_MAX_BYTES,
+        backupCount=LOG_FILE_BACKUP_COUNT,
+        encoding='utf-8'
+    )
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(_FILE_FORMATTER)
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    
+    handler = DeferredQueueHandler(log_queue)
+    _file_queue_handlers[log_file] = handler
+    _file_listeners[log_file] = listener
+    return handler
+
+
+def stop_log_listeners() -> None:
+    """
+    Flush queued log records and stop the listener threads.
+    
+    Registered with atexit so records logged during application
+    shutdown still reach the console and disk.
+    """
+    global _console_queue_handler, _console_listener
+    if _console_listener is not None:
+        _console_listener.stop()
+        _console_listener = None
+        _console_queue_handler = None
+    
+    while _file_listeners:
+        log_file, listener = _file_listeners.popitem()
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        _file_queue_handlers.pop(log_file, None)
+
+
+atexit.register(stop_log_listeners)
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get or create a logger for the specified module.
@@ -5,12 +5,13 @@ Sends real-time alerts to Telegram when critical events occur
 (new infections, credential theft, YARA detections).
 """
 
-import asyncio
 from typing import Optional
 
 import httpx
+import orjson
 
 from app.core.config import settings
+from app.core.http import get_http_client
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -25,6 +26,23 @@ LEVEL_EMOJI = {
     "SUCCESS": "\u2705",         # ✅ Check mark
 }
 
+# Telegram alerts give up sooner than threat intel lookups
+TELEGRAM_TIMEOUT = httpx.Timeout(connect=3.0, read=5.0, write=3.0, pool=1.0)
+
+# Message shapes, bound once at import and filled per alert
+_NOTIFICATION_TEMPLATE = "{emoji} <b>{title}</b>\n\n{message}".format
+_CREDENTIAL_TEMPLATE = (
+    "<b>Type:</b> {cred_type}\n"
+    "<b>Bot:</b> {bot_id}\n"
+    "<b>IP:</b> {ip_address}"
+    "{url_info}"
+).format
+_YARA_TEMPLATE = (
+    "<b>IP:</b> {ip_address}\n"
+    "<b>Protocol:</b> {protocol}\n"
+    "<b>Matched Rules:</b>\n{rules_list}"
+).format
+
 
 async def send_notification(
     title: str,
@@ -54,7 +72,7 @@ async def send_notification(
         )
     """
     # Check if Telegram is configured
-    if not settings.telegram_bot_token or not settings.telegram_chat_id:
+    if not settings.integrations.telegram_bot_token or not settings.integrations.telegram_chat_id:
         logger.debug("Telegram notifications disabled (no credentials configured)")
         return False
     
@@ -63,37 +81,39 @@ async def send_notification(
         emoji = LEVEL_EMOJI.get(level.upper(), "\ud83d\udd14")  # 🔔 default
         
         # Construct formatted message
-        formatted_text = f"{emoji} <b>{title}</b>\n\n{message}"
+        formatted_text = _NOTIFICATION_TEMPLATE(emoji=emoji, title=title, message=message)
         
         # Telegram API URL
-        url = f"https://api.telegram.org/bot{settings.telegram_bot_token}/sendMessage"
+        url = f"https://api.telegram.org/bot{settings.integrations.telegram_bot_token}/sendMessage"
         
         # Payload
         payload = {
-            "chat_id": settings.telegram_chat_id,
+            "chat_id": settings.integrations.telegram_chat_id,
             "text": formatted_text,
             "parse_mode": "HTML",
             "disable_web_page_preview": True  # Prevent URL previews
         }
         
-        # Send async HTTP request with timeout
-        async with httpx.AsyncClient() as client:
-            response = await asyncio.wait_for(
-                client.post(url, json=payload),
-                timeout=5.0  # 5 second timeout
+        # Send async HTTP request on the shared pooled client
+        client = get_http_client()
+        response = await client.post(
+            url,
+            content=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=TELEGRAM_TIMEOUT
+        )
+        
+        if response.status_code == 200:
+            logger.info(f"Telegram notification sent: {level} - {title}")
+            return True
+        else:
+            logger.warning(
+                f"Telegram API returned status {response.status_code}: "
+                f"{response.text}"
             )
+            return False
             
-            if response.status_code == 200:
-                logger.info(f"Telegram notification sent: {level} - {title}")
-                return True
-            else:
-                logger.warning(
-                    f"Telegram API returned status {response.status_code}: "
-                    f"{response.text}"
-                )
-                return False
-                
-    except asyncio.TimeoutError:
+    except httpx.TimeoutException:
         logger.warning("Telegram notification timeout (API unreachable)")
         return False
     except httpx.HTTPError as e:
@@ -128,11 +148,11 @@ async def send_credential_alert(
     
     return await send_notification(
         title=f"\ud83d\udd11 Credentials Stolen ({count})",
-        message=(
-            f"<b>Type:</b> {cred_type}\n"
-            f"<b>Bot:</b> {bot_id}\n"
-            f"<b>IP:</b> {ip_address}"
-            f"{url_info}"
+        message=_CREDENTIAL_TEMPLATE(
+            cred_type=cred_type,
+            bot_id=bot_id,
+            ip_address=ip_address,
+            url_info=url_info
         ),
         level="CRITICAL"
     )
@@ -154,14 +174,14 @@ async def send_yara_alert(
     Returns:
         True if notification sent successfully
     """
-    rules_list = "\n".join([f"• {rule}" for rule in matched_rules])
+    rules_list = "• " + "\n• ".join(matched_rules) if matched_rules else ""
     
     return await send_notification(
         title="\ud83d\udea8 YARA Detection",
-        message=(
-            f"<b>IP:</b> {ip_address}\n"
-            f"<b>Protocol:</b> {protocol}\n"
-            f"<b>Matched Rules:</b>\n{rules_list}"
+        message=_YARA_TEMPLATE(
+            ip_address=ip_address,
+            protocol=protocol,
+            rules_list=rules_list
         ),
         level="CRITICAL"
     )
@@ -5,30 +5,137 @@ Implements secure authentication using JWT tokens and bcrypt password hashing.
 Follows OWASP best practices for credential management.
 """
 
-from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import HTTPException, status, Depends
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+import bcrypt
+import jwt
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.core.config import settings
 
-# Password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt work factor for new hashes; raised by calibrate_bcrypt_cost()
+# at startup. Existing $2b$ hashes verify unchanged.
+BCRYPT_MAX_ROUNDS = 16
+_bcrypt_rounds = settings.bcrypt_rounds
+
+# Dedicated pool for password hashing, created on first use. bcrypt
+# releases the GIL, so threads hash on all cores in parallel without
+# starving the default executor during login bursts.
+_password_executor: Optional[ThreadPoolExecutor] = None
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
 # JWT Configuration
 ALGORITHM = "HS256"
+_ALGORITHMS = [ALGORITHM]
+_DECODE_OPTIONS = {"require": ["exp", "sub"]}
+_SECRET_KEY = settings.secret_key.encode("utf-8")
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
+ACCESS_TOKEN_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+# Verified token claims keyed by a 128-bit BLAKE2b digest of the raw token,
+# so repeated requests with the same bearer token skip signature verification
+TOKEN_CACHE_MAX_ENTRIES = 10_000
+_token_cache: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+
+# Tokens revoked via logout (this process only), mapped to their expiry
+_revoked_tokens: Dict[bytes, float] = {}
+
+
+def get_password_executor() -> ThreadPoolExecutor:
+    """
+    Get or create the password hashing executor.
+    
+    Returns:
+        ThreadPoolExecutor sized to the CPU count
+    """
+    global _password_executor
+    if _password_executor is None:
+        _password_executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 4,
+            thread_name_prefix="bcrypt",
+        )
+    return _password_executor
+
+
+def close_password_executor() -> None:
+    """
+    Shut down the password hashing executor.
+    
+    Should be called on application shutdown.
+    """
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=True)
+        _password_executor = None
+
+
+async def calibrate_bcrypt_cost(target_ms: Optional[float] = None) -> int:
+    """
+    Pick the bcrypt cost factor for this host.
+    
+    Times one throwaway hash and uses the largest cost whose estimated
+    hash time stays under the target (each extra round doubles the work).
+    Never goes below settings.bcrypt_rounds.
+    
+    Args:
+        target_ms: Latency budget per hash; defaults to settings.bcrypt_target_ms
+        
+    Returns:
+        Selected cost factor
+    """
+    global _bcrypt_rounds
+    
+    if target_ms is None:
+        target_ms = settings.bcrypt_target_ms
+    
+    rounds = settings.bcrypt_rounds
+    if target_ms > 0:
+        salt = bcrypt.gensalt(rounds=rounds)
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        await loop.run_in_executor(get_password_executor(), bcrypt.hashpw, b"calibration", salt)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        while rounds < BCRYPT_MAX_ROUNDS and elapsed_ms * 2 <= target_ms:
+            rounds += 1
+            elapsed_ms *= 2
+    
+    _bcrypt_rounds = rounds
+    return rounds
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a stored hash uses a lower cost than the current one.
+    
+    Args:
+        hashed_password: Stored bcrypt hash ($2b$<cost>$...)
+        
+    Returns:
+        True if the hash should be regenerated after a successful login
+    """
+    try:
+        return int(hashed_password.split("$")[2]) < _bcrypt_rounds
+    except (IndexError, ValueError):
+        return True
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain password against its bcrypt hash.
     
+    Runs in the password hashing executor, so the event loop keeps
+    serving requests during the hash.
+    
     Args:
         plain_password: User-provided password
         hashed_password: Stored bcrypt hash
@@ -36,20 +143,35 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            get_password_executor(),
+            bcrypt.checkpw,
+            plain_password.encode("utf-8"),
+            hashed_password.encode("utf-8"),
+        )
+    except ValueError:
+        # Malformed stored hash
+        return False
 
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """
     Generate bcrypt hash for a password.
     
+    Runs in the password hashing executor so the event loop is not blocked.
+    
     Args:
         password: Plain text password
         
     Returns:
         Bcrypt hash string
     """
-    return pwd_context.hash(password)
+    salt = bcrypt.gensalt(rounds=_bcrypt_rounds)
+    hashed = await asyncio.get_running_loop().run_in_executor(
+        get_password_executor(), bcrypt.hashpw, password.encode("utf-8"), salt
+    )
+    return hashed.decode("ascii")
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -63,32 +185,22 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     Returns:
         Encoded JWT token string
     """
-    to_encode = data.copy()
+    # One clock read; integer epoch claims skip PyJWT's datetime conversion
+    now = int(time.time())
+    lifetime = int(expires_delta.total_seconds()) if expires_delta else ACCESS_TOKEN_EXPIRE_SECONDS
     
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    payload = {**data, "exp": now + lifetime, "iat": now, "type": "access"}
     
-    to_encode.update({
-        "exp": expire,
-        "iat": datetime.utcnow(),
-        "type": "access"
-    })
-    
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.secret_key,
-        algorithm=ALGORITHM
-    )
-    
-    return encoded_jwt
+    return jwt.encode(payload, _SECRET_KEY, algorithm=ALGORITHM)
 
 
 def decode_access_token(token: str) -> dict:
     """
     Decode and validate a JWT token.
     
+    Verified claims are cached by token digest until the token expires.
+    Invalid and revoked tokens are never cached.
+    
     Args:
         token: JWT token string
         
@@ -96,7 +208,7 @@ def decode_access_token(token: str) -> dict:
         Decoded token payload
         
     Raises:
-        HTTPException: If token is invalid or expired
+        HTTPException: If token is invalid, expired or revoked
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -104,30 +216,79 @@ def decode_access_token(token: str) -> dict:
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    key = _token_key(token)
+    if key in _revoked_tokens:
+        raise credentials_exception
+    
+    now = time.time()
+    cached = _token_cache.get(key)
+    if cached is not None and cached[1] > now:
+        _token_cache.move_to_end(key)
+        return cached[0]
+    
     try:
         payload = jwt.decode(
             token,
-            settings.secret_key,
-            algorithms=[ALGORITHM]
+            _SECRET_KEY,
+            algorithms=_ALGORITHMS,
+            options=_DECODE_OPTIONS
         )
         
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-            
-        return payload
         
-    except JWTError as e:
+    except jwt.PyJWTError as e:
         raise credentials_exception from e
+    
+    _token_cache[key] = (payload, float(payload.get("exp", now)))
+    if len(_token_cache) > TOKEN_CACHE_MAX_ENTRIES:
+        _token_cache.popitem(last=False)
+    
+    return payload
+
+
+def _token_key(token: str) -> bytes:
+    """Cache key for a raw JWT (never store the token itself)."""
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+
+def revoke_token(token: str) -> None:
+    """
+    Reject a token for the rest of its lifetime in this process.
+    
+    Args:
+        token: JWT token string to revoke
+    """
+    key = _token_key(token)
+    cached = _token_cache.pop(key, None)
+    now = time.time()
+    
+    # Drop revocations whose tokens have expired anyway
+    for revoked_key, expires_at in list(_revoked_tokens.items()):
+        if expires_at <= now:
+            del _revoked_tokens[revoked_key]
+    
+    expires_at = cached[1] if cached else now + ACCESS_TOKEN_EXPIRE_SECONDS
+    _revoked_tokens[key] = expires_at
 
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> dict:
     """
     FastAPI dependency to extract and validate current user from JWT token.
     
+    Use it directly to protect endpoints:
+        @app.get("/protected", dependencies=[Depends(get_current_user)])
+    
+    Dashboards polling with the same token pay for verification once;
+    see decode_access_token. The payload is also stored on
+    request.state.user for other dependencies and middleware.
+    
     Args:
+        request: Incoming request
         credentials: HTTP Bearer token from request header
         
     Returns:
@@ -136,24 +297,6 @@ async def get_current_user(
     Raises:
         HTTPException: If authentication fails
     """
-    token = credentials.credentials
-    payload = decode_access_token(token)
+    payload = decode_access_token(credentials.credentials)
+    request.state.user = payload
     return payload
-
-
-def require_auth(
-    current_user: dict = Depends(get_current_user)
-) -> dict:
-    """
-    Dependency to require authentication on endpoints.
-    
-    Usage:
-        @app.get("/protected", dependencies=[Depends(require_auth)])
-        
-    Args:
-        current_user: User from get_current_user dependency
-        
-    Returns:
-        Current user data
-    """
-    return current_user
@@ -6,24 +6,39 @@ Implements connection pooling and non-blocking message distribution.
 """
 
 import asyncio
-import json
-from typing import Set, Dict, Any
-from datetime import datetime
+import time
+from typing import Dict, Any
+from datetime import datetime, timezone
+import orjson
 from fastapi import WebSocket
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Cap on a single client send, so a stalled client is dropped
+SEND_TIMEOUT = 5.0
+
+# Messages buffered per client before it is considered too slow
+SEND_QUEUE_SIZE = 1000
+
+# Last event timestamp as [unix time, ISO string]; events within the same
+# millisecond reuse the formatted string
+_timestamp_cache = [0.0, ""]
+
 
 class ConnectionManager:
     """
     Manages WebSocket connections and broadcasts events to all connected clients.
     
-    Thread-safe implementation using asyncio locks for concurrent access.
+    Each connection has a bounded outbound queue drained by its own writer
+    task, so broadcasting is a non-blocking enqueue per client.
     """
     
+    __slots__ = ("active_connections", "_writers", "_lock")
+    
     def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
+        self.active_connections: Dict[WebSocket, asyncio.Queue] = {}
+        self._writers: Dict[WebSocket, asyncio.Task] = {}
         self._lock = asyncio.Lock()
     
     async def connect(self, websocket: WebSocket):
@@ -35,17 +50,20 @@ class ConnectionManager:
         """
         await websocket.accept()
         
-        async with self._lock:
-            self.active_connections.add(websocket)
-        
-        logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
         
         # Send connection confirmation
-        await self._send_to_client(websocket, {
+        queue.put_nowait(_encode({
             "type": "connection",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _now_iso(),
             "data": {"message": "Connected to KeyChaser event stream"}
-        })
+        }))
+        
+        async with self._lock:
+            self.active_connections[websocket] = queue
+            self._writers[websocket] = asyncio.create_task(self._writer_loop(websocket, queue))
+        
+        logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
     
     async def disconnect(self, websocket: WebSocket):
         """
@@ -55,14 +73,22 @@ class ConnectionManager:
             websocket: FastAPI WebSocket instance
         """
         async with self._lock:
-            self.active_connections.discard(websocket)
+            removed = self.active_connections.pop(websocket, None) is not None
+            writer = self._writers.pop(websocket, None)
+        
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
         
-        logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
+        if removed:
+            logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
     
     async def broadcast(self, event_type: str, data: Dict[str, Any]):
         """
         Broadcast an event to all connected clients (non-blocking).
         
+        Clients whose queue is full are too slow to keep up and are dropped
+        rather than allowed to buffer without bound.
+        
         Args:
             event_type: Event type identifier (e.g., "new_beacon", "new_log")
             data: Event payload dictionary
@@ -70,59 +96,81 @@ class ConnectionManager:
         if not self.active_connections:
             return  # No clients connected
         
-        message = {
-            "type": event_type,
-            "timestamp": datetime.utcnow().isoformat(),
-            "data": data
-        }
+        # Serialize once; every client receives the same text frame
+        payload = _encode({"type": event_type, "timestamp": _now_iso(), "data": data})
         
-        # Create broadcast tasks for all connections
-        tasks = []
-        async with self._lock:
-            connections_snapshot = list(self.active_connections)
-        
-        for connection in connections_snapshot:
-            tasks.append(self._send_to_client(connection, message))
+        slow_clients = []
+        for websocket, queue in list(self.active_connections.items()):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                slow_clients.append(websocket)
         
-        # Execute all sends concurrently without blocking
-        if tasks:
-            asyncio.create_task(self._execute_broadcasts(tasks))
+        for websocket in slow_clients:
+            logger.warning("Dropping slow WebSocket client (send queue full)")
+            await self.disconnect(websocket)
+            asyncio.create_task(self._close_client(websocket))
     
-    async def _execute_broadcasts(self, tasks):
+    async def _writer_loop(self, websocket: WebSocket, queue: asyncio.Queue):
         """
-        Execute broadcast tasks and handle disconnections.
+        Send queued messages to one client until a send fails.
         
         Args:
-            tasks: List of send coroutines
+            websocket: Target WebSocket
+            queue: Outbound message queue for this client
         """
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        while True:
+            payload = await queue.get()
+            if not await self._send_to_client(websocket, payload):
+                break
         
-        # Check for failed sends (disconnected clients)
-        for result in results:
-            if isinstance(result, Exception):
-                logger.debug(f"Broadcast send failed: {result}")
+        await self.disconnect(websocket)
+    
+    async def _close_client(self, websocket: WebSocket):
+        """Close a dropped client's socket, ignoring errors."""
+        try:
+            await asyncio.wait_for(websocket.close(code=1013), timeout=SEND_TIMEOUT)
+        except Exception as e:
+            logger.debug(f"Failed to close dropped client: {e!r}")
     
-    async def _send_to_client(self, websocket: WebSocket, message: Dict):
+    async def _send_to_client(self, websocket: WebSocket, payload: str) -> bool:
         """
         Send a message to a single WebSocket client.
         
         Args:
             websocket: Target WebSocket
-            message: Message dictionary
+            payload: JSON-encoded message
+            
+        Returns:
+            True if the send succeeded
         """
         try:
-            await websocket.send_json(message)
+            async with asyncio.timeout(SEND_TIMEOUT):
+                await websocket.send_text(payload)
+            return True
         except Exception as e:
-            logger.warning(f"Failed to send to client: {e}")
-            # Remove disconnected client
-            await self.disconnect(websocket)
-            raise
+            logger.warning(f"Failed to send to client: {e!r}")
+            return False
     
     def get_connection_count(self) -> int:
         """Get the number of active WebSocket connections."""
         return len(self.active_connections)
 
 
+def _now_iso() -> str:
+    """Current UTC time in ISO format, cached for 1 ms under event bursts."""
+    now = time.time()
+    if now - _timestamp_cache[0] > 0.001:
+        _timestamp_cache[0] = now
+        _timestamp_cache[1] = datetime.fromtimestamp(now, timezone.utc).isoformat()
+    return _timestamp_cache[1]
+
+
+def _encode(message: Dict[str, Any]) -> str:
+    """Serialize a message to JSON text (non-JSON values fall back to str)."""
+    return orjson.dumps(message, default=str).decode("utf-8")
+
+
 # Global connection manager instance
 manager = ConnectionManager()
 
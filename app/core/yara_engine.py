@@ -6,16 +6,23 @@ and specific threat patterns in captured payloads using YARA rules.
 """
 
 import asyncio
+import hashlib
 import os
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
 
-import yara
+import yara_x
 
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Compiled ruleset cache, named by a fingerprint of the rule sources
+COMPILED_RULES_GLOB = ".compiled.*.yrx"
+
+# Most payloads matched per executor hop
+SCAN_BATCH_SIZE = 32
+
 
 class YaraEngine:
     """
@@ -33,13 +40,18 @@ class YaraEngine:
             rules_dir: Path to directory containing .yar rule files
         """
         self.rules_dir = Path(rules_dir)
-        self.compiled_rules: Optional[yara.Rules] = None
+        self.compiled_rules: Optional[yara_x.Rules] = None
         self._rule_count = 0
+        self._pending_scans: List[Tuple[bytes, asyncio.Future]] = []
+        self._scan_task: Optional[asyncio.Task] = None
         
     async def initialize(self) -> bool:
         """
         Load and compile YARA rules from the rules directory.
         
+        A compiled copy is saved next to the rules and reused on later
+        startups until any rule file changes.
+        
         Returns:
             True if rules were successfully loaded, False otherwise
         """
@@ -53,8 +65,8 @@ class YaraEngine:
                 return False
             
             # Find all .yar and .yara files
-            rule_files = list(self.rules_dir.glob("*.yar")) + list(
-                self.rules_dir.glob("*.yara")
+            rule_files = sorted(
+                list(self.rules_dir.glob("*.yar")) + list(self.rules_dir.glob("*.yara"))
             )
             
             if not rule_files:
@@ -64,16 +76,10 @@ class YaraEngine:
                 )
                 return False
             
-            # Build filepaths dictionary for compilation
-            filepaths = {
-                f"rule_{i}": str(rule_file) 
-                for i, rule_file in enumerate(rule_files)
-            }
-            
-            # Compile rules (blocking operation, run in executor)
-            loop = asyncio.get_event_loop()
+            # Load or compile rules (blocking operation, run in executor)
+            loop = asyncio.get_running_loop()
             self.compiled_rules = await loop.run_in_executor(
-                None, yara.compile, None, filepaths
+                None, self._load_rules, rule_files
             )
             
             self._rule_count = len(rule_files)
@@ -83,17 +89,67 @@ class YaraEngine:
             )
             return True
             
-        except yara.SyntaxError as e:
+        except yara_x.CompileError as e:
             logger.error(f"YARA rule syntax error: {e}")
             return False
         except Exception as e:
             logger.error(f"Failed to initialize YARA engine: {e}")
             return False
     
+    def _load_rules(self, rule_files: List[Path]) -> yara_x.Rules:
+        """
+        Load the compiled ruleset from cache, compiling it on a miss.
+        
+        Args:
+            rule_files: Sorted rule source files
+            
+        Returns:
+            Compiled YARA rules
+        """
+        fingerprint = hashlib.blake2b(digest_size=16)
+        for rule_file in rule_files:
+            fingerprint.update(rule_file.name.encode("utf-8") + b"\0")
+            fingerprint.update(rule_file.read_bytes())
+        cache_path = self.rules_dir / COMPILED_RULES_GLOB.replace("*", fingerprint.hexdigest())
+        
+        if cache_path.exists():
+            try:
+                with open(cache_path, "rb") as cache_file:
+                    rules = yara_x.Rules.deserialize_from(cache_file)
+                logger.debug(f"Loaded compiled YARA rules from {cache_path.name}")
+                return rules
+            except OSError as e:
+                logger.warning(f"Ignoring unreadable compiled YARA rules {cache_path.name}: {e}")
+        
+        # One namespace per file, so rule names may repeat across files
+        compiler = yara_x.Compiler()
+        for i, rule_file in enumerate(rule_files):
+            compiler.new_namespace(f"rule_{i}")
+            compiler.add_source(rule_file.read_text(encoding="utf-8"), origin=str(rule_file))
+        rules = compiler.build()
+        
+        try:
+            for stale_path in self.rules_dir.glob(COMPILED_RULES_GLOB):
+                if stale_path != cache_path:
+                    stale_path.unlink(missing_ok=True)
+            
+            # Write then rename, so concurrent workers never load a partial file
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as cache_file:
+                rules.serialize_into(cache_file)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not cache compiled YARA rules: {e}")
+        
+        return rules
+    
     async def scan_payload(self, data: bytes) -> List[str]:
         """
         Scan payload data for malware signatures.
         
+        Payloads that arrive while a scan is running are matched together
+        in the next executor call, so bursts share one thread hop.
+        
         Args:
             data: Raw payload bytes to scan
             
@@ -108,15 +164,13 @@ class YaraEngine:
         if not data:
             return []
         
+        future = asyncio.get_running_loop().create_future()
+        self._pending_scans.append((data, future))
+        if self._scan_task is None:
+            self._scan_task = asyncio.create_task(self._scan_pending())
+        
         try:
-            # Run YARA scan in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            matches = await loop.run_in_executor(
-                None, self.compiled_rules.match, data
-            )
-            
-            # Extract rule names from matches
-            matched_rules = [match.rule for match in matches]
+            matched_rules = await future
             
             if matched_rules:
                 logger.info(
@@ -130,6 +184,54 @@ class YaraEngine:
             logger.error(f"YARA scan failed: {e}")
             return []
     
+    async def _scan_pending(self) -> None:
+        """Match queued payloads in batches until the queue is empty."""
+        loop = asyncio.get_running_loop()
+        try:
+            while self._pending_scans:
+                batch = self._pending_scans[:SCAN_BATCH_SIZE]
+                del self._pending_scans[:SCAN_BATCH_SIZE]
+                
+                try:
+                    # Run YARA scans in executor to avoid blocking
+                    results = await loop.run_in_executor(
+                        None, self._match_batch, [data for data, _ in batch]
+                    )
+                except Exception as e:
+                    results = [e] * len(batch)
+                
+                for (_, future), result in zip(batch, results):
+                    if future.done():
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+        finally:
+            self._scan_task = None
+    
+    def _match_batch(self, payloads: List[bytes]) -> List[Union[List[str], Exception]]:
+        """
+        Match each payload against the compiled rules.
+        
+        Args:
+            payloads: Payloads to scan
+            
+        Returns:
+            Matched rule names per payload, or the exception its scan raised
+        """
+        # Scanners aren't shareable between threads; one per batch, created
+        # and dropped on this executor thread, over the shared rules
+        scanner = yara_x.Scanner(self.compiled_rules)
+        results = []
+        for data in payloads:
+            try:
+                scan_results = scanner.scan(data)
+                results.append([rule.identifier for rule in scan_results.matching_rules])
+            except Exception as e:
+                results.append(e)
+        return results
+    
     def get_stats(self) -> dict:
         """
         Get YARA engine statistics.
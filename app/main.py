@@ -8,31 +8,40 @@ malware protocol listeners.
 
 import asyncio
 import importlib
-import inspect
 import sys
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import List
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from app.core.config import settings
 from app.core.database import close_db, get_session_factory, init_db
+from app.core.http import close_http_client
 from app.core.logging import get_logger
+from app.core.security import calibrate_bcrypt_cost, close_password_executor
 from app.core.websocket import get_connection_manager
-from app.protocols.base import ProtocolHandler
+from app.protocols.base import (
+    ProtocolHandler,
+    close_cpu_executor,
+    get_registered_handlers,
+    get_store_writer,
+)
 
 logger = get_logger(__name__)
 
 
 def load_protocol_handlers() -> List[ProtocolHandler]:
     """
-    Dynamically load protocol handlers from the protocols directory.
+    Load the enabled protocol handlers.
     
-    Scans for Python modules in app/protocols/ and instantiates any
-    classes that inherit from ProtocolHandler.
+    Imports each module listed in settings.enabled_protocols; handler
+    classes register themselves on import by subclassing ProtocolHandler,
+    so no directory scan or module introspection is needed.
     
     Returns:
         List of instantiated protocol handler objects
@@ -40,38 +49,27 @@ def load_protocol_handlers() -> List[ProtocolHandler]:
     handlers = []
     db_factory = get_session_factory()
     
-    protocols_path = Path(__file__).parent / "protocols"
+    logger.info(f"Loading protocol handlers: {', '.join(settings.enabled_protocols)}")
     
-    logger.info(f"Loading protocol handlers from {protocols_path}")
+    enabled_modules = set()
+    for protocol_name in settings.enabled_protocols:
+        module_name = f"app.protocols.{protocol_name}"
+        try:
+            importlib.import_module(module_name)
+            enabled_modules.add(module_name)
+        except Exception as e:
+            logger.error(f"Failed to load protocol handler {protocol_name}: {e}", exc_info=True)
     
-    for protocol_file in protocols_path.glob("*.py"):
-        # Skip base class and utilities
-        if protocol_file.stem in ["__init__", "base", "utils"]:
-            continue
-        
-        # Check if this protocol is enabled
-        if protocol_file.stem not in settings.enabled_protocols:
-            logger.info(f"Skipping disabled protocol: {protocol_file.stem}")
+    for handler_class in get_registered_handlers():
+        if handler_class.__module__ not in enabled_modules:
             continue
         
         try:
-            # Import the module
-            module_name = f"app.protocols.{protocol_file.stem}"
-            module = importlib.import_module(module_name)
-            
-            # Find ProtocolHandler subclasses
-            for name, obj in inspect.getmembers(module, inspect.isclass):
-                if (issubclass(obj, ProtocolHandler) and 
-                    obj is not ProtocolHandler and
-                    obj.__module__ == module_name):
-                    
-                    # Instantiate handler
-                    handler = obj(db_factory)
-                    handlers.append(handler)
-                    logger.info(f"Loaded protocol handler: {handler.name} on port {handler.port}")
-            
+            handler = handler_class(db_factory)
+            handlers.append(handler)
+            logger.info(f"Loaded protocol handler: {handler.name} on port {handler.port}")
         except Exception as e:
-            logger.error(f"Failed to load protocol handler {protocol_file.stem}: {e}", exc_info=True)
+            logger.error(f"Failed to load protocol handler {handler_class.__name__}: {e}", exc_info=True)
     
     return handlers
 
@@ -119,6 +117,10 @@ async def lifespan(app: FastAPI):
     # Initialize database
     await init_db()
     
+    # Size the bcrypt cost to this host
+    bcrypt_rounds = await calibrate_bcrypt_cost()
+    logger.info(f"bcrypt cost factor: {bcrypt_rounds}")
+    
     # Initialize YARA engine for malware detection
     logger.info("Initializing YARA malware detection engine...")
     from app.core.yara_engine import get_yara_engine
@@ -137,12 +139,17 @@ async def lifespan(app: FastAPI):
     else:
         logger.info(f"Loaded {len(handlers)} protocol handler(s)")
     
-    # Start protocol listeners as background tasks
+    # Start protocol listeners as background tasks; with SO_REUSEPORT
+    # several sockets can share a port and the kernel balances accepts
+    listeners_per_protocol = settings.listeners_per_protocol if sys.platform != "win32" else 1
     listener_tasks = []
     for handler in handlers:
-        task = asyncio.create_task(start_protocol_listener(handler))
-        listener_tasks.append(task)
-        logger.info(f"Started listener for {handler.name} on port {handler.port}")
+        for _ in range(listeners_per_protocol):
+            task = asyncio.create_task(start_protocol_listener(handler))
+            listener_tasks.append(task)
+        logger.info(
+            f"Started {listeners_per_protocol} listener(s) for {handler.name} on port {handler.port}"
+        )
     
     # Store tasks in app state for cleanup
     app.state.listener_tasks = listener_tasks
@@ -165,8 +172,18 @@ async def lifespan(app: FastAPI):
     # Wait for tasks to complete
     await asyncio.gather(*listener_tasks, return_exceptions=True)
     
-    # Close database
+    # Store queued payloads first, since storing can queue enrichment
+    await get_store_writer().stop()
+    
+    # Flush queued enrichment results before the database closes
+    from app.core.enrichment import get_enrichment_writer
+    await get_enrichment_writer().stop()
+    
+    # Close database and outbound HTTP connections
     await close_db()
+    await close_http_client()
+    close_password_executor()
+    close_cpu_executor()
     
     logger.info("KeyChaser shutdown complete")
 
@@ -177,8 +194,14 @@ app = FastAPI(
     description="Advanced Malware C2 Sinkhole and Traffic Emulation Framework",
     version=settings.app_version,
     lifespan=lifespan,
+    # Encode JSON responses with orjson instead of the stdlib encoder
+    default_response_class=ORJSONResponse,
 )
 
+# Compress JSON responses (notably forensic exports); small bodies are
+# sent as-is since compression would not pay for itself
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Mount static files (CSS, JS)
 static_path = Path(__file__).parent / "static"
 static_path.mkdir(exist_ok=True)
@@ -256,4 +279,6 @@ if __name__ == "__main__":
         port=settings.api_port,
         reload=settings.debug,
         log_level="info",
+        # libuv event loop for the listeners and WebSocket fan-out
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
     )
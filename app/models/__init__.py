@@ -2,6 +2,7 @@
 
 from app.models.bot import Bot, BotCreate, BotRead
 from app.models.credential import Credential, CredentialCreate, CredentialRead
+from app.models.enrichment_cache import EnrichmentCacheEntry
 from app.models.log import Log, LogCreate, LogRead
 
 __all__ = [
@@ -11,6 +12,7 @@ __all__ = [
     "Credential",
     "CredentialCreate",
     "CredentialRead",
+    "EnrichmentCacheEntry",
     "Log",
     "LogCreate",
     "LogRead",
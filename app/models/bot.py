@@ -5,16 +5,57 @@ Each bot record tracks a unique malware infection including victim
 system information, malware family, and connection metadata.
 """
 
+import ipaddress
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 
-from pydantic import BaseModel, Field
-from sqlalchemy import Column, DateTime, Integer, String, Text
+from pydantic import BaseModel, Field, IPvAnyAddress
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, LargeBinary, String
+from sqlalchemy.dialects.postgresql import INET, JSONB
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 
 from app.core.database import Base
 
 
+class IPAddressType(TypeDecorator):
+    """
+    IP address column: native INET on PostgreSQL, packed bytes elsewhere.
+    
+    IPv4 addresses take 4 bytes and IPv6 16, instead of up to 45
+    characters of text. Values are bound and returned as strings;
+    anything that doesn't parse as an address (e.g. "unknown" when the
+    peer address was unavailable) is stored as NULL.
+    """
+    
+    impl = LargeBinary(16)
+    cache_ok = True
+    
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(INET())
+        return dialect.type_descriptor(LargeBinary(16))
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            address = ipaddress.ip_address(value)
+        except ValueError:
+            return None
+        if dialect.name == "postgresql":
+            return str(address)
+        return address.packed
+    
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            # Rows not yet converted by Alembic revision e2f6a9b3c814
+            return value
+        if isinstance(value, (bytes, memoryview)):
+            return str(ipaddress.ip_address(bytes(value)))
+        return str(value)
+
+
 class Bot(Base):
     """
     SQLAlchemy model for infected bot/victim machines.
@@ -28,7 +69,7 @@ class Bot(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     # Network Information
-    ip_address = Column(String(45), nullable=False, index=True)  # IPv4/IPv6
+    ip_address = Column(IPAddressType(), nullable=True, index=True)  # IPv4/IPv6, NULL if unknown
     port = Column(Integer, nullable=False)
     protocol = Column(String(50), nullable=False, index=True)  # Malware family
     
@@ -51,14 +92,22 @@ class Bot(Base):
     malware_version = Column(String(50), nullable=True)
     campaign_id = Column(String(100), nullable=True, index=True)
     
-    # Additional Data (JSON-serializable system info)
-    extra_data = Column(Text, nullable=True)
+    # Additional Data (system info, enrichment results); JSONB on PostgreSQL,
+    # JSON text on SQLite
+    extra_data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     
     # Timestamps
-    first_seen = Column(DateTime, default=datetime.utcnow, nullable=False)
+    first_seen = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     last_seen = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     
+    # Composite indexes matching the /bots filters (newest first)
+    __table_args__ = (
+        Index("ix_bots_last_seen_id", last_seen.desc(), id.desc()),
+        Index("ix_bots_protocol_last_seen", protocol, last_seen.desc()),
+        Index("ix_bots_ip_address_last_seen", ip_address, last_seen.desc()),
+    )
+    
     def __repr__(self) -> str:
         return f"<Bot(id={self.id}, bot_id={self.bot_id}, ip={self.ip_address}, protocol={self.protocol})>"
 
@@ -67,7 +116,7 @@ class Bot(Base):
 
 class BotBase(BaseModel):
     """Base schema with common bot fields."""
-    ip_address: str = Field(..., description="IP address of infected machine")
+    ip_address: Optional[IPvAnyAddress] = Field(None, description="IP address of infected machine, if known")
     port: int = Field(..., ge=1, le=65535, description="Connection port")
     protocol: str = Field(..., description="Malware protocol/family name")
     bot_id: Optional[str] = Field(None, description="Unique bot identifier from malware")
@@ -76,7 +125,7 @@ class BotBase(BaseModel):
     os_info: Optional[str] = Field(None, description="Operating system information")
     malware_version: Optional[str] = Field(None, description="Malware version string")
     campaign_id: Optional[str] = Field(None, description="Campaign/builder identifier")
-    extra_data: Optional[str] = Field(None, description="Additional JSON data")
+    extra_data: Optional[Dict[str, Any]] = Field(None, description="Additional JSON data")
     country: Optional[str] = Field(None, description="Country name from GeoIP")
     country_code: Optional[str] = Field(None, description="ISO country code")
     city: Optional[str] = Field(None, description="City name from GeoIP")
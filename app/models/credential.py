@@ -9,7 +9,7 @@ from datetime import datetime
 from typing import Optional
 
 from pydantic import BaseModel, Field
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.sql import func
 
 from app.core.database import Base
@@ -28,7 +28,12 @@ class Credential(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     # Association with Bot
-    bot_id = Column(Integer, ForeignKey("bots.id"), nullable=False, index=True)
+    bot_id = Column(
+        Integer,
+        ForeignKey("bots.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
     
     # Credential Type
     cred_type = Column(
@@ -56,6 +61,12 @@ class Credential(Base):
     received_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     
+    # Per-bot listing/export order (newest first) and recent-activity counts
+    __table_args__ = (
+        Index("ix_credentials_bot_id_received_at", bot_id, received_at.desc()),
+        Index("ix_credentials_received_at", received_at),
+    )
+    
     def __repr__(self) -> str:
         return f"<Credential(id={self.id}, type={self.cred_type}, username={self.username})>"
 
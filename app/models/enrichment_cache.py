@@ -0,0 +1,29 @@
+"""
+Enrichment cache model for persisted threat intelligence lookups.
+
+Keeps AbuseIPDB and VirusTotal results across restarts so known IPs and
+payload hashes don't have to be looked up again from a cold cache.
+"""
+
+from sqlalchemy import Column, Integer, LargeBinary, String
+
+from app.core.database import Base
+
+
+class EnrichmentCacheEntry(Base):
+    """
+    SQLAlchemy model for a cached enrichment API response.
+    
+    Rows are keyed by lookup (e.g. "ip:1.2.3.4", "vt:<sha256>") and hold
+    the JSON result as orjson-encoded bytes.
+    """
+    
+    __tablename__ = "enrichment_cache"
+    
+    key = Column(String(100), primary_key=True)
+    kind = Column(String(16), nullable=False)  # ip, vt
+    payload = Column(LargeBinary, nullable=False)
+    fetched_at = Column(Integer, nullable=False)  # Unix timestamp
+    
+    def __repr__(self) -> str:
+        return f"<EnrichmentCacheEntry(key={self.key}, kind={self.kind})>"
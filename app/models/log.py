@@ -6,10 +6,10 @@ clipboard content) extracted from malware C2 traffic.
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 
-from pydantic import BaseModel, Field
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import DDL, Column, DateTime, ForeignKey, Index, Integer, String, Text, event
 from sqlalchemy.sql import func
 
 from app.core.database import Base
@@ -28,13 +28,16 @@ class Log(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     # Association with Bot
-    bot_id = Column(Integer, ForeignKey("bots.id"), nullable=False, index=True)
+    bot_id = Column(
+        Integer,
+        ForeignKey("bots.id", ondelete="CASCADE"),
+        nullable=False,
+    )
     
     # Log Classification
     log_type = Column(
         String(50),
         nullable=False,
-        index=True,
         # Types: keystroke, clipboard, screenshot, file_upload, system_info
     )
     
@@ -51,17 +54,72 @@ class Log(Base):
     
     # Metadata
     captured_at = Column(DateTime, nullable=True)  # Timestamp from malware
-    received_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    received_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     
+    # Composite indexes matching the /logs filters (newest first); their
+    # leading columns also serve plain bot_id / log_type lookups. The
+    # trigram indexes back the ILIKE searches and only exist on PostgreSQL.
+    __table_args__ = (
+        Index("ix_logs_bot_type_received", bot_id, log_type, received_at.desc()),
+        Index("ix_logs_bot_id_received_at", bot_id, received_at.desc()),
+        Index("ix_logs_log_type_received_at", log_type, received_at.desc()),
+        Index(
+            "ix_logs_keystroke_data_trgm",
+            keystroke_data,
+            postgresql_using="gin",
+            postgresql_ops={"keystroke_data": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_logs_window_title_trgm",
+            window_title,
+            postgresql_using="gin",
+            postgresql_ops={"window_title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+    
     def __repr__(self) -> str:
         return f"<Log(id={self.id}, bot_id={self.bot_id}, type={self.log_type})>"
 
 
+def log_search_document():
+    """
+    Full-text search document over keystrokes and window title.
+    
+    PostgreSQL only. Queries must use this exact expression to be served
+    by the ix_logs_search_document GIN index.
+    """
+    return func.to_tsvector(
+        "simple",
+        func.coalesce(Log.keystroke_data, "") + " " + func.coalesce(Log.window_title, "")
+    )
+
+
+Index(
+    "ix_logs_search_document",
+    log_search_document(),
+    postgresql_using="gin",
+).ddl_if(dialect="postgresql")
+
+
+# The trigram operator class ships in the pg_trgm extension
+event.listen(
+    Log.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
 # Pydantic Schemas
+#
+# The from_trusted/from_orm_trusted constructors skip validation entirely.
+# Only use them on rows read back from the database or on data that has
+# already been validated; never on raw protocol-parser output.
 
 class LogBase(BaseModel):
     """Base schema for log entries."""
+    model_config = ConfigDict(extra="forbid")
+    
     bot_id: int = Field(..., description="Foreign key to associated bot")
     log_type: str = Field(..., description="Type of log (keystroke, clipboard, etc.)")
     window_title: Optional[str] = Field(None, description="Active window title")
@@ -74,7 +132,19 @@ class LogBase(BaseModel):
 
 class LogCreate(LogBase):
     """Schema for creating a new log entry."""
-    pass
+    
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]) -> "LogCreate":
+        """
+        Build a LogCreate without validation.
+        
+        Args:
+            data: Already-validated log fields
+        
+        Returns:
+            LogCreate instance
+        """
+        return cls.model_construct(**data)
 
 
 class LogRead(LogBase):
@@ -83,5 +153,30 @@ class LogRead(LogBase):
     received_at: datetime
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    # Read-only response DTO
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+    
+    @classmethod
+    def from_orm_trusted(cls, row: Any) -> "LogRead":
+        """
+        Build a LogRead from a database row without validation.
+        
+        Args:
+            row: Log ORM object or row mapping with the LogRead columns
+        
+        Returns:
+            LogRead instance
+        """
+        return cls.model_construct(
+            id=row.id,
+            bot_id=row.bot_id,
+            log_type=row.log_type,
+            window_title=row.window_title,
+            keystroke_data=row.keystroke_data,
+            application=row.application,
+            url=row.url,
+            raw_data=row.raw_data,
+            captured_at=row.captured_at,
+            received_at=row.received_at,
+            created_at=row.created_at,
+        )
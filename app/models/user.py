@@ -4,10 +4,10 @@ User Model - Authentication & Authorization
 Stores operator credentials for accessing the KeyChaser dashboard and API.
 """
 
+from dataclasses import dataclass
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, Boolean, DateTime
-from sqlalchemy.orm import declarative_base
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 from app.core.database import Base
 
@@ -38,6 +38,8 @@ class User(Base):
 
 class UserBase(BaseModel):
     """Base user schema with common fields"""
+    model_config = ConfigDict(extra="forbid")
+
     username: str = Field(..., min_length=3, max_length=50)
     email: str = Field(..., max_length=100)
     full_name: str | None = None
@@ -45,6 +47,9 @@ class UserBase(BaseModel):
 
 class UserCreate(UserBase):
     """Schema for user creation"""
+    # Addresses are checked once on the way in; UserRead keeps the plain
+    # str from UserBase so reading stored rows never runs email-validator
+    email: EmailStr = Field(..., max_length=100)
     password: str = Field(..., min_length=8, max_length=100)
 
 
@@ -56,22 +61,52 @@ class UserRead(UserBase):
     created_at: datetime
     last_login: datetime | None
 
-    class Config:
-        from_attributes = True
+    # Read-only response DTO
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    @classmethod
+    def from_orm_trusted(cls, user: "User") -> "UserRead":
+        """
+        Build a UserRead from a database row without validation.
+
+        Only for rows read back from the database; the fields were
+        validated on the way in.
+
+        Args:
+            user: User ORM object
+
+        Returns:
+            UserRead instance
+        """
+        return cls.model_construct(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            created_at=user.created_at,
+            last_login=user.last_login,
+        )
 
 
 class UserLogin(BaseModel):
     """Schema for login request"""
+    model_config = ConfigDict(extra="forbid")
+
     username: str = Field(..., min_length=3)
     password: str = Field(..., min_length=8)
 
 
 class Token(BaseModel):
     """Schema for JWT token response"""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     access_token: str
     token_type: str = "bearer"
 
 
-class TokenData(BaseModel):
-    """Schema for decoded token data"""
+@dataclass(slots=True, frozen=True)
+class TokenData:
+    """Decoded token data; built from already-verified JWT claims"""
     username: str | None = None
@@ -55,22 +55,21 @@ class TemplateHandler(ProtocolHandler):
     ENCRYPTION_KEY = b"TODO_SET_KEY"  # XOR key, RC4 key, or AES key
     AES_IV = b"TODO_SET_IV_IF_AES" if False else None  # Set if using AES
     
-    @property
-    def name(self) -> str:
-        """Return protocol/malware family name."""
-        return "TODO_MalwareName"  # e.g., "AgentTesla", "RedLine", "Raccoon"
+    # Plain class attributes satisfy the abstract name/port properties and
+    # are read on every packet, so prefer them over @property methods
+    name = "TODO_MalwareName"  # e.g., "AgentTesla", "RedLine", "Raccoon"
+    port = 9999  # TODO: Set actual port used by malware
+    use_udp = False  # TODO: Change to True if malware uses UDP
     
-    @property
-    def port(self) -> int:
-        """Return listening port."""
-        return 9999  # TODO: Set actual port used by malware
+    # TODO: Check how the malware frames its messages. By default each
+    # connection gets one read of up to max_packet_size; if the sample
+    # uses a length prefix or sends everything and then closes, override
+    # read_frame():
+    #
+    # async def read_frame(self, reader) -> bytes:
+    #     return await self._read_length_prefixed(reader)  # or _read_until_eof
     
-    @property
-    def use_udp(self) -> bool:
-        """Return True if protocol uses UDP instead of TCP."""
-        return False  # TODO: Change to True if malware uses UDP
-    
-    async def decrypt(self, data: bytes) -> bytes:
+    def decrypt(self, data: bytes) -> bytes:
         """
         Decrypt malware C2 payload.
         
@@ -93,7 +92,7 @@ class TemplateHandler(ProtocolHandler):
         if len(data) < 16:  # TODO: Set minimum expected packet size
             raise ValueError(f"Packet too short: {len(data)} bytes")
         
-        logger.debug(f"[{self.name}] Decrypting {len(data)} bytes")
+        logger.debug(f"{self._name_tag} Decrypting {len(data)} bytes")
         
         try:
             # TODO: Choose appropriate decryption method
@@ -104,7 +103,8 @@ class TemplateHandler(ProtocolHandler):
             # Option 2: RC4 Decryption
             # decrypted = rc4_decrypt(data, self.ENCRYPTION_KEY)
             
-            # Option 3: AES-CBC Decryption
+            # Option 3: AES-CBC Decryption (or subclass AESProtocolHandler
+            # from app.protocols.aes_base and set AES_KEY / AES_IV instead)
             # decrypted = aes_decrypt(data, self.ENCRYPTION_KEY, self.AES_IV, mode="CBC")
             # decrypted = pkcs7_unpad(decrypted)  # Remove padding
             
@@ -115,14 +115,14 @@ class TemplateHandler(ProtocolHandler):
             # Option 5: Custom Decryption
             # decrypted = self._custom_decrypt(data)
             
-            logger.debug(f"[{self.name}] Decryption successful")
+            logger.debug(f"{self._name_tag} Decryption successful")
             return decrypted
             
         except Exception as e:
-            logger.error(f"[{self.name}] Decryption failed: {e}")
+            logger.error(f"{self._name_tag} Decryption failed: {e}")
             raise ValueError(f"Decryption error: {e}")
     
-    async def parse(self, decrypted_data: bytes, client_info: Dict[str, Any]) -> Dict[str, Any]:
+    def parse(self, decrypted_data: bytes, client_info: Dict[str, Any]) -> Dict[str, Any]:
         """
         Parse decrypted payload into structured data.
         
@@ -194,7 +194,7 @@ class TemplateHandler(ProtocolHandler):
                 # TODO: Add malware-specific fields
                 # "malware_version": version,
                 # "campaign_id": campaign,
-                # "extra_data": json.dumps(additional_data),
+                # "extra_data": additional_data,
             }
             
             # Extract keystroke logs
@@ -225,7 +225,7 @@ class TemplateHandler(ProtocolHandler):
             #     }
             #     credentials.append(cred)
             
-            logger.info(f"[{self.name}] Parsed data from {bot_id}: "
+            logger.info(f"{self._name_tag} Parsed data from {bot_id}: "
                        f"{len(logs)} logs, {len(credentials)} credentials")
             
             return {
@@ -235,9 +235,9 @@ class TemplateHandler(ProtocolHandler):
             }
             
         except Exception as e:
-            logger.error(f"[{self.name}] Parsing error: {e}")
+            logger.error(f"{self._name_tag} Parsing error: {e}")
             # Log hexdump for debugging
-            logger.debug(f"[{self.name}] Failed to parse data:\n{hexdump(decrypted_data)}")
+            logger.debug(f"{self._name_tag} Failed to parse data:\n{hexdump(decrypted_data)}")
             raise ValueError(f"Parse error: {e}")
     
     async def generate_response(self, parsed_data: Dict[str, Any]) -> bytes | None:
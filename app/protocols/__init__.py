@@ -1,5 +1,6 @@
 """Protocol handler plugin system for malware family support."""
 
-from app.protocols.base import ProtocolHandler
+from app.protocols.aes_base import AESProtocolHandler
+from app.protocols.base import ProtocolHandler, get_registered_handlers
 
-__all__ = ["ProtocolHandler"]
+__all__ = ["AESProtocolHandler", "ProtocolHandler", "get_registered_handlers"]
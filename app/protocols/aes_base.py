@@ -0,0 +1,84 @@
+"""
+Base class for AES-encrypted malware protocols.
+
+Many families wrap their C2 traffic in AES-CBC or AES-ECB with a key
+and IV hardcoded in the sample. Handlers for them only need to set the
+key material and implement parse().
+"""
+
+from typing import Optional
+
+from Crypto.Cipher import AES
+
+from app.protocols.base import ProtocolHandler
+from app.protocols.utils import pkcs7_unpad
+
+
+class AESProtocolHandler(ProtocolHandler):
+    """
+    Protocol handler whose payloads are AES-encrypted.
+    
+    PyCryptodome selects its AES-NI implementation on CPUs that support
+    it. Key and IV sizes are checked once when the handler is created,
+    and in ECB mode the cipher object is stateless, so one instance is
+    reused for every packet.
+    
+    Attributes:
+        AES_KEY: 16, 24 or 32 byte key
+        AES_IV: 16 byte IV (CBC only)
+        AES_MODE: "CBC" or "ECB"
+        AES_PADDED: Whether plaintext carries PKCS7 padding
+    """
+    
+    __slots__ = ("_ecb_cipher",)
+    
+    AES_KEY: bytes = b""
+    AES_IV: Optional[bytes] = None
+    AES_MODE = "CBC"
+    AES_PADDED = True
+    
+    def __init__(self, db_session_factory):
+        """
+        Initialize the handler and validate its key material.
+        
+        Args:
+            db_session_factory: Async session factory for database operations
+        
+        Raises:
+            ValueError: If the key, IV or mode is invalid
+        """
+        super().__init__(db_session_factory)
+        
+        mode = self.AES_MODE.upper()
+        if mode == "ECB":
+            self._ecb_cipher = AES.new(self.AES_KEY, AES.MODE_ECB)
+        elif mode == "CBC":
+            # Building a CBC cipher checks the key and IV sizes
+            AES.new(self.AES_KEY, AES.MODE_CBC, self.AES_IV)
+            self._ecb_cipher = None
+        else:
+            raise ValueError(f"Unsupported AES mode: {self.AES_MODE}")
+    
+    def decrypt(self, data: bytes) -> bytes:
+        """
+        Decrypt an AES payload and strip its padding.
+        
+        Args:
+            data: Encrypted payload (a multiple of the 16 byte block size)
+        
+        Returns:
+            Decrypted plaintext bytes
+        
+        Raises:
+            ValueError: If the payload length or padding is invalid
+        """
+        if not data or len(data) % AES.block_size:
+            raise ValueError(f"Payload is not a whole number of AES blocks: {len(data)} bytes")
+        
+        if self._ecb_cipher is not None:
+            plaintext = self._ecb_cipher.decrypt(data)
+        else:
+            # CBC chains state through the IV, so each packet needs a fresh cipher
+            plaintext = AES.new(self.AES_KEY, AES.MODE_CBC, self.AES_IV).decrypt(data)
+        
+        return pkcs7_unpad(plaintext) if self.AES_PADDED else plaintext
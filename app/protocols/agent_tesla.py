@@ -13,16 +13,45 @@ This handler implements SMTP/HTTP interception and credential extraction.
 
 import re
 import base64
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 
+import orjson
+
 from app.protocols.base import ProtocolHandler
-from app.protocols.utils import extract_delimited_strings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
+# Per-field result updates for parse(), called as
+# handler(result, field, value, captured_at)
+
+def _set_hostname(result: Dict, field: str, value: str, captured_at: str) -> None:
+    result['hostname'] = value
+    result['bot_id'] = value
+
+
+def _set_username(result: Dict, field: str, value: str, captured_at: str) -> None:
+    result['username'] = value
+
+
+def _set_os_info(result: Dict, field: str, value: str, captured_at: str) -> None:
+    result['os_info'] = value
+
+
+def _add_clipboard_log(result: Dict, field: str, value: str, captured_at: str) -> None:
+    result['logs'].append({
+        'log_type': 'clipboard',
+        'data': value,
+        'captured_at': captured_at
+    })
+
+
+def _set_system_info(result: Dict, field: str, value: str, captured_at: str) -> None:
+    result['system_info'][field] = value
+
+
 class AgentTeslaHandler(ProtocolHandler):
     """
     Handler for AgentTesla malware C2 traffic.
@@ -47,39 +76,80 @@ class AgentTeslaHandler(ProtocolHandler):
         </body></html>
     """
     
-    @property
-    def name(self) -> str:
-        return "AgentTesla"
+    __slots__ = ()
     
-    @property
-    def port(self) -> int:
-        return 5555  # Custom port for AgentTesla simulation
+    name = "AgentTesla"
+    port = 5555  # Custom port for AgentTesla simulation
     
-    # Regex patterns for data extraction
-    PATTERNS = {
-        'time': re.compile(r'<b>Time:</b>\s*([^<]+)', re.IGNORECASE),
-        'username': re.compile(r'<b>User Name:</b>\s*([^<]+)', re.IGNORECASE),
-        'computer_name': re.compile(r'<b>Computer Name:</b>\s*([^<]+)', re.IGNORECASE),
-        'os': re.compile(r'<b>OSFullName:</b>\s*([^<]+)', re.IGNORECASE),
-        'cpu': re.compile(r'<b>CPU:</b>\s*([^<]+)', re.IGNORECASE),
-        'ram': re.compile(r'<b>RAM:</b>\s*([^<]+)', re.IGNORECASE),
-        'ip': re.compile(r'<b>IP Address:</b>\s*([^<]+)', re.IGNORECASE),
-        'clipboard': re.compile(r'<b>Clipboard:</b>\s*([^<]+)', re.IGNORECASE),
+    # HTML field labels (lowercase) mapped to result fields
+    FIELD_LABELS = {
+        'time': 'time',
+        'user name': 'username',
+        'computer name': 'computer_name',
+        'osfullname': 'os',
+        'cpu': 'cpu',
+        'ram': 'ram',
+        'ip address': 'ip',
+        'clipboard': 'clipboard',
     }
     
+    # (field, handler) pairs in output order
+    FIELD_DISPATCH = (
+        ('time', _set_system_info),
+        ('username', _set_username),
+        ('computer_name', _set_hostname),
+        ('os', _set_os_info),
+        ('cpu', _set_system_info),
+        ('ram', _set_system_info),
+        ('ip', _set_system_info),
+        ('clipboard', _add_clipboard_log),
+    )
+    
+    # All labeled fields, matched in a single pass over the HTML
+    FIELDS = re.compile(
+        r'<b>(' + '|'.join(re.escape(label) for label in FIELD_LABELS) + r'):</b>\s*([^<]+)',
+        re.IGNORECASE
+    )
+    
     # Password block extraction
     PASSWORD_BLOCK = re.compile(
         r'<b>Passwords:</b>(.*?)(?:</body>|<b>)',
         re.DOTALL | re.IGNORECASE
     )
     
-    # Individual password entry
+    # Labels that follow URL: within a password entry, one per line
+    PASSWORD_ENTRY_LABELS = ('Username', 'Password', 'Application')
+    
+    # Fallback for other layouts: split points, one entry per "URL:" so
+    # entry matching stays linear on malformed blocks
+    PASSWORD_ENTRY_START = re.compile(r'(?=URL:)')
+    
+    # Individual password entry; URL and username stop at the next label
     PASSWORD_ENTRY = re.compile(
-        r'URL:\s*(.+?)\s*Username:\s*(.+?)\s*Password:\s*(.+?)(?:\s*Application:\s*(.+?))?(?:\n|<br>|$)',
+        r'URL:\s*(?P<url>(?:(?!Username:).)+?)'
+        r'\s*Username:\s*(?P<username>(?:(?!Password:).)+?)'
+        r'\s*Password:\s*(?P<password>.+?)'
+        r'(?:\s*Application:\s*(?P<application>.+?))?(?:\n|<br>|$)',
         re.DOTALL
     )
     
-    async def decrypt(self, data: bytes) -> bytes:
+    # Email body inside an SMTP DATA command
+    SMTP_DATA = re.compile(rb'DATA\r?\n(.+?)\r?\n\.\r?\n', re.DOTALL)
+    
+    # Plain text fallbacks: URL/Username/Password and email:password
+    PLAINTEXT_CREDENTIAL = re.compile(
+        r'(?:URL|Site|Website):\s*(.+?)\s+'
+        r'(?:User|Username|Email):\s*(.+?)\s+'
+        r'(?:Pass|Password|Pwd):\s*(.+?)(?:\n|$)',
+        re.IGNORECASE
+    )
+    EMAIL_CREDENTIAL = re.compile(
+        # Only try at the start of a local-part run, not at every character
+        r'(?<![a-zA-Z0-9._%+-])([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}):([^\s]+)',
+        re.IGNORECASE
+    )
+    
+    def decrypt(self, data: bytes) -> bytes:
         """
         AgentTesla typically sends data in plain HTML or base64-encoded.
         
@@ -89,30 +159,29 @@ class AgentTeslaHandler(ProtocolHandler):
         3. SMTP envelope parsing (extracts body from SMTP DATA command)
         """
         try:
-            # Try decoding as UTF-8 first
-            decoded = data.decode('utf-8', errors='ignore')
-            
-            # Check if it's SMTP traffic (contains SMTP commands)
-            if 'MAIL FROM:' in decoded or 'RCPT TO:' in decoded:
+            # Check if it's SMTP traffic (contains SMTP commands). Screening
+            # the raw bytes means other packets are never decoded here.
+            if b'MAIL FROM:' in data or b'RCPT TO:' in data:
                 # Extract email body from SMTP DATA command
-                data_match = re.search(r'DATA\r?\n(.+?)\r?\n\.\r?\n', decoded, re.DOTALL)
+                data_match = self.SMTP_DATA.search(data)
                 if data_match:
-                    decoded = data_match.group(1)
+                    data = data_match.group(1)
             
-            # Check if body is base64 encoded
-            if not '<html>' in decoded.lower():
+            # Check if body is base64 encoded; only ASCII text can be
+            if b'<html>' not in data.lower() and data.isascii():
                 try:
-                    decoded = base64.b64decode(decoded).decode('utf-8', errors='ignore')
+                    return base64.b64decode(data)
                 except Exception:
                     pass  # Not base64, use as is
             
-            return decoded.encode('utf-8')
+            # parse() decodes the result itself
+            return data
             
         except Exception as e:
-            logger.error(f"[{self.name}] Decryption failed: {e}")
+            logger.error(f"{self._name_tag} Decryption failed: {e}")
             return data  # Return original if decryption fails
     
-    async def parse(self, decrypted_data: bytes) -> Dict:
+    def parse(self, decrypted_data: bytes) -> Dict:
         """
         Parse AgentTesla HTML exfiltration data.
         
@@ -150,6 +219,9 @@ class AgentTeslaHandler(ProtocolHandler):
         try:
             html_data = decrypted_data.decode('utf-8', errors='ignore')
             
+            # One capture timestamp for everything in this packet
+            captured_at = datetime.utcnow().isoformat()
+            
             result = {
                 'bot_id': None,
                 'hostname': None,
@@ -160,35 +232,22 @@ class AgentTeslaHandler(ProtocolHandler):
                 'credentials': []
             }
             
-            # Extract basic system information
-            for field, pattern in self.PATTERNS.items():
-                match = pattern.search(html_data)
-                if match:
-                    value = match.group(1).strip()
-                    
-                    if field == 'computer_name':
-                        result['hostname'] = value
-                        result['bot_id'] = value
-                    elif field == 'username':
-                        result['username'] = value
-                    elif field == 'os':
-                        result['os_info'] = value
-                    elif field == 'clipboard':
-                        # Log clipboard data
-                        result['logs'].append({
-                            'log_type': 'clipboard',
-                            'data': value,
-                            'captured_at': datetime.utcnow().isoformat()
-                        })
-                    else:
-                        result['system_info'][field] = value
+            # Extract basic system information (first occurrence of each field)
+            found = {}
+            for match in self.FIELDS.finditer(html_data):
+                found.setdefault(self.FIELD_LABELS[match.group(1).lower()], match.group(2))
+            
+            for field, handler in self.FIELD_DISPATCH:
+                value = found.get(field)
+                if value is not None:
+                    handler(result, field, value.strip(), captured_at)
             
             # Create system info log entry
             if result['system_info']:
                 result['logs'].append({
                     'log_type': 'system_info',
-                    'data': str(result['system_info']),
-                    'captured_at': datetime.utcnow().isoformat()
+                    'data': orjson.dumps(result['system_info']).decode('utf-8'),
+                    'captured_at': captured_at
                 })
             
             # Extract credentials from password block
@@ -197,28 +256,24 @@ class AgentTeslaHandler(ProtocolHandler):
                 password_block = password_block_match.group(1)
                 
                 # Find all password entries
-                for entry_match in self.PASSWORD_ENTRY.finditer(password_block):
-                    url = entry_match.group(1).strip()
-                    username = entry_match.group(2).strip()
-                    password = entry_match.group(3).strip()
-                    application = entry_match.group(4).strip() if entry_match.group(4) else None
-                    
+                for url, username, password, application in self._split_password_entries(password_block):
                     result['credentials'].append({
                         'cred_type': 'password',
                         'url': url if url and url != '-' else None,
                         'username': username if username else None,
                         'password': password if password else None,
                         'application': application,
-                        'captured_at': datetime.utcnow().isoformat()
+                        'captured_at': captured_at
                     })
             
             # Additional credential extraction from plain text patterns
             # (for cases where HTML formatting is broken)
-            additional_creds = self._extract_plaintext_credentials(html_data)
-            result['credentials'].extend(additional_creds)
+            result['credentials'].extend(
+                self._extract_plaintext_credentials(html_data, captured_at)
+            )
             
             logger.info(
-                f"[{self.name}] Parsed data: "
+                f"{self._name_tag} Parsed data: "
                 f"Bot={result['bot_id']}, "
                 f"Logs={len(result['logs'])}, "
                 f"Credentials={len(result['credentials'])}"
@@ -227,7 +282,7 @@ class AgentTeslaHandler(ProtocolHandler):
             return result
             
         except Exception as e:
-            logger.error(f"[{self.name}] Parse error: {e}")
+            logger.error(f"{self._name_tag} Parse error: {e}")
             return {
                 'bot_id': None,
                 'hostname': None,
@@ -237,7 +292,60 @@ class AgentTeslaHandler(ProtocolHandler):
                 'credentials': []
             }
     
-    def _extract_plaintext_credentials(self, data: str) -> List[Dict]:
+    def _split_password_entries(self, block: str) -> List[Tuple[str, str, str, Optional[str]]]:
+        """
+        Split a password block into credential fields.
+        
+        AgentTesla writes one "Label: value" per line (or per <br>), so the
+        block is read line by line. If any entry is incomplete the layout is
+        something else, and the PASSWORD_ENTRY regex is used instead.
+        
+        Args:
+            block: Text following the <b>Passwords:</b> label
+        
+        Returns:
+            List of (url, username, password, application) tuples
+        """
+        entries = []
+        fields = None
+        for line in block.replace('<br>', '\n').splitlines():
+            label, sep, value = line.partition(':')
+            if not sep:
+                continue
+            label = label.strip()
+            if label == 'URL':
+                fields = {'URL': value}
+                entries.append(fields)
+            elif fields is not None and label in self.PASSWORD_ENTRY_LABELS:
+                fields.setdefault(label, value)
+        
+        if entries and all('Username' in fields and 'Password' in fields for fields in entries):
+            return [
+                (
+                    fields['URL'].strip(),
+                    fields['Username'].strip(),
+                    fields['Password'].strip(),
+                    fields['Application'].strip() if 'Application' in fields else None,
+                )
+                for fields in entries
+            ]
+        
+        parsed = []
+        for entry_text in self.PASSWORD_ENTRY_START.split(block):
+            entry_match = self.PASSWORD_ENTRY.match(entry_text)
+            if not entry_match:
+                continue
+            
+            application = entry_match['application']
+            parsed.append((
+                entry_match['url'].strip(),
+                entry_match['username'].strip(),
+                entry_match['password'].strip(),
+                application.strip() if application else None,
+            ))
+        return parsed
+    
+    def _extract_plaintext_credentials(self, data: str, captured_at: str) -> Iterator[Dict]:
         """
         Extract credentials from plain text using pattern matching.
         
@@ -245,45 +353,36 @@ class AgentTeslaHandler(ProtocolHandler):
         - URL: ... Username: ... Password: ...
         - login: username pass: password
         - email@example.com:password123
-        """
-        credentials = []
         
-        # Pattern 1: URL/Username/Password format
-        pattern1 = re.compile(
-            r'(?:URL|Site|Website):\s*(.+?)\s+'
-            r'(?:User|Username|Email):\s*(.+?)\s+'
-            r'(?:Pass|Password|Pwd):\s*(.+?)(?:\n|$)',
-            re.IGNORECASE
-        )
+        Args:
+            data: Decoded packet text
+            captured_at: ISO timestamp stamped on every credential
         
-        for match in pattern1.finditer(data):
-            credentials.append({
+        Yields:
+            Credential dictionaries, one per match
+        """
+        # Pattern 1: URL/Username/Password format
+        for match in self.PLAINTEXT_CREDENTIAL.finditer(data):
+            yield {
                 'cred_type': 'password',
                 'url': match.group(1).strip(),
                 'username': match.group(2).strip(),
                 'password': match.group(3).strip(),
                 'application': None,
-                'captured_at': datetime.utcnow().isoformat()
-            })
+                'captured_at': captured_at
+            }
         
         # Pattern 2: email:password format
-        pattern2 = re.compile(
-            r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}):([^\s]+)',
-            re.IGNORECASE
-        )
-        
-        for match in pattern2.finditer(data):
-            credentials.append({
+        for match in self.EMAIL_CREDENTIAL.finditer(data):
+            yield {
                 'cred_type': 'password',
                 'url': None,
                 'username': match.group(1).strip(),
                 'email': match.group(1).strip(),
                 'password': match.group(2).strip(),
                 'application': None,
-                'captured_at': datetime.utcnow().isoformat()
-            })
-        
-        return credentials
+                'captured_at': captured_at
+            }
     
     async def generate_response(self, parsed_data: Dict) -> bytes:
         """
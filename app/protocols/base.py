@@ -6,16 +6,177 @@ the required abstract methods for decryption, parsing, and connection handling.
 """
 
 import asyncio
+import inspect
+import logging
+import os
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Tuple
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type
 
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.database import bulk_insert
+from app.core.enrichment import enrich_bot_and_payloads, iter_utf8_chunks
 from app.core.logging import get_logger, get_traffic_logger
+from app.core.notifier import send_notification
+from app.core.websocket import get_connection_manager
+from app.core.yara_engine import get_yara_engine
+from app.models.bot import Bot
+from app.models.credential import Credential
+from app.models.log import Log
+from app.protocols.utils import hexdump
 
 logger = get_logger(__name__)
 traffic_logger = get_traffic_logger()
 
+# Handler classes in definition order, filled as protocol modules are imported
+_handler_registry: List[Type["ProtocolHandler"]] = []
+
+# Payloads larger than this are decrypted and parsed off the event loop
+CPU_OFFLOAD_THRESHOLD = 4096
+
+# Shared pool for decrypt/parse work, created on first use
+_cpu_executor: Optional[ThreadPoolExecutor] = None
+
+# Caps payload processing across all handlers, created on first use
+_handler_gate: Optional[asyncio.Semaphore] = None
+
+
+def _get_handler_gate() -> asyncio.Semaphore:
+    """Get or create the global payload processing semaphore."""
+    global _handler_gate
+    if _handler_gate is None:
+        _handler_gate = asyncio.Semaphore(settings.max_concurrent_handlers)
+    return _handler_gate
+
+
+def _traffic_hexdump(data: bytes) -> str:
+    """Hexdump the start of a payload for the traffic log, like tcpdump -s."""
+    limit = settings.traffic_hexdump_bytes
+    if not limit or len(data) <= limit:
+        return hexdump(data)
+    return f"{hexdump(data[:limit])}\n... ({len(data) - limit} more bytes)"
+
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    """
+    Get or create the executor used for payload decryption and parsing.
+    
+    Returns:
+        ThreadPoolExecutor sized to the CPU count
+    """
+    global _cpu_executor
+    if _cpu_executor is None:
+        _cpu_executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 4,
+            thread_name_prefix="protocol",
+        )
+    return _cpu_executor
+
+
+def close_cpu_executor() -> None:
+    """
+    Shut down the payload processing executor.
+    
+    Should be called on application shutdown.
+    """
+    global _cpu_executor
+    if _cpu_executor is not None:
+        _cpu_executor.shutdown(wait=True)
+        _cpu_executor = None
+
+
+class StoreWriter:
+    """
+    Stores parsed payloads from background tasks.
+    
+    Handlers queue parsed data and close the malware connection straight
+    away; a fixed pool of workers drains the queues so bursts reach the
+    database at a steady rate. Each bot hashes to one worker, so its
+    payloads are stored in arrival order.
+    """
+    
+    def __init__(self, maxsize: int = 10_000):
+        self._maxsize = maxsize
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+    
+    def submit(self, handler: "ProtocolHandler", parsed_data: Dict[str, Any]) -> None:
+        """
+        Queue parsed data for storage.
+        
+        Args:
+            handler: Handler whose _store_data() writes the payload
+            parsed_data: Dictionary with bot_info, logs, and credentials
+        """
+        if not self._queues:
+            self._start()
+        else:
+            self._restart_dead_workers()
+        
+        bot_id = parsed_data.get("bot_info", {}).get("bot_id")
+        queue = self._queues[hash(bot_id) % len(self._queues)]
+        try:
+            queue.put_nowait((handler, parsed_data))
+        except asyncio.QueueFull:
+            logger.warning(f"{handler._name_tag} Store queue full, dropping payload from bot {bot_id}")
+    
+    def _start(self) -> None:
+        """Create the queues and their worker tasks."""
+        writers = settings.db_writers
+        self._queues = [asyncio.Queue(maxsize=max(1, self._maxsize // writers)) for _ in range(writers)]
+        self._tasks = [asyncio.create_task(self._run(queue)) for queue in self._queues]
+    
+    def _restart_dead_workers(self) -> None:
+        """Start a new worker on the queue of any that died, keeping its payloads."""
+        for index, task in enumerate(self._tasks):
+            if task.done():
+                logger.warning(f"Store writer {index} stopped, restarting it")
+                self._tasks[index] = asyncio.create_task(self._run(self._queues[index]))
+    
+    async def _run(self, queue: asyncio.Queue) -> None:
+        """Store queued payloads one at a time until cancelled."""
+        while True:
+            handler, parsed_data = await queue.get()
+            try:
+                await handler._store_data(parsed_data)
+            except Exception:
+                # Already logged with its traceback by _store_data
+                pass
+            finally:
+                queue.task_done()
+    
+    async def stop(self) -> None:
+        """Store any queued payloads and stop the workers."""
+        if not self._tasks:
+            return
+        
+        await asyncio.gather(*(queue.join() for queue in self._queues))
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queues = []
+
+
+# Global store writer instance
+store_writer = StoreWriter()
+
+
+def get_store_writer() -> StoreWriter:
+    """
+    Get the global store writer.
+    
+    Returns:
+        StoreWriter instance
+    """
+    return store_writer
+
 
 class ProtocolHandler(ABC):
     """
@@ -29,8 +190,27 @@ class ProtocolHandler(ABC):
         name: Human-readable protocol name
         port: TCP/UDP port to listen on
         use_udp: Whether to use UDP instead of TCP
+    
+    Subclasses usually set these as plain class attributes, which
+    override the abstract properties without a call on every access.
+    Per-instance state lives in __slots__; subclasses that declare their
+    own __slots__ stay free of a per-instance __dict__.
     """
     
+    __slots__ = (
+        "db_session_factory",
+        "active_connections",
+        "_max_per_ip",
+        "_name_tag",
+        "_rate_limited_ips",
+        "_rate_limited_minute",
+    )
+    
+    def __init_subclass__(cls, **kwargs):
+        """Register every subclass so the loader needn't scan modules."""
+        super().__init_subclass__(**kwargs)
+        _handler_registry.append(cls)
+    
     def __init__(self, db_session_factory):
         """
         Initialize protocol handler.
@@ -39,7 +219,11 @@ class ProtocolHandler(ABC):
             db_session_factory: Async session factory for database operations
         """
         self.db_session_factory = db_session_factory
-        self.active_connections: Dict[str, int] = {}  # IP -> connection count
+        self.active_connections: Counter[str] = Counter()  # IP -> connection count
+        self._max_per_ip = settings.max_connections_per_ip
+        self._name_tag = f"[{self.name}]"  # Log prefix, built once
+        self._rate_limited_ips: Set[str] = set()  # IPs already logged this minute
+        self._rate_limited_minute = 0
     
     @property
     @abstractmethod
@@ -53,18 +237,17 @@ class ProtocolHandler(ABC):
         """Return the port number this protocol listens on."""
         pass
     
-    @property
-    def use_udp(self) -> bool:
-        """Return True if this protocol uses UDP instead of TCP."""
-        return False
+    # True if this protocol uses UDP instead of TCP
+    use_udp = False
     
     @abstractmethod
-    async def decrypt(self, data: bytes) -> bytes:
+    def decrypt(self, data: bytes) -> bytes:
         """
         Decrypt malware C2 payload.
         
         Implement the specific decryption algorithm (XOR, RC4, AES, etc.)
-        used by this malware family.
+        used by this malware family. This is plain CPU work and may run in
+        a worker thread, so it must not touch the event loop.
         
         Args:
             data: Encrypted payload from malware
@@ -78,12 +261,13 @@ class ProtocolHandler(ABC):
         pass
     
     @abstractmethod
-    async def parse(self, decrypted_data: bytes) -> Dict[str, Any]:
+    def parse(self, decrypted_data: bytes) -> Dict[str, Any]:
         """
         Parse decrypted payload into structured data.
         
         Extract bot information, keystrokes, credentials, etc. from the
-        decrypted payload based on the malware's data format.
+        decrypted payload based on the malware's data format. Like
+        decrypt(), this may run in a worker thread.
         
         Args:
             decrypted_data: Decrypted payload bytes
@@ -99,6 +283,71 @@ class ProtocolHandler(ABC):
         """
         pass
     
+    async def read_frame(self, reader: asyncio.StreamReader) -> bytes:
+        """
+        Read one payload from the connection.
+        
+        The default is a single read of up to max_packet_size, which suits
+        implants that send their beacon and keep the socket open for an
+        ACK. Protocols with explicit framing can override this with
+        _read_length_prefixed() or _read_until_eof().
+        
+        Args:
+            reader: StreamReader for reading from socket
+            
+        Returns:
+            Payload bytes, or b"" if the peer closed before sending any
+        """
+        return await reader.read(settings.max_packet_size)
+    
+    async def _read_length_prefixed(self, reader: asyncio.StreamReader) -> bytes:
+        """
+        Read a 4-byte big-endian length followed by exactly that many bytes.
+        
+        Args:
+            reader: StreamReader for reading from socket
+            
+        Returns:
+            Payload bytes, or b"" if the peer closed before sending any
+            
+        Raises:
+            asyncio.IncompleteReadError: If the peer closed mid-frame
+            ValueError: If the declared length exceeds max_packet_size
+        """
+        try:
+            header = await reader.readexactly(4)
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return b""
+            raise
+        
+        length = int.from_bytes(header, "big")
+        if length > settings.max_packet_size:
+            raise ValueError(f"Frame too large: {length} bytes")
+        
+        return await reader.readexactly(length)
+    
+    async def _read_until_eof(self, reader: asyncio.StreamReader) -> bytes:
+        """
+        Read until the peer closes its side, up to max_packet_size.
+        
+        Args:
+            reader: StreamReader for reading from socket
+            
+        Returns:
+            Everything the peer sent
+            
+        Raises:
+            ValueError: If the peer sends more than max_packet_size
+        """
+        limit = settings.max_packet_size
+        buffer = bytearray()
+        while chunk := await reader.read(8192):
+            buffer += chunk
+            if len(buffer) > limit:
+                raise ValueError(f"Payload exceeds {limit} bytes")
+        return bytes(buffer)
+    
     async def handle_connection(
         self,
         reader: asyncio.StreamReader,
@@ -118,87 +367,47 @@ class ProtocolHandler(ABC):
         client_ip = client_addr[0] if client_addr else "unknown"
         client_port = client_addr[1] if client_addr else 0
         
-        logger.info(f"[{self.name}] New connection from {client_ip}:{client_port}")
-        
-        # Connection rate limiting
+        # Connection rate limiting; abort() resets the socket at once
+        # instead of waiting on a graceful close
         if not self._check_rate_limit(client_ip):
-            logger.warning(f"[{self.name}] Rate limit exceeded for {client_ip}")
-            writer.close()
-            await writer.wait_closed()
+            writer.transport.abort()
+            self._log_rate_limited(client_ip)
             return
         
+        logger.info(f"{self._name_tag} New connection from {client_ip}:{client_port}")
+        
         try:
             # Read data from malware
-            raw_data = await asyncio.wait_for(
-                reader.read(65536),  # Max 64KB
-                timeout=30.0
-            )
-            
-            if not raw_data:
-                logger.warning(f"[{self.name}] Empty data from {client_ip}")
-                return
-            
-            logger.info(f"[{self.name}] Received {len(raw_data)} bytes from {client_ip}")
-            
-            # Log raw traffic
-            from app.protocols.utils import hexdump
-            traffic_logger.info(f"\n[{self.name}] RAW DATA from {client_ip}:\n{hexdump(raw_data)}")
-            
-            # Decrypt payload
             try:
-                decrypted_data = await self.decrypt(raw_data)
-                traffic_logger.info(f"\n[{self.name}] DECRYPTED DATA from {client_ip}:\n{hexdump(decrypted_data)}")
-            except Exception as e:
-                logger.error(f"[{self.name}] Decryption failed for {client_ip}: {e}")
+                raw_data = await asyncio.wait_for(
+                    self.read_frame(reader),
+                    timeout=settings.connection_timeout
+                )
+            except ValueError as e:
+                logger.warning(f"{self._name_tag} Rejected payload from {client_ip}: {e}")
                 return
             
-            # YARA malware signature scanning
-            yara_matches = []
-            try:
-                from app.core.yara_engine import get_yara_engine
-                yara_engine = get_yara_engine()
-                yara_matches = await yara_engine.scan_payload(decrypted_data)
-                if yara_matches:
-                    logger.warning(
-                        f"[{self.name}] YARA DETECTION from {client_ip}: "
-                        f"Matched rules: {', '.join(yara_matches)}"
-                    )
-            except Exception as e:
-                logger.debug(f"[{self.name}] YARA scan error (non-critical): {e}")
-            
-            # Parse into structured data
-            try:
-                parsed_data = await self.parse(decrypted_data)
-                # Add client info to bot_info
-                if "bot_info" not in parsed_data:
-                    parsed_data["bot_info"] = {}
-                parsed_data["bot_info"]["ip_address"] = client_ip
-                parsed_data["bot_info"]["port"] = client_port
-                parsed_data["bot_info"]["protocol"] = self.name
-                
-                # Add YARA detection results
-                if yara_matches:
-                    parsed_data["bot_info"]["yara_tags"] = ",".join(yara_matches)
-                    parsed_data["yara_matches"] = yara_matches
-            except Exception as e:
-                logger.error(f"[{self.name}] Parsing failed for {client_ip}: {e}")
+            if not raw_data:
+                logger.warning(f"{self._name_tag} Empty data from {client_ip}")
                 return
             
-            # Store in database
-            await self._store_data(parsed_data)
+            logger.info(f"{self._name_tag} Received {len(raw_data)} bytes from {client_ip}")
             
-            logger.info(f"[{self.name}] Successfully processed data from {client_ip}")
+            # One timestamp for the bot and every row stored from this payload
+            received_at = datetime.utcnow()
             
-            # Send response if needed (some malware expects ACK)
-            response = await self.generate_response(parsed_data)
-            if response:
-                writer.write(response)
-                await writer.drain()
+            # Decrypt/parse/store under the global cap; the read above is
+            # outside it so slow senders don't hold a slot
+            async with _get_handler_gate():
+                await self._process_payload(writer, raw_data, client_ip, client_port, received_at)
             
         except asyncio.TimeoutError:
-            logger.warning(f"[{self.name}] Connection timeout from {client_ip}")
+            logger.warning(f"{self._name_tag} Connection timeout from {client_ip}")
+        except asyncio.IncompleteReadError as e:
+            logger.warning(f"{self._name_tag} Truncated frame from {client_ip}: "
+                           f"got {len(e.partial)} of {e.expected} bytes")
         except Exception as e:
-            logger.error(f"[{self.name}] Error handling connection from {client_ip}: {e}", exc_info=True)
+            logger.error(f"{self._name_tag} Error handling connection from {client_ip}: {e}", exc_info=True)
         finally:
             self._release_rate_limit(client_ip)
             try:
@@ -207,6 +416,108 @@ class ProtocolHandler(ABC):
             except Exception:
                 pass
     
+    async def _process_payload(
+        self,
+        writer: asyncio.StreamWriter,
+        raw_data: bytes,
+        client_ip: str,
+        client_port: int,
+        received_at: datetime
+    ) -> None:
+        """
+        Decrypt, scan, parse and store one received payload.
+        
+        Args:
+            writer: StreamWriter for sending the optional response
+            raw_data: Payload read from the socket
+            client_ip: Remote address
+            client_port: Remote port
+            received_at: When the payload was read
+        """
+        # Hexdumps are costly on large payloads, so skip them when unused
+        log_traffic = traffic_logger.isEnabledFor(logging.INFO)
+        
+        # Log raw traffic
+        if log_traffic:
+            traffic_logger.info(
+                "\n%s RAW DATA from %s (%d bytes):\n%s",
+                self._name_tag, client_ip, len(raw_data), _traffic_hexdump(raw_data)
+            )
+        
+        # Decrypt payload
+        try:
+            decrypted_data = await self._run_cpu(self.decrypt, raw_data)
+            if log_traffic:
+                traffic_logger.info(
+                    "\n%s DECRYPTED DATA from %s (%d bytes):\n%s",
+                    self._name_tag, client_ip, len(decrypted_data), _traffic_hexdump(decrypted_data)
+                )
+        except Exception as e:
+            logger.error(f"{self._name_tag} Decryption failed for {client_ip}: {e}")
+            return
+        
+        # YARA malware signature scanning
+        yara_matches = []
+        try:
+            yara_engine = get_yara_engine()
+            yara_matches = await yara_engine.scan_payload(decrypted_data)
+            if yara_matches:
+                logger.warning(
+                    f"{self._name_tag} YARA DETECTION from {client_ip}: "
+                    f"Matched rules: {', '.join(yara_matches)}"
+                )
+        except Exception as e:
+            logger.debug(f"{self._name_tag} YARA scan error (non-critical): {e}")
+        
+        # Parse into structured data
+        try:
+            parsed_data = await self._run_cpu(self.parse, decrypted_data)
+            # Add client info to bot_info
+            if "bot_info" not in parsed_data:
+                parsed_data["bot_info"] = {}
+            parsed_data["bot_info"]["ip_address"] = client_ip
+            parsed_data["bot_info"]["port"] = client_port
+            parsed_data["bot_info"]["protocol"] = self.name
+            parsed_data["received_at"] = received_at
+            
+            # Add YARA detection results
+            if yara_matches:
+                parsed_data["bot_info"]["yara_tags"] = ",".join(yara_matches)
+                parsed_data["yara_matches"] = yara_matches
+        except Exception as e:
+            logger.error(f"{self._name_tag} Parsing failed for {client_ip}: {e}")
+            return
+        
+        # Store in the background so the connection can close now
+        get_store_writer().submit(self, parsed_data)
+        
+        logger.info(f"{self._name_tag} Successfully processed data from {client_ip}")
+        
+        # Send response if needed (some malware expects ACK)
+        response = await self.generate_response(parsed_data)
+        if response:
+            writer.write(response)
+            await writer.drain()
+    
+    async def _run_cpu(self, func: Callable[[bytes], Any], data: bytes) -> Any:
+        """
+        Run a decrypt/parse step, off the event loop for large payloads.
+        
+        Small payloads are handled inline, where a thread hop would cost
+        more than the work itself.
+        
+        Args:
+            func: Bound decrypt() or parse() method
+            data: Payload to pass to it
+            
+        Returns:
+            Whatever func returns
+        """
+        if len(data) > CPU_OFFLOAD_THRESHOLD:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(get_cpu_executor(), func, data)
+        return func(data)
+    
     async def generate_response(self, parsed_data: Dict[str, Any]) -> Optional[bytes]:
         """
         Generate response to send back to malware.
@@ -224,173 +535,208 @@ class ProtocolHandler(ABC):
     
     def _check_rate_limit(self, ip: str) -> bool:
         """Check if IP is within connection rate limit."""
-        from app.core.config import settings
-        current = self.active_connections.get(ip, 0)
-        if current >= settings.max_connections_per_ip:
+        connections = self.active_connections
+        current = connections[ip] + 1
+        if current > self._max_per_ip:
             return False
-        self.active_connections[ip] = current + 1
+        connections[ip] = current
         return True
     
+    def _log_rate_limited(self, ip: str) -> None:
+        """Log a rejected connection, at most once per IP per minute."""
+        minute = int(time.monotonic() // 60)
+        if minute != self._rate_limited_minute:
+            self._rate_limited_minute = minute
+            self._rate_limited_ips.clear()
+        
+        if ip not in self._rate_limited_ips:
+            self._rate_limited_ips.add(ip)
+            logger.warning(f"{self._name_tag} Rate limit exceeded for {ip}")
+    
     def _release_rate_limit(self, ip: str) -> None:
         """Release connection slot for IP."""
-        if ip in self.active_connections:
-            self.active_connections[ip] -= 1
-            if self.active_connections[ip] <= 0:
-                del self.active_connections[ip]
+        connections = self.active_connections
+        current = connections[ip] - 1
+        if current > 0:
+            connections[ip] = current
+        else:
+            connections.pop(ip, None)
     
     async def _store_data(self, parsed_data: Dict[str, Any]) -> None:
         """
         Store parsed data in database and broadcast WebSocket events.
         
+        Events, notifications and enrichment are only emitted once the
+        transaction has committed, so the write lock is never held across
+        network calls and clients never see rows that were rolled back.
+        
         Args:
             parsed_data: Dictionary with bot_info, logs, and credentials
         """
-        from app.models.bot import Bot
-        from app.models.credential import Credential
-        from app.models.log import Log
-        from app.core.websocket import get_connection_manager
-        from sqlalchemy import select
+        bot_info = parsed_data.get("bot_info", {})
+        if not bot_info:
+            return
         
+        # Skip building event payloads when no dashboard is listening
         manager = get_connection_manager()
+        broadcast = manager.get_connection_count() > 0
+        
+        events = []
+        notification = None
+        enrich_ip = None
+        enrich_payloads = []
         
         async with self.db_session_factory() as session:
             try:
-                # Store or update bot information
-                bot_info = parsed_data.get("bot_info", {})
-                if bot_info:
-                    # Set default location values (no GeoIP lookup)
-                    bot_info.update({
-                        "country": "Unknown Network",
-                        "country_code": "XX",
-                        "city": "Unknown City",
-                        "latitude": "0.0",
-                        "longitude": "0.0",
-                        "continent": None,
-                        "timezone": None,
-                    })
-                    
-                    # Check if bot exists
-                    result = await session.execute(
-                        select(Bot).where(Bot.bot_id == bot_info.get("bot_id"))
-                    )
-                    bot = result.scalar_one_or_none()
-                    
-                    is_new_bot = False
-                    if bot:
-                        # Update last_seen timestamp
-                        bot.last_seen = datetime.utcnow()
-                        logger.info(f"Updated existing bot: {bot.bot_id}")
-                    else:
-                        # Create new bot
-                        bot = Bot(**bot_info)
-                        session.add(bot)
-                        await session.flush()  # Get bot.id
-                        logger.info(f"Created new bot: {bot.bot_id}")
-                        is_new_bot = True
-                    
-                    bot_db_id = bot.id
-                    
-                    # Enrich with IP reputation (fire-and-forget)
-                    if is_new_bot:
-                        try:
-                            from app.core.enrichment import enrich_bot_with_ip_reputation
-                            # Create background task for IP enrichment (non-blocking)
-                            asyncio.create_task(
-                                enrich_bot_with_ip_reputation(
-                                    bot.ip_address,
-                                    bot,
-                                    session
-                                )
-                            )
-                        except Exception as e:
-                            logger.debug(f"IP enrichment task creation failed: {e}")
+                # Set default location values (no GeoIP lookup)
+                bot_info.update({
+                    "country": "Unknown Network",
+                    "country_code": "XX",
+                    "city": "Unknown City",
+                    "latitude": "0.0",
+                    "longitude": "0.0",
+                    "continent": None,
+                    "timezone": None,
+                })
+                
+                # Insert the bot or refresh last_seen in one atomic statement;
+                # a fresh row still has first_seen == last_seen
+                now = parsed_data.get("received_at") or datetime.utcnow()
+                values = {key: value for key, value in bot_info.items() if key in Bot.__table__.c}
+                values.update(first_seen=now, last_seen=now)
+                statement = insert(Bot).values(**values)
+                statement = statement.on_conflict_do_update(
+                    index_elements=[Bot.bot_id],
+                    set_={"last_seen": statement.excluded.last_seen},
+                ).returning(
+                    Bot.id,
+                    Bot.bot_id,
+                    Bot.ip_address,
+                    Bot.protocol,
+                    Bot.hostname,
+                    Bot.country,
+                    Bot.country_code,
+                    (Bot.first_seen == Bot.last_seen).label("is_new"),
+                )
+                bot = (await session.execute(statement)).one()
+                
+                is_new_bot = bool(bot.is_new)
+                if is_new_bot:
+                    logger.info(f"Created new bot: {bot.bot_id}")
+                else:
+                    logger.info(f"Updated existing bot: {bot.bot_id}")
+                
+                bot_db_id = bot.id
+                
+                if is_new_bot:
+                    # Enrich with IP reputation for new bots; payload hashes
+                    # are collected below and looked up alongside it
+                    enrich_ip = bot.ip_address
                     
-                    # Broadcast new beacon event
-                    if is_new_bot:
-                        await manager.broadcast("new_beacon", {
+                    if broadcast:
+                        events.append(("new_beacon", {
                             "bot_id": bot.id,
                             "ip_address": bot.ip_address,
                             "protocol": bot.protocol,
                             "hostname": bot.hostname,
                             "country": bot.country,
                             "country_code": bot.country_code
-                        })
-                        
-                        # Send Telegram notification for new infection
-                        try:
-                            from app.core.notifier import send_notification
-                            yara_info = f"\n<b>YARA:</b> {parsed_data.get('yara_matches', [])}" if parsed_data.get('yara_matches') else ""
-                            await send_notification(
-                                title="🦠 New Infection Detected",
-                                message=(
-                                    f"<b>Protocol:</b> {bot.protocol}\n"
-                                    f"<b>IP:</b> {bot.ip_address}\n"
-                                    f"<b>Hostname:</b> {bot.hostname or 'N/A'}\n"
-                                    f"<b>Bot ID:</b> {bot.bot_id or f'BOT-{bot.id}'}"
-                                    f"{yara_info}"
-                                ),
-                                level="WARNING"
-                            )
-                        except Exception as e:
-                            logger.debug(f"Telegram notification failed (non-critical): {e}")
+                        }))
+                    
+                    yara_info = f"\n<b>YARA:</b> {parsed_data.get('yara_matches', [])}" if parsed_data.get('yara_matches') else ""
+                    notification = {
+                        "title": "🦠 New Infection Detected",
+                        "message": (
+                            f"<b>Protocol:</b> {bot.protocol}\n"
+                            f"<b>IP:</b> {bot.ip_address}\n"
+                            f"<b>Hostname:</b> {bot.hostname or 'N/A'}\n"
+                            f"<b>Bot ID:</b> {bot.bot_id or f'BOT-{bot.id}'}"
+                            f"{yara_info}"
+                        ),
+                        "level": "WARNING",
+                    }
+                
+                # Store logs (keystrokes, etc.) in one batched insert
+                log_entries = parsed_data.get("logs", [])
+                for log_entry in log_entries:
+                    log_entry["bot_id"] = bot_db_id
+                    log_entry["received_at"] = now
+                log_ids = await bulk_insert(session, Log, log_entries)
+                
+                for log_id, log_entry in zip(log_ids, log_entries):
+                    # Enrich with VirusTotal hash check if keystroke/clipboard data exists
+                    keystroke_data = log_entry.get("keystroke_data")
+                    
+                    if keystroke_data and len(keystroke_data) > 100:
+                        # Analyze larger keystroke payloads
+                        # Hash text incrementally rather than encoding a full copy
+                        payload_chunks = iter_utf8_chunks(keystroke_data) if isinstance(keystroke_data, str) else keystroke_data
+                        enrich_payloads.append(payload_chunks)
                     
-                    # Store logs (keystrokes, etc.)
-                    for log_entry in parsed_data.get("logs", []):
-                        log_entry["bot_id"] = bot_db_id
-                        log = Log(**log_entry)
-                        session.add(log)
-                        
-                        # Enrich with VirusTotal hash check if keystroke/clipboard data exists
-                        # Fire-and-forget task for payload analysis
-                        keystroke_data = log_entry.get("keystroke_data")
-                        clipboard_data = log_entry.get("clipboard_data")
-                        
-                        if keystroke_data and len(keystroke_data) > 100:
-                            # Analyze larger keystroke payloads
-                            try:
-                                from app.core.enrichment import enrich_payload_with_hash_check
-                                payload_bytes = keystroke_data.encode('utf-8') if isinstance(keystroke_data, str) else keystroke_data
-                                asyncio.create_task(
-                                    enrich_payload_with_hash_check(
-                                        payload_bytes,
-                                        log,
-                                        session
-                                    )
-                                )
-                            except Exception as e:
-                                logger.debug(f"VT enrichment task creation failed: {e}")
-                        
-                        # Broadcast new log event
-                        await manager.broadcast("new_log", {
-                            "log_id": log.id if hasattr(log, 'id') else None,
+                    if broadcast:
+                        events.append(("new_log", {
+                            "log_id": log_id,
                             "bot_id": bot_db_id,
                             "log_type": log_entry.get("log_type"),
                             "preview": str(log_entry.get("keystroke_data", ""))[:100]
-                        })
-                    
-                    # Store credentials
-                    for cred_entry in parsed_data.get("credentials", []):
-                        cred_entry["bot_id"] = bot_db_id
-                        credential = Credential(**cred_entry)
-                        session.add(credential)
-                        
-                        # Broadcast credential event
-                        await manager.broadcast("new_credential", {
-                            "credential_id": credential.id if hasattr(credential, 'id') else None,
+                        }))
+                
+                # Store credentials in one batched insert
+                cred_entries = parsed_data.get("credentials", [])
+                for cred_entry in cred_entries:
+                    cred_entry["bot_id"] = bot_db_id
+                    cred_entry["received_at"] = now
+                credential_ids = await bulk_insert(session, Credential, cred_entries)
+                
+                for credential_id, cred_entry in zip(credential_ids, cred_entries):
+                    if broadcast:
+                        events.append(("new_credential", {
+                            "credential_id": credential_id,
                             "bot_id": bot_db_id,
                             "cred_type": cred_entry.get("cred_type"),
                             "url": cred_entry.get("url")
-                        })
-                    
-                    await session.commit()
-                    logger.info(f"Stored {len(parsed_data.get('logs', []))} logs and "
-                              f"{len(parsed_data.get('credentials', []))} credentials")
+                        }))
+                
+                await session.commit()
+                logger.info(f"Stored {len(log_entries)} logs and "
+                          f"{len(cred_entries)} credentials")
                 
             except Exception as e:
                 await session.rollback()
                 logger.error(f"Database storage error: {e}", exc_info=True)
                 raise
+        
+        # Broadcasting only enqueues, so events go out in insert order
+        for event_type, event_data in events:
+            await manager.broadcast(event_type, event_data)
+        
+        # Send Telegram notification for new infection
+        if notification:
+            try:
+                await send_notification(**notification)
+            except Exception as e:
+                logger.debug(f"Telegram notification failed (non-critical): {e}")
+        
+        # One fire-and-forget task runs all lookups concurrently
+        if enrich_ip or enrich_payloads:
+            try:
+                asyncio.create_task(
+                    enrich_bot_and_payloads(
+                        bot_db_id,
+                        ip=enrich_ip,
+                        payloads=enrich_payloads
+                    )
+                )
+            except Exception as e:
+                logger.debug(f"Enrichment task creation failed: {e}")
 
 
-# Import datetime for _store_data
-from datetime import datetime
+def get_registered_handlers() -> List[Type[ProtocolHandler]]:
+    """
+    Get the concrete handler classes defined so far.
+    
+    Returns:
+        ProtocolHandler subclasses from every imported protocol module
+    """
+    return [cls for cls in _handler_registry if not inspect.isabstract(cls)]
+
@@ -6,12 +6,13 @@ and sends keystrokes in a delimited format. This serves as a template
 for implementing real malware family handlers.
 """
 
+import re
 from datetime import datetime
 from typing import Any, Dict
 
 from app.core.logging import get_logger
 from app.protocols.base import ProtocolHandler
-from app.protocols.utils import extract_delimited_strings, xor_decrypt
+from app.protocols.utils import xor_decrypt
 
 logger = get_logger(__name__)
 
@@ -33,15 +34,15 @@ class ExampleLoggerHandler(ProtocolHandler):
     # XOR encryption key (hardcoded in this example malware)
     XOR_KEY = b"SecretKey123"
     
-    @property
-    def name(self) -> str:
-        return "ExampleLogger"
+    # Keystroke markers that suggest a typed credential; only the first hit is kept
+    CREDENTIAL_KEYWORD = re.compile(rb'(?:password|pwd|pass|login):', re.IGNORECASE)
     
-    @property
-    def port(self) -> int:
-        return 4444
+    __slots__ = ()
     
-    async def decrypt(self, data: bytes) -> bytes:
+    name = "ExampleLogger"
+    port = 4444
+    
+    def decrypt(self, data: bytes) -> bytes:
         """
         Decrypt XOR-encrypted payload.
         
@@ -57,7 +58,7 @@ class ExampleLoggerHandler(ProtocolHandler):
         if len(data) < 4:
             raise ValueError(f"Payload too short: {len(data)} bytes")
         
-        logger.debug(f"[{self.name}] Decrypting {len(data)} bytes with XOR")
+        logger.debug(f"{self._name_tag} Decrypting {len(data)} bytes with XOR")
         
         try:
             decrypted = xor_decrypt(data, self.XOR_KEY)
@@ -65,7 +66,7 @@ class ExampleLoggerHandler(ProtocolHandler):
         except Exception as e:
             raise ValueError(f"XOR decryption failed: {e}")
     
-    async def parse(self, decrypted_data: bytes, client_info: Dict[str, Any]) -> Dict[str, Any]:
+    def parse(self, decrypted_data: bytes, client_info: Dict[str, Any]) -> Dict[str, Any]:
         """
         Parse decrypted payload into structured data.
         
@@ -80,17 +81,20 @@ class ExampleLoggerHandler(ProtocolHandler):
             Dictionary with bot_info, logs, and credentials
         """
         try:
-            # Decode to string
-            payload_str = decrypted_data.decode("utf-8", errors="ignore").strip()
-            logger.debug(f"[{self.name}] Decoded payload: {payload_str[:100]}...")
-            
-            # Split by delimiter (pipe symbol)
-            fields = payload_str.split("|")
+            # Split by delimiter (pipe symbol) and decode only the fields used;
+            # the keystroke tail is left unscanned and may contain pipes
+            fields = decrypted_data.strip().split(b"|", 5)
+            logger.debug(f"{self._name_tag} Payload: {decrypted_data[:100]!r}...")
             
             if len(fields) < 6:
                 raise ValueError(f"Invalid field count: expected 6, got {len(fields)}")
             
-            bot_id, hostname, username, os_info, window_title, keystrokes = fields[:6]
+            bot_id, hostname, username, os_info, window_title = (
+                field.decode("utf-8", errors="ignore") for field in fields[:5]
+            )
+            # Keep raw keystrokes for the credential scan below
+            raw_keystrokes = fields[5]
+            keystrokes = raw_keystrokes.decode("utf-8", errors="ignore")
             
             # Build bot information
             bot_info = {
@@ -103,6 +107,8 @@ class ExampleLoggerHandler(ProtocolHandler):
                 "os_info": os_info or None,
             }
             
+            captured_at = datetime.utcnow()
+            
             # Build log entry for keystrokes
             logs = []
             if keystrokes:
@@ -110,14 +116,14 @@ class ExampleLoggerHandler(ProtocolHandler):
                     "log_type": "keystroke",
                     "window_title": window_title or "Unknown",
                     "keystroke_data": keystrokes,
-                    "captured_at": datetime.utcnow(),
+                    "captured_at": captured_at,
                 }
                 logs.append(log_entry)
-                logger.info(f"[{self.name}] Captured keystrokes from {bot_id}: "
+                logger.info(f"{self._name_tag} Captured keystrokes from {bot_id}: "
                           f"{keystrokes[:50]}...")
             
             # Check for credentials in keystrokes (basic pattern matching)
-            credentials = self._extract_credentials(keystrokes, bot_id)
+            credentials = self._extract_credentials(raw_keystrokes, bot_id, captured_at)
             
             return {
                 "bot_info": bot_info,
@@ -126,10 +132,10 @@ class ExampleLoggerHandler(ProtocolHandler):
             }
             
         except Exception as e:
-            logger.error(f"[{self.name}] Parsing error: {e}")
+            logger.error(f"{self._name_tag} Parsing error: {e}")
             raise ValueError(f"Failed to parse payload: {e}")
     
-    def _extract_credentials(self, keystrokes: str, bot_id: str) -> list:
+    def _extract_credentials(self, keystrokes: bytes, bot_id: str, captured_at: datetime) -> list:
         """
         Extract potential credentials from keystroke data.
         
@@ -137,8 +143,9 @@ class ExampleLoggerHandler(ProtocolHandler):
         you would use more sophisticated pattern matching or ML models.
         
         Args:
-            keystrokes: Keystroke string
+            keystrokes: Raw keystroke bytes
             bot_id: Bot identifier
+            captured_at: Timestamp shared with the keystroke log
             
         Returns:
             List of credential dictionaries
@@ -146,22 +153,19 @@ class ExampleLoggerHandler(ProtocolHandler):
         credentials = []
         
         # Look for common patterns (very basic example)
-        keywords = ["password:", "pwd:", "pass:", "login:"]
-        
-        for keyword in keywords:
-            if keyword.lower() in keystrokes.lower():
-                # Extract context around keyword (basic extraction)
-                idx = keystrokes.lower().find(keyword)
-                context = keystrokes[max(0, idx-20):min(len(keystrokes), idx+50)]
-                
-                cred = {
-                    "cred_type": "password",
-                    "raw_data": context,
-                    "captured_at": datetime.utcnow(),
-                }
-                credentials.append(cred)
-                logger.info(f"[{self.name}] Potential credential detected for {bot_id}")
-                break  # Only extract first match
+        match = self.CREDENTIAL_KEYWORD.search(keystrokes)
+        if match:
+            # Extract context around keyword (basic extraction)
+            idx = match.start()
+            context = keystrokes[max(0, idx-20):idx+50].decode("utf-8", errors="ignore")
+            
+            cred = {
+                "cred_type": "password",
+                "raw_data": context,
+                "captured_at": captured_at,
+            }
+            credentials.append(cred)
+            logger.info(f"{self._name_tag} Potential credential detected for {bot_id}")
         
         return credentials
     
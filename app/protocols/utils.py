@@ -5,7 +5,32 @@ Includes hexdump formatting, common cryptographic operations (XOR, RC4, AES),
 and data parsing helpers for malware traffic analysis.
 """
 
-from typing import List
+import struct
+from typing import Dict, List, Optional, Sequence
+
+from Crypto.Cipher import AES, ARC4
+
+# Valid PKCS7 padding for each padding length (index 0 unused)
+_PKCS7_PADS = [bytes([length]) * length for length in range(17)]
+
+# Little-endian unsigned ints that struct reads faster than int.from_bytes
+_LE_INT_STRUCTS = {size: struct.Struct(f"<{code}") for size, code in ((2, "H"), (4, "I"), (8, "Q"))}
+
+# Single-byte XOR key -> translate table, built on first use
+_xor_tables: Dict[int, bytes] = {}
+
+# Bytes XORed per step by xor_decrypt_inplace
+XOR_WINDOW_SIZE = 1 << 16
+
+# Keys whose RC4 keystream is cached, and the longest keystream kept per key
+RC4_KEYSTREAM_CACHE_SIZE = 64
+RC4_KEYSTREAM_MAX = 1 << 20
+
+# RC4 key -> keystream prefix, oldest first
+_rc4_keystreams: Dict[bytes, bytes] = {}
+
+# Maps each byte to itself if printable ASCII, else to "." (for hexdump)
+_PRINTABLE_ASCII = bytes(b if 32 <= b < 127 else 0x2E for b in range(256))
 
 
 def hexdump(data: bytes, length: int = 16, show_ascii: bool = True) -> str:
@@ -30,27 +55,50 @@ def hexdump(data: bytes, length: int = 16, show_ascii: bool = True) -> str:
     if not data:
         return "(empty)"
     
-    lines = []
-    for i in range(0, len(data), length):
-        chunk = data[i:i + length]
-        
-        # Offset
-        offset = f"{i:08x}"
-        
-        # Hex bytes (split into two groups of 8)
-        hex_part1 = " ".join(f"{b:02x}" for b in chunk[:8])
-        hex_part2 = " ".join(f"{b:02x}" for b in chunk[8:])
-        hex_part = f"{hex_part1:<23}  {hex_part2:<23}"
-        
-        # ASCII representation
-        if show_ascii:
-            ascii_part = "".join(
-                chr(b) if 32 <= b < 127 else "."
-                for b in chunk
+    if length == 16 and show_ascii:
+        return _hexdump_16(data)
+    
+    # One format per line: offset, hex bytes in two groups of 8, ASCII
+    half = min(length, 8)
+    if show_ascii:
+        # Build the ASCII column for the whole dump once and slice it per line
+        printable = data.translate(_PRINTABLE_ASCII).decode("ascii")
+        lines = [
+            "%08x  %-23s  %-23s |%s|" % (
+                i, data[i:i + half].hex(" "), data[i + half:i + length].hex(" "),
+                printable[i:i + length],
             )
-            lines.append(f"{offset}  {hex_part} |{ascii_part}|")
-        else:
-            lines.append(f"{offset}  {hex_part}")
+            for i in range(0, len(data), length)
+        ]
+    else:
+        lines = [
+            "%08x  %-23s  %-23s" % (
+                i, data[i:i + half].hex(" "), data[i + half:i + length].hex(" "),
+            )
+            for i in range(0, len(data), length)
+        ]
+    
+    return "\n".join(lines)
+
+
+def _hexdump_16(data: bytes) -> str:
+    """hexdump() for the default 16-byte lines with ASCII column."""
+    size = len(data)
+    full = size - size % 16
+    printable = data.translate(_PRINTABLE_ASCII).decode("ascii")
+    
+    # Full lines need no padding: hex the whole run once, then each line's
+    # two 8-byte groups are fixed 23-character slices of 48 per line
+    hex_text = data[:full].hex(" ")
+    lines = [
+        "%08x  %s  %s |%s|" % (i, hex_text[j:j + 23], hex_text[j + 24:j + 47], printable[i:i + 16])
+        for i, j in zip(range(0, full, 16), range(0, 3 * full, 48))
+    ]
+    
+    if full < size:
+        lines.append("%08x  %-23s  %-23s |%s|" % (
+            full, data[full:full + 8].hex(" "), data[full + 8:].hex(" "), printable[full:]
+        ))
     
     return "\n".join(lines)
 
@@ -75,8 +123,52 @@ def xor_decrypt(data: bytes, key: bytes) -> bytes:
     if not key:
         raise ValueError("XOR key cannot be empty")
     
-    key_len = len(key)
-    return bytes(data[i] ^ key[i % key_len] for i in range(len(data)))
+    if len(key) == 1:
+        # A one-byte key is a fixed byte substitution
+        table = _xor_tables.get(key[0])
+        if table is None:
+            table = _xor_tables[key[0]] = bytes(b ^ key[0] for b in range(256))
+        return bytes(data.translate(table))
+    
+    # XOR the whole buffer against the repeated key as two big integers, so
+    # the per-byte loop runs in C rather than the interpreter
+    size = len(data)
+    keystream = (key * (size // len(key) + 1))[:size]
+    return (
+        int.from_bytes(data, "little") ^ int.from_bytes(keystream, "little")
+    ).to_bytes(size, "little")
+
+
+def xor_decrypt_inplace(buf: bytearray, key: bytes) -> None:
+    """
+    XOR decryption with repeating key, overwriting the buffer.
+    
+    Works through the buffer in windows of about 64 KB, so large
+    buffers need only one window of scratch memory rather than a full
+    second copy.
+    
+    Args:
+        buf: Encrypted data, replaced by the decrypted bytes
+        key: XOR key (repeats if shorter than data)
+        
+    Raises:
+        ValueError: If the key is empty
+    """
+    if not key:
+        raise ValueError("XOR key cannot be empty")
+    
+    # Windows are whole multiples of the key so each one starts at key[0]
+    window = len(key) * max(1, XOR_WINDOW_SIZE // len(key))
+    keystream = int.from_bytes((key * (window // len(key)))[:window], "little")
+    
+    view = memoryview(buf)
+    for start in range(0, len(buf), window):
+        chunk = view[start:start + window]
+        size = len(chunk)
+        if size < window:
+            # Keep only the low bytes of the keystream for the short tail
+            keystream &= (1 << (8 * size)) - 1
+        chunk[:] = (int.from_bytes(chunk, "little") ^ keystream).to_bytes(size, "little")
 
 
 def rc4_decrypt(data: bytes, key: bytes) -> bytes:
@@ -93,10 +185,34 @@ def rc4_decrypt(data: bytes, key: bytes) -> bytes:
     Returns:
         Decrypted bytes
     """
-    from Crypto.Cipher import ARC4
+    size = len(data)
+    if size > RC4_KEYSTREAM_MAX:
+        return ARC4.new(key).decrypt(data)
+    
+    # RC4 output is data XOR a keystream that depends only on the key, so
+    # samples with a hardcoded key reuse one cached keystream per key
+    key = bytes(key)
+    keystream = _rc4_keystreams.get(key)
+    if keystream is None or len(keystream) < size:
+        keystream = _rc4_keystream(key, size)
+    
+    return (
+        int.from_bytes(data, "little") ^ int.from_bytes(keystream[:size], "little")
+    ).to_bytes(size, "little")
+
+
+def _rc4_keystream(key: bytes, size: int) -> bytes:
+    """Generate and cache at least size bytes of RC4 keystream for key."""
+    # Round up so slightly larger packets don't regenerate the stream
+    length = min(-(-size // 4096) * 4096, RC4_KEYSTREAM_MAX)
+    keystream = ARC4.new(key).encrypt(bytes(length))
     
-    cipher = ARC4.new(key)
-    return cipher.decrypt(data)
+    _rc4_keystreams.pop(key, None)
+    if len(_rc4_keystreams) >= RC4_KEYSTREAM_CACHE_SIZE:
+        # Evict the least recently generated key
+        _rc4_keystreams.pop(next(iter(_rc4_keystreams)), None)
+    _rc4_keystreams[key] = keystream
+    return keystream
 
 
 def aes_decrypt(data: bytes, key: bytes, iv: bytes, mode: str = "CBC") -> bytes:
@@ -117,16 +233,102 @@ def aes_decrypt(data: bytes, key: bytes, iv: bytes, mode: str = "CBC") -> bytes:
     Raises:
         ValueError: If key/IV size is invalid
     """
-    from Crypto.Cipher import AES
+    decrypt = _AES_MODES.get(mode.upper())
+    if decrypt is None:
+        raise ValueError(f"Unsupported AES mode: {mode}")
     
-    if mode.upper() == "CBC":
-        cipher = AES.new(key, AES.MODE_CBC, iv)
-    elif mode.upper() == "ECB":
-        cipher = AES.new(key, AES.MODE_ECB)
-    else:
+    return decrypt(data, key, iv)
+
+
+def aes_decrypt_cbc(data: bytes, key: bytes, iv: bytes) -> bytes:
+    """
+    AES-CBC decryption, for handlers whose mode is fixed.
+    
+    Args:
+        data: Encrypted data (must be multiple of 16 bytes)
+        key: AES key (16, 24, or 32 bytes for AES-128/192/256)
+        iv: Initialization vector (16 bytes)
+        
+    Returns:
+        Decrypted bytes (may need PKCS7 unpadding)
+    """
+    return AES.new(key, AES.MODE_CBC, iv).decrypt(data)
+
+
+def aes_decrypt_ecb(data: bytes, key: bytes, iv: Optional[bytes] = None) -> bytes:
+    """
+    AES-ECB decryption, for handlers whose mode is fixed.
+    
+    Args:
+        data: Encrypted data (must be multiple of 16 bytes)
+        key: AES key (16, 24, or 32 bytes for AES-128/192/256)
+        iv: Ignored; accepted so both modes share a signature
+        
+    Returns:
+        Decrypted bytes (may need PKCS7 unpadding)
+    """
+    return AES.new(key, AES.MODE_ECB).decrypt(data)
+
+
+# aes_decrypt mode name -> implementation
+_AES_MODES = {"CBC": aes_decrypt_cbc, "ECB": aes_decrypt_ecb}
+
+
+def aes_decrypt_many(
+    ciphertexts: Sequence[bytes],
+    key: bytes,
+    iv: bytes,
+    mode: str = "CBC"
+) -> List[bytes]:
+    """
+    Decrypt several AES messages that share a key in one cipher call.
+    
+    All blocks go through a single ECB decrypt, which lets AES-NI work
+    on several blocks at once, instead of one cipher per message. For
+    CBC the chaining is then undone per message, each starting from iv.
+    
+    Args:
+        ciphertexts: Encrypted messages (each a multiple of 16 bytes)
+        key: AES key (16, 24, or 32 bytes for AES-128/192/256)
+        iv: Initialization vector shared by every message (ignored for ECB)
+        mode: Cipher mode ("CBC" or "ECB")
+        
+    Returns:
+        Decrypted messages in the same order (may need PKCS7 unpadding)
+        
+    Raises:
+        ValueError: If a message length, the key/IV size or the mode is invalid
+    """
+    mode = mode.upper()
+    if mode not in ("CBC", "ECB"):
         raise ValueError(f"Unsupported AES mode: {mode}")
+    if mode == "CBC" and len(iv) != AES.block_size:
+        raise ValueError(f"IV must be {AES.block_size} bytes, got {len(iv)}")
+    for ciphertext in ciphertexts:
+        if len(ciphertext) % AES.block_size:
+            raise ValueError(f"Ciphertext is not a whole number of AES blocks: {len(ciphertext)} bytes")
+    
+    buffer = b"".join(ciphertexts)
+    plaintext = AES.new(key, AES.MODE_ECB).decrypt(buffer)
     
-    return cipher.decrypt(data)
+    if mode == "CBC" and buffer:
+        # Each block is XORed with the ciphertext block before it, or with
+        # the IV at the start of a message
+        previous = b"".join(
+            iv + ciphertext[:-AES.block_size] for ciphertext in ciphertexts if ciphertext
+        )
+        size = len(buffer)
+        plaintext = (
+            int.from_bytes(plaintext, "little") ^ int.from_bytes(previous, "little")
+        ).to_bytes(size, "little")
+    
+    results = []
+    offset = 0
+    for ciphertext in ciphertexts:
+        end = offset + len(ciphertext)
+        results.append(plaintext[offset:end])
+        offset = end
+    return results
 
 
 def pkcs7_unpad(data: bytes) -> bytes:
@@ -151,7 +353,7 @@ def pkcs7_unpad(data: bytes) -> bytes:
         raise ValueError(f"Invalid padding length: {padding_len}")
     
     # Verify padding is correct
-    if data[-padding_len:] != bytes([padding_len] * padding_len):
+    if not data.endswith(_PKCS7_PADS[padding_len]):
         raise ValueError("Invalid PKCS7 padding")
     
     return data[:-padding_len]
@@ -175,19 +377,9 @@ def extract_delimited_strings(data: bytes, delimiter: bytes = b"\x00") -> List[s
         >>> extract_delimited_strings(b"user\\x00pass\\x00host\\x00")
         ['user', 'pass', 'host']
     """
-    parts = data.split(delimiter)
-    strings = []
-    
-    for part in parts:
-        if part:
-            try:
-                # Try UTF-8 first
-                strings.append(part.decode("utf-8", errors="ignore"))
-            except Exception:
-                # Fallback to latin-1
-                strings.append(part.decode("latin-1", errors="ignore"))
-    
-    return strings
+    # split() runs in C and beats a find() loop unless there are almost no
+    # delimiters; errors="ignore" means decoding never raises
+    return [part.decode("utf-8", errors="ignore") for part in data.split(delimiter) if part]
 
 
 def parse_fixed_format(data: bytes, format_spec: List[tuple]) -> dict:
@@ -216,12 +408,18 @@ def parse_fixed_format(data: bytes, format_spec: List[tuple]) -> dict:
             result[field_name] = None
             continue
         
+        if field_type == "int":
+            int_struct = _LE_INT_STRUCTS.get(length)
+            if int_struct is not None:
+                result[field_name] = int_struct.unpack_from(data, offset)[0]
+            else:
+                result[field_name] = int.from_bytes(data[offset:offset + length], byteorder="little")
+            continue
+        
         chunk = data[offset:offset + length]
         
         if field_type == "str":
             result[field_name] = chunk.decode("utf-8", errors="ignore").rstrip("\x00")
-        elif field_type == "int":
-            result[field_name] = int.from_bytes(chunk, byteorder="little")
         elif field_type == "bytes":
             result[field_name] = chunk
         else:
@@ -0,0 +1,73 @@
+"""Add composite indexes for the bot, log and credential hot paths
+
+Revision ID: 3f1b6c0d9a21
+Revises: 
+Create Date: 2026-10-14 04:26:41
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1b6c0d9a21'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases created by init_db() after this change already have the
+    # indexes, so every create is a no-op there
+    op.create_index('ix_bots_first_seen', 'bots', ['first_seen'], if_not_exists=True)
+    op.create_index(
+        'ix_bots_protocol_last_seen', 'bots',
+        ['protocol', sa.text('last_seen DESC')], if_not_exists=True,
+    )
+    op.create_index(
+        'ix_bots_ip_address_last_seen', 'bots',
+        ['ip_address', sa.text('last_seen DESC')], if_not_exists=True,
+    )
+    op.create_index(
+        'ix_credentials_bot_id_received_at', 'credentials',
+        ['bot_id', sa.text('received_at DESC')], if_not_exists=True,
+    )
+    op.create_index('ix_logs_received_at', 'logs', ['received_at'], if_not_exists=True)
+    op.create_index(
+        'ix_logs_bot_id_received_at', 'logs',
+        ['bot_id', sa.text('received_at DESC')], if_not_exists=True,
+    )
+    op.create_index(
+        'ix_logs_log_type_received_at', 'logs',
+        ['log_type', sa.text('received_at DESC')], if_not_exists=True,
+    )
+    
+    # Trigram indexes for the ILIKE searches only exist on PostgreSQL
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index(
+            'ix_logs_keystroke_data_trgm', 'logs', ['keystroke_data'],
+            postgresql_using='gin', postgresql_ops={'keystroke_data': 'gin_trgm_ops'},
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_logs_window_title_trgm', 'logs', ['window_title'],
+            postgresql_using='gin', postgresql_ops={'window_title': 'gin_trgm_ops'},
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_logs_window_title_trgm', table_name='logs', if_exists=True)
+        op.drop_index('ix_logs_keystroke_data_trgm', table_name='logs', if_exists=True)
+    
+    op.drop_index('ix_logs_log_type_received_at', table_name='logs', if_exists=True)
+    op.drop_index('ix_logs_bot_id_received_at', table_name='logs', if_exists=True)
+    op.drop_index('ix_logs_received_at', table_name='logs', if_exists=True)
+    op.drop_index('ix_credentials_bot_id_received_at', table_name='credentials', if_exists=True)
+    op.drop_index('ix_bots_ip_address_last_seen', table_name='bots', if_exists=True)
+    op.drop_index('ix_bots_protocol_last_seen', table_name='bots', if_exists=True)
+    op.drop_index('ix_bots_first_seen', table_name='bots', if_exists=True)
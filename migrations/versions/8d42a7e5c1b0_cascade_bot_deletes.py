@@ -0,0 +1,75 @@
+"""Cascade bot deletes to logs and credentials
+
+Revision ID: 8d42a7e5c1b0
+Revises: 3f1b6c0d9a21
+Create Date: 2026-10-14 04:31:12
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d42a7e5c1b0'
+down_revision: Union[str, None] = '3f1b6c0d9a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite foreign keys are unnamed; batch mode names the reflected ones
+# with this convention so they can be dropped
+NAMING_CONVENTION = {
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
+}
+
+CHILD_TABLES = ('logs', 'credentials')
+
+
+def _replace_bot_fk(table: str, ondelete: Union[str, None]) -> None:
+    """Recreate a child table's bot_id foreign key with the given ON DELETE."""
+    bind = op.get_bind()
+    foreign_key = next(
+        fk for fk in sa.inspect(bind).get_foreign_keys(table)
+        if fk['referred_table'] == 'bots'
+    )
+    current = (foreign_key.get('options') or {}).get('ondelete')
+    if (current or '').upper() == (ondelete or '').upper():
+        # Already in the wanted state (e.g. created by init_db)
+        return
+    
+    if bind.dialect.name == 'sqlite':
+        # SQLite can't alter constraints, so batch mode rebuilds the table.
+        # Reflection drops DESC from index columns; restore the original
+        # index definitions afterwards.
+        indexes = bind.execute(
+            sa.text(
+                "SELECT name, sql FROM sqlite_master "
+                "WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"
+            ),
+            {'table': table},
+        ).all()
+        
+        name = f'fk_{table}_bot_id_bots'
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(name, 'bots', ['bot_id'], ['id'], ondelete=ondelete)
+        
+        for index_name, index_sql in indexes:
+            op.execute(f'DROP INDEX IF EXISTS "{index_name}"')
+            op.execute(index_sql)
+    else:
+        op.drop_constraint(foreign_key['name'], table, type_='foreignkey')
+        op.create_foreign_key(
+            foreign_key['name'], table, 'bots', ['bot_id'], ['id'], ondelete=ondelete,
+        )
+
+
+def upgrade() -> None:
+    for table in CHILD_TABLES:
+        _replace_bot_fk(table, 'CASCADE')
+
+
+def downgrade() -> None:
+    for table in CHILD_TABLES:
+        _replace_bot_fk(table, None)
@@ -0,0 +1,40 @@
+"""Add the full-text search index on logs
+
+Revision ID: b5e09c7f2d43
+Revises: 8d42a7e5c1b0
+Create Date: 2026-10-14 04:40:05
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e09c7f2d43'
+down_revision: Union[str, None] = '8d42a7e5c1b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # PostgreSQL only; the expression must match log_search_document()
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    op.create_index(
+        'ix_logs_search_document', 'logs',
+        [sa.text(
+            "to_tsvector('simple', coalesce(keystroke_data, '') || ' ' || coalesce(window_title, ''))"
+        )],
+        postgresql_using='gin',
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    op.drop_index('ix_logs_search_document', table_name='logs', if_exists=True)
@@ -0,0 +1,31 @@
+"""Index bot recency and credential receipt time
+
+Revision ID: c7a3d18e4f65
+Revises: b5e09c7f2d43
+Create Date: 2026-10-14 05:02:18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a3d18e4f65'
+down_revision: Union[str, None] = 'b5e09c7f2d43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_bots_last_seen_id', 'bots',
+        [sa.text('last_seen DESC'), sa.text('id DESC')], if_not_exists=True,
+    )
+    op.create_index('ix_credentials_received_at', 'credentials', ['received_at'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_credentials_received_at', table_name='credentials', if_exists=True)
+    op.drop_index('ix_bots_last_seen_id', table_name='bots', if_exists=True)
@@ -0,0 +1,118 @@
+"""Store bot IP addresses as packed binary / INET
+
+Revision ID: e2f6a9b3c814
+Revises: c7a3d18e4f65
+Create Date: 2026-10-14 05:06:40
+
+"""
+import ipaddress
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import INET
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f6a9b3c814'
+down_revision: Union[str, None] = 'c7a3d18e4f65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Stored in place of NULL addresses on downgrade, as the old code did
+UNKNOWN_ADDRESS = 'unknown'
+
+
+def _parse(value: str) -> Optional[ipaddress._BaseAddress]:
+    """Parse a stored address, or None for placeholders like "unknown"."""
+    try:
+        return ipaddress.ip_address(value)
+    except ValueError:
+        return None
+
+
+def _rebuild_sqlite_column(type_: sa.types.TypeEngine, existing_type: sa.types.TypeEngine,
+                           nullable: bool) -> None:
+    """Change bots.ip_address with a batch rebuild, keeping index definitions."""
+    bind = op.get_bind()
+    # Reflection drops DESC from index columns; restore the originals
+    indexes = bind.execute(
+        sa.text(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'index' AND tbl_name = 'bots' AND sql IS NOT NULL"
+        )
+    ).all()
+    
+    with op.batch_alter_table('bots') as batch_op:
+        batch_op.alter_column(
+            'ip_address', type_=type_, existing_type=existing_type, nullable=nullable,
+        )
+    
+    for index_name, index_sql in indexes:
+        op.execute(f'DROP INDEX IF EXISTS "{index_name}"')
+        op.execute(index_sql)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    column = next(c for c in sa.inspect(bind).get_columns('bots') if c['name'] == 'ip_address')
+    
+    if bind.dialect.name == 'postgresql':
+        op.alter_column('bots', 'ip_address', nullable=True, existing_type=sa.String(45))
+        if not isinstance(column['type'], INET):
+            rows = bind.execute(sa.text('SELECT id, ip_address FROM bots')).all()
+            for row_id, value in rows:
+                if value is not None and _parse(value) is None:
+                    bind.execute(
+                        sa.text('UPDATE bots SET ip_address = NULL WHERE id = :id'),
+                        {'id': row_id},
+                    )
+            op.alter_column(
+                'bots', 'ip_address', type_=INET(), existing_type=sa.String(45),
+                postgresql_using='ip_address::inet',
+            )
+        return
+    
+    # The batch rebuild casts the column to BLOB, so read the text rows
+    # first; packed rows are left alone, so running this twice is harmless
+    rows = bind.execute(
+        sa.text("SELECT id, ip_address FROM bots WHERE typeof(ip_address) = 'text'")
+    ).all()
+    
+    if not column['nullable']:
+        _rebuild_sqlite_column(sa.LargeBinary(16), sa.String(45), nullable=True)
+    
+    for row_id, value in rows:
+        address = _parse(value)
+        bind.execute(
+            sa.text('UPDATE bots SET ip_address = :packed WHERE id = :id'),
+            {'packed': address.packed if address else None, 'id': row_id},
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    
+    if bind.dialect.name == 'postgresql':
+        op.alter_column(
+            'bots', 'ip_address', type_=sa.String(45), existing_type=INET(),
+            postgresql_using='host(ip_address)',
+        )
+        bind.execute(
+            sa.text('UPDATE bots SET ip_address = :unknown WHERE ip_address IS NULL'),
+            {'unknown': UNKNOWN_ADDRESS},
+        )
+        op.alter_column('bots', 'ip_address', nullable=False, existing_type=sa.String(45))
+        return
+    
+    rows = bind.execute(
+        sa.text("SELECT id, ip_address FROM bots WHERE typeof(ip_address) IN ('blob', 'null')")
+    ).all()
+    for row_id, value in rows:
+        text_value = str(ipaddress.ip_address(bytes(value))) if value is not None else UNKNOWN_ADDRESS
+        bind.execute(
+            sa.text('UPDATE bots SET ip_address = :text WHERE id = :id'),
+            {'text': text_value, 'id': row_id},
+        )
+    
+    _rebuild_sqlite_column(sa.String(45), sa.LargeBinary(16), nullable=False)
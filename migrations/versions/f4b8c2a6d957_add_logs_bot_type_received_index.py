@@ -0,0 +1,34 @@
+"""Add (bot_id, log_type, received_at) index on logs
+
+Revision ID: f4b8c2a6d957
+Revises: e2f6a9b3c814
+Create Date: 2026-10-14 05:17:18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b8c2a6d957'
+down_revision: Union[str, None] = 'e2f6a9b3c814'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_logs_bot_type_received', 'logs',
+        ['bot_id', 'log_type', sa.text('received_at DESC')], if_not_exists=True,
+    )
+    # The composite indexes' leading columns cover these lookups
+    op.drop_index('ix_logs_bot_id', table_name='logs', if_exists=True)
+    op.drop_index('ix_logs_log_type', table_name='logs', if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index('ix_logs_log_type', 'logs', ['log_type'], if_not_exists=True)
+    op.create_index('ix_logs_bot_id', 'logs', ['bot_id'], if_not_exists=True)
+    op.drop_index('ix_logs_bot_type_received', table_name='logs', if_exists=True)
